@@ -0,0 +1,418 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
+from functools import reduce
+from types import UnionType
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from enumerable_funcs import Func, Predicate, Selector, Accumulator, Action, T
+import operator
+import numpy as np
+
+class Expression(ABC):
+    """
+    An `Expression` describes a computation over columns, e.g. `col("price") * col("qty") > 100`. It can be evaluated
+    on whole columns at once with NumPy (`evaluate`) or called on a single row like any other selector or predicate.
+    Expressions are introspectable: `symbol` names the operation and `operands` holds the sub expressions.
+    """
+    symbol = "?"
+    operands: Tuple['Expression', ...] = ()
+
+    @abstractmethod
+    def evaluate(self, columns: Mapping[str | None, np.ndarray]) -> np.ndarray:
+        """
+        Computes the expression over whole columns at once.
+        """
+
+    @abstractmethod
+    def __call__(self, row: Any) -> Any:
+        """
+        Computes the expression for a single row.
+        """
+
+    def _binary(self, other: Any, symbol: str, reflected: bool = False) -> 'Operation':
+        operands = (_expression(other), self) if reflected else (self, _expression(other))
+        return Operation(symbol, operands)
+
+    def __add__(self, other): return self._binary(other, "+")
+    def __radd__(self, other): return self._binary(other, "+", True)
+    def __sub__(self, other): return self._binary(other, "-")
+    def __rsub__(self, other): return self._binary(other, "-", True)
+    def __mul__(self, other): return self._binary(other, "*")
+    def __rmul__(self, other): return self._binary(other, "*", True)
+    def __truediv__(self, other): return self._binary(other, "/")
+    def __rtruediv__(self, other): return self._binary(other, "/", True)
+    def __floordiv__(self, other): return self._binary(other, "//")
+    def __rfloordiv__(self, other): return self._binary(other, "//", True)
+    def __mod__(self, other): return self._binary(other, "%")
+    def __rmod__(self, other): return self._binary(other, "%", True)
+    def __pow__(self, other): return self._binary(other, "**")
+    def __rpow__(self, other): return self._binary(other, "**", True)
+    def __eq__(self, other): return self._binary(other, "==")
+    def __ne__(self, other): return self._binary(other, "!=")
+    def __lt__(self, other): return self._binary(other, "<")
+    def __le__(self, other): return self._binary(other, "<=")
+    def __gt__(self, other): return self._binary(other, ">")
+    def __ge__(self, other): return self._binary(other, ">=")
+    def __and__(self, other): return self._binary(other, "&")
+    def __rand__(self, other): return self._binary(other, "&", True)
+    def __or__(self, other): return self._binary(other, "|")
+    def __ror__(self, other): return self._binary(other, "|", True)
+    def __invert__(self): return Operation("~", (self,))
+    def __neg__(self): return Operation("neg", (self,))
+    def __abs__(self): return Operation("abs", (self,))
+
+    __hash__ = object.__hash__
+
+    def isin(self, values: Iterable) -> 'Operation':
+        return Operation("isin", (self, Literal(frozenset(values))))
+
+
+class Column(Expression):
+    """
+    `Column` refers to a column by name, or with a `name` of `None` to the values of a one dimensional array.
+    """
+    symbol = "col"
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name
+
+    def evaluate(self, columns: Mapping[str | None, np.ndarray]) -> np.ndarray:
+        return columns[self.name]
+
+    def __call__(self, row: Any) -> Any:
+        return row if self.name is None else row[self.name]
+
+    def __repr__(self) -> str:
+        return "col()" if self.name is None else f"col({self.name!r})"
+
+
+class Literal(Expression):
+    symbol = "lit"
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def evaluate(self, columns: Mapping[str | None, np.ndarray]) -> Any:
+        return self.value
+
+    def __call__(self, row: Any) -> Any:
+        return self.value
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+def _isin(values: np.ndarray, members: frozenset) -> np.ndarray:
+    return np.isin(values, list(members))
+
+# symbol: (vectorized function, per row function)
+_OPERATIONS: Dict[str, Tuple[Callable, Callable]] = {
+    "+": (np.add, operator.add),
+    "-": (np.subtract, operator.sub),
+    "*": (np.multiply, operator.mul),
+    "/": (np.true_divide, operator.truediv),
+    "//": (np.floor_divide, operator.floordiv),
+    "%": (np.mod, operator.mod),
+    "**": (np.power, operator.pow),
+    "==": (np.equal, operator.eq),
+    "!=": (np.not_equal, operator.ne),
+    "<": (np.less, operator.lt),
+    "<=": (np.less_equal, operator.le),
+    ">": (np.greater, operator.gt),
+    ">=": (np.greater_equal, operator.ge),
+    "&": (np.logical_and, lambda x, y: bool(x and y)),
+    "|": (np.logical_or, lambda x, y: bool(x or y)),
+    "~": (np.logical_not, operator.not_),
+    "neg": (np.negative, operator.neg),
+    "abs": (np.absolute, abs),
+    "isin": (_isin, lambda x, members: x in members),
+}
+
+
+class Operation(Expression):
+    def __init__(self, symbol: str, operands: Tuple[Expression, ...]) -> None:
+        self.symbol = symbol
+        self.operands = operands
+        self._vectorized, self._scalar = _OPERATIONS[symbol]
+
+    def evaluate(self, columns: Mapping[str | None, np.ndarray]) -> np.ndarray:
+        return self._vectorized(*(operand.evaluate(columns) for operand in self.operands))
+
+    def __call__(self, row: Any) -> Any:
+        return self._scalar(*(operand(row) for operand in self.operands))
+
+    def __repr__(self) -> str:
+        if len(self.operands) == 2 and self.symbol != "isin":
+            return f"({self.operands[0]!r} {self.symbol} {self.operands[1]!r})"
+        if self.symbol == "~":
+            return f"~{self.operands[0]!r}"
+        return f"{self.symbol}({', '.join(map(repr, self.operands))})"
+
+
+def _expression(value: Any) -> Expression:
+    return value if isinstance(value, Expression) else Literal(value)
+
+def col(name: str | None = None) -> Column:
+    return Column(name)
+
+def lit(value: Any) -> Literal:
+    return Literal(value)
+
+
+def _unwrap(func: Callable) -> Callable:
+    return func.func if isinstance(func, Func) else func
+
+# Accumulators with a vectorized equivalent.
+_REDUCTIONS: Dict[Callable, np.ufunc] = {
+    operator.add: np.add,
+    operator.mul: np.multiply,
+    max: np.maximum,
+    min: np.minimum,
+}
+
+
+class ArrayEnumerable:
+    """
+    The `ArrayEnumerable` class performs LINQ-like operations on NumPy arrays: a one dimensional array, a structured
+    array or a mapping of column names to equally long arrays. `Expression` arguments (see `col`) are evaluated on
+    whole columns; any other callable is called once per row, where a row is a value of a one dimensional array or a
+    dict of column values otherwise.
+
+    Every operation is evaluated immediately. `where` only records a boolean mask over the columns, the selected rows
+    are copied out once an operation needs them in order (`take`, `sort_by`, iteration, ...).
+    """
+    def __init__(self) -> None:
+        self._columns: Dict[str | None, np.ndarray] = {None: np.empty(0)}
+        self._mask: np.ndarray | None = None
+
+    def of(self, values: np.ndarray | Mapping[str, np.ndarray] | Iterable) -> 'ArrayEnumerable':
+        """
+        The `of` method is used to create an ArrayEnumerable object from an array or a mapping of columns.
+        """
+        if isinstance(values, Mapping):
+            columns = {name: np.asarray(column) for name, column in values.items()}
+            if len({len(column) for column in columns.values()}) > 1:
+                raise ValueError("all columns must have the same length")
+        else:
+            values = np.asarray(values)
+            if values.dtype.names:
+                columns = {name: values[name] for name in values.dtype.names}
+            else:
+                columns = {None: values}
+        self._columns = columns
+        self._mask = None
+        return self
+
+    def _with(self, columns: Dict[str | None, np.ndarray], mask: np.ndarray | None) -> 'ArrayEnumerable':
+        enumerable = ArrayEnumerable()
+        enumerable._columns = columns
+        enumerable._mask = mask
+        return enumerable
+
+    def _compact(self) -> Dict[str | None, np.ndarray]:
+        if self._mask is None:
+            return self._columns
+        return {name: column[self._mask] for name, column in self._columns.items()}
+
+    def _rows(self) -> Iterable:
+        columns = self._compact()
+        if None in columns:
+            return columns[None].tolist()
+        names = list(columns)
+        return (dict(zip(names, row)) for row in zip(*(column.tolist() for column in columns.values())))
+
+    def _size(self) -> int:
+        return len(next(iter(self._columns.values()), ()))
+
+    def _evaluate(self, func: Callable, dtype: Any = None) -> np.ndarray:
+        """
+        Evaluates `func` for every row, masked or not, and returns an array aligned with the columns. Expressions are
+        evaluated on the whole columns, other callables are only called for the rows selected by the mask.
+        """
+        func = _unwrap(func)
+        if isinstance(func, Expression):
+            result = np.asarray(func.evaluate(self._columns))
+            return np.full(self._size(), result) if result.ndim == 0 else result
+        if dtype is not None:
+            result = np.fromiter(map(func, self._rows()), dtype=dtype, count=len(self))
+        else:
+            result = np.array(list(map(func, self._rows())))
+        if self._mask is None:
+            return result
+        aligned = np.zeros(self._size(), dtype=result.dtype)
+        aligned[self._mask] = result
+        return aligned
+
+    def _take(self, indices: np.ndarray | slice) -> 'ArrayEnumerable':
+        return self._with({name: column[indices] for name, column in self._compact().items()}, None)
+
+    def _selected(self, values: np.ndarray) -> np.ndarray:
+        return values if self._mask is None else values[self._mask]
+
+    @property
+    def columns(self) -> Dict[str | None, np.ndarray]:
+        return dict(self._compact())
+
+    def where(self, predicate: Callable[[T], bool]) -> 'ArrayEnumerable':
+        """
+        The `where` method is used to filter the rows based on a predicate.
+        """
+        mask = self._evaluate(predicate, bool).astype(bool, copy=False)
+        return self._with(self._columns, mask if self._mask is None else mask & self._mask)
+
+    def select(self, selector: Callable[[T], T] | Mapping[str, Callable]) -> 'ArrayEnumerable':
+        """
+        The `select` method is used to project the rows. A selector yields a one dimensional result, a mapping of names
+        to selectors yields a result with one column per entry.
+        """
+        if isinstance(selector, Mapping):
+            return self._with({name: self._evaluate(func) for name, func in selector.items()}, self._mask)
+        return self._with({None: self._evaluate(selector)}, self._mask)
+
+    def take(self, count: int) -> 'ArrayEnumerable':
+        """
+        The `take` method is used to take the first `count` rows.
+        """
+        return self._take(slice(0, max(0, count)))
+
+    def skip(self, count: int) -> 'ArrayEnumerable':
+        """
+        The `skip` method is used to skip the first `count` rows.
+        """
+        return self._take(slice(max(0, count), None))
+
+    def sort_by(self, key: Callable[[T], T], reverse: bool = False) -> 'ArrayEnumerable':
+        """
+        The `sort_by` method is used to sort the rows based on a key. Like `sorted` the sort is stable, also when
+        `reverse` is set.
+        """
+        keys = self._selected(self._evaluate(key))
+        if not reverse:
+            return self._take(np.argsort(keys, kind="stable"))
+        last = len(keys) - 1
+        return self._take(last - np.argsort(keys[::-1], kind="stable")[::-1])
+
+    def sort(self, key: Callable[[T], T], reverse: bool = False) -> 'ArrayEnumerable':
+        """
+        The `sort` method is an alias for `sort_by`.
+        """
+        return self.sort_by(key, reverse)
+
+    def aggregate(self, func: Callable[[T, T], T]) -> T:
+        """
+        The `aggregate` method is used to apply an accumulator function over the values of a one dimensional
+        ArrayEnumerable object. NumPy ufuncs and `operator.add`, `operator.mul`, `max` and `min` are reduced
+        vectorized.
+        """
+        func = _unwrap(func)
+        if None not in self._columns:
+            return reduce(func, self._rows())
+        values = self._selected(self._columns[None])
+        if len(values) == 0:
+            raise TypeError("aggregate() of empty sequence with no initial value")
+        ufunc = func if isinstance(func, np.ufunc) else _REDUCTIONS.get(func)
+        if ufunc is None:
+            return reduce(func, values.tolist())
+        return ufunc.reduce(values).item()
+
+    def aggregate_with_seed(self, func: Callable[[T, T], T], seed: T) -> T:
+        """
+        The `aggregate_with_seed` method works like `aggregate` with a seed/initial value, which is folded with the
+        first value. The reductions of `aggregate` are vectorized if the seed is a number.
+        """
+        func = _unwrap(func)
+        if None not in self._columns:
+            return reduce(func, self._rows(), seed)
+        values = self._selected(self._columns[None])
+        ufunc = func if isinstance(func, np.ufunc) else _REDUCTIONS.get(func)
+        if ufunc is None or not isinstance(seed, (int, float, np.number)):
+            return reduce(func, values.tolist(), seed)
+        return ufunc.reduce(values, initial=seed).item()
+
+    def count(self) -> int:
+        """
+        The `count` method is used to count the number of rows.
+        """
+        return len(self)
+
+    def count_where(self, predicate: Callable[[T], bool]) -> int:
+        """
+        The `count_where` method is used to count the number of rows that satisfy a predicate.
+        """
+        return int(np.count_nonzero(self._selected(self._evaluate(predicate, bool))))
+
+    def any(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `any` method is used to check if any row satisfies a predicate.
+        """
+        return bool(np.any(self._selected(self._evaluate(predicate, bool))))
+
+    def all(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `all` method is used to check if all rows satisfy a predicate.
+        """
+        return bool(np.all(self._selected(self._evaluate(predicate, bool))))
+
+    def first(self) -> T:
+        """
+        The `first` method is used to get the first row, or `None` if there are no rows.
+        """
+        return next(iter(self.take(1)), None)
+
+    def last(self) -> T:
+        """
+        The `last` method is used to get the last row, or `None` if there are no rows.
+        """
+        size = len(self)
+        return next(iter(self.skip(size - 1)), None) if size else None
+
+    def is_empty(self) -> bool:
+        """
+        The `is_empty` method is used to check if there are no rows.
+        """
+        return len(self) == 0
+
+    def foreach(self, action: Callable[[T], None]) -> None:
+        """
+        The `foreach` method is used to perform an action on each row.
+        """
+        for row in self:
+            action(row)
+
+    def to_list(self) -> List:
+        """
+        The `to_list` method is used to convert the rows to a list.
+        """
+        return list(self._rows())
+
+    def to_set(self) -> set:
+        """
+        The `to_set` method is used to convert the values of a one dimensional ArrayEnumerable object to a set.
+        """
+        return set(self._rows())
+
+    def to_numpy(self) -> np.ndarray | Dict[str, np.ndarray]:
+        """
+        The `to_numpy` method returns the array of a one dimensional ArrayEnumerable object, otherwise the columns.
+        """
+        columns = self._compact()
+        return columns[None] if None in columns else dict(columns)
+
+    def __len__(self) -> int:
+        if self._mask is None:
+            return self._size()
+        return int(np.count_nonzero(self._mask))
+
+    def __or__(self, func: Callable) -> UnionType:
+        if isinstance(func, Predicate):
+            return self.where(func)
+        elif isinstance(func, Selector):
+            return self.select(func)
+        elif isinstance(func, Accumulator):
+            return self.aggregate(func)
+        elif isinstance(func, Action):
+            return self.foreach(func)
+        else:
+            return func(self)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._rows())
@@ -0,0 +1,101 @@
+import unittest
+import operator
+from enumerables import *
+
+try:
+    import numpy as np
+    from array_enumerables import *
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestArrayEnumerables(unittest.TestCase):
+    def setUp(self):
+        self.orders = ArrayEnumerable().of({
+            "price": np.array([10.0, 25.0, 3.5, 60.0, 12.0]),
+            "qty": np.array([3, 5, 40, 1, 9]),
+        })
+
+    def test_expression_repr(self):
+        expression = col("price") * col("qty") > 100
+        self.assertEqual(repr(expression), "((col('price') * col('qty')) > 100)")
+        self.assertEqual(expression.symbol, ">")
+        self.assertEqual(expression.operands[0].symbol, "*")
+
+    def test_expression_is_a_callable(self):
+        expression = (col("price") * col("qty") > 100) & ~(col("qty") == 1)
+        self.assertTrue(expression({"price": 60.0, "qty": 2}))
+        self.assertFalse(expression({"price": 60.0, "qty": 1}))
+        result = Enumerable().of(range(10)).where(col() % 3 == 0).select(col() * 2).to_list()
+        self.assertEqual(result, [0, 6, 12, 18])
+
+    def test_incomplete_expression_cannot_be_created(self):
+        class RowOnly(Expression):
+            def __call__(self, row):
+                return row
+        with self.assertRaises(TypeError):
+            RowOnly()
+
+    def test_where_select_with_expressions(self):
+        result = self.orders.where(col("price") * col("qty") > 100).select(col("price") * col("qty")).to_list()
+        self.assertEqual(result, [125.0, 140.0, 108.0])
+
+    def test_where_with_callables(self):
+        result = self.orders.where(lambda row: row["qty"] > 4).select({"total": col("price") * col("qty")}).to_list()
+        self.assertEqual(result, [{"total": 125.0}, {"total": 140.0}, {"total": 108.0}])
+
+    def test_count_where_any_all(self):
+        self.assertEqual(self.orders.count_where(col("qty") > 4), 3)
+        self.assertEqual(self.orders.count_where(Predicate(lambda row: row["qty"] > 4)), 3)
+        self.assertTrue(self.orders.any(col("price") > 50))
+        self.assertFalse(self.orders.all(col("qty").isin([1, 3, 5])))
+
+    def test_sort_by(self):
+        values = ArrayEnumerable().of(np.array([3, 1, 2, 1, 3]))
+        self.assertEqual(values.sort_by(col()).to_list(), [1, 1, 2, 3, 3])
+        pairs = ArrayEnumerable().of({"key": np.array([1, 2, 1, 2]), "id": np.arange(4)})
+        result = pairs.sort_by(col("key"), reverse=True).select(col("id")).to_list()
+        self.assertEqual(result, [1, 3, 0, 2])
+        result = pairs.sort_by(lambda row: -row["id"]).select(col("id")).to_list()
+        self.assertEqual(result, [3, 2, 1, 0])
+
+    def test_aggregate(self):
+        values = ArrayEnumerable().of(np.arange(1, 6))
+        self.assertEqual(values.aggregate(np.add), 15)
+        self.assertEqual(values.aggregate(operator.add), 15)
+        self.assertEqual(values.aggregate(max), 5)
+        self.assertEqual(values.aggregate(lambda x, y: x * 10 + y), 12345)
+        self.assertEqual(values.aggregate_with_seed(operator.add, 10), 25)
+        self.assertEqual(values.aggregate_with_seed(max, 9), 9)
+        self.assertEqual(values.where(col() > 100).aggregate_with_seed(operator.add, 10), 10)
+        self.assertEqual(values.aggregate_with_seed(lambda acc, x: acc - x, 10), -5)
+        self.assertEqual(values.where(col() < 4).aggregate_with_seed(lambda acc, x: acc + [x], []), [1, 2, 3])
+        self.assertEqual(self.orders.take(2).aggregate_with_seed(lambda acc, row: acc + row["qty"], 0), 8)
+        self.assertEqual(values | Predicate(col() > 2) | Accumulator(operator.add), 12)
+
+    def test_take_skip_first_last(self):
+        values = ArrayEnumerable().of(np.arange(10))
+        self.assertEqual(values.skip(2).take(3).to_list(), [2, 3, 4])
+        self.assertEqual((values.first(), values.last(), values.count()), (0, 9, 10))
+        self.assertIsNone(values.where(col() > 100).first())
+
+    def test_structured_array(self):
+        records = np.array([(1, 2.0), (2, 3.0)], dtype=[("id", "i4"), ("score", "f8")])
+        result = ArrayEnumerable().of(records).where(col("score") > 2.5).to_list()
+        self.assertEqual(result, [{"id": 2, "score": 3.0}])
+
+    def test_where_masks_rows_until_they_are_needed(self):
+        filtered = ArrayEnumerable().of({"x": np.arange(10)}).where(col("x") % 2 == 0).where(col("x") > 2)
+        self.assertEqual(filtered.count_where(col("x") > 5), 2)
+        self.assertEqual(filtered.select({"y": col("x") * 10}).to_numpy()["y"].tolist(), [40, 60, 80])
+        seen = []
+        filtered.select(lambda row: seen.append(row["x"]) or row["x"]).to_list()
+        self.assertEqual(seen, [4, 6, 8])
+
+    def test_interoperates_with_enumerable(self):
+        result = Enumerable().of(ArrayEnumerable().of(np.arange(5))).select(str).to_list()
+        self.assertEqual(result, ["0", "1", "2", "3", "4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,293 @@
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from types import UnionType
+from typing import Any, Awaitable, Callable, List
+from enumerable_funcs import Predicate, Selector, Accumulator, Action, T
+import asyncio
+import inspect
+
+async def _call(func: Callable, *args: Any) -> Any:
+    result = func(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+async def _from_iterable(values: Iterable) -> AsyncIterator:
+    for x in values:
+        yield x
+
+def _aiter(values: AsyncIterable | Iterable) -> AsyncIterator:
+    if isinstance(values, AsyncIterable):
+        return aiter(values)
+    return _from_iterable(values)
+
+async def _ordered(values: AsyncIterable, func: Callable, max_concurrency: int) -> AsyncIterator:
+    """
+    Yields `(x, func(x))` in source order while up to `max_concurrency` calls of `func` run at once.
+    """
+    pending: deque[tuple[Any, asyncio.Future]] = deque()
+    try:
+        async for x in values:
+            pending.append((x, asyncio.ensure_future(_call(func, x))))
+            if len(pending) >= max_concurrency:
+                x, task = pending.popleft()
+                yield x, await task
+        while pending:
+            x, task = pending.popleft()
+            yield x, await task
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+async def _where(values: AsyncIterable, predicate: Callable, max_concurrency: int) -> AsyncIterator:
+    if max_concurrency > 1:
+        async for x, keep in _ordered(values, predicate, max_concurrency):
+            if keep:
+                yield x
+        return
+    async for x in values:
+        if await _call(predicate, x):
+            yield x
+
+async def _select(values: AsyncIterable, selector: Callable, max_concurrency: int) -> AsyncIterator:
+    if max_concurrency > 1:
+        async for _, y in _ordered(values, selector, max_concurrency):
+            yield y
+        return
+    async for x in values:
+        yield await _call(selector, x)
+
+async def _select_many(values: AsyncIterable, selector: Callable) -> AsyncIterator:
+    async for x in values:
+        async for y in _aiter(await _call(selector, x)):
+            yield y
+
+async def _take(values: AsyncIterable, count: int) -> AsyncIterator:
+    if count <= 0:
+        return
+    async for x in values:
+        yield x
+        count -= 1
+        if count == 0:
+            return
+
+async def _take_while(values: AsyncIterable, predicate: Callable) -> AsyncIterator:
+    async for x in values:
+        if not await _call(predicate, x):
+            return
+        yield x
+
+async def _skip(values: AsyncIterable, count: int) -> AsyncIterator:
+    async for x in values:
+        if count > 0:
+            count -= 1
+            continue
+        yield x
+
+async def _skip_while(values: AsyncIterable, predicate: Callable) -> AsyncIterator:
+    skipping = True
+    async for x in values:
+        if skipping and await _call(predicate, x):
+            continue
+        skipping = False
+        yield x
+
+async def _distinct_by(values: AsyncIterable, key_selector: Callable) -> AsyncIterator:
+    seen = set()
+    async for x in values:
+        key = await _call(key_selector, x)
+        if key not in seen:
+            seen.add(key)
+            yield x
+
+
+class AsyncEnumerable:
+    """
+    The `AsyncEnumerable` class is used to perform LINQ-like operations on async iterables. Every selector, predicate,
+    accumulator and action may be a regular function or an `async def` function. Terminal methods are coroutines.
+    """
+    def __init__(self) -> None:
+        self._values: AsyncIterable | Iterable = ()
+
+    def of(self, values: AsyncIterable | Iterable) -> 'AsyncEnumerable':
+        """
+        The `of` method is used to create an AsyncEnumerable object from an async iterable or a regular iterable.
+        """
+        self._values = values
+        return self
+
+    def empty(self) -> 'AsyncEnumerable':
+        """
+        The `empty` method is used to create an empty AsyncEnumerable object.
+        """
+        return AsyncEnumerable().of(())
+
+    def where(self, predicate: Callable[[T], bool | Awaitable[bool]], max_concurrency: int = 1) -> 'AsyncEnumerable':
+        """
+        The `where` method is used to filter the values of the AsyncEnumerable object based on a predicate. Up to
+        `max_concurrency` predicate calls run at once, values are still returned in source order.
+        """
+        return AsyncEnumerable().of(_where(_aiter(self._values), predicate, max_concurrency))
+
+    def select(self, selector: Callable[[T], T | Awaitable[T]], max_concurrency: int = 1) -> 'AsyncEnumerable':
+        """
+        The `select` method is used to project the values of the AsyncEnumerable object based on a selector. Up to
+        `max_concurrency` selector calls run at once, results are still returned in source order.
+        """
+        return AsyncEnumerable().of(_select(_aiter(self._values), selector, max_concurrency))
+
+    def select_many(self, selector: Callable[[T], Iterable[T] | AsyncIterable[T]]) -> 'AsyncEnumerable':
+        """
+        The `select_many` method flattens the values of the AsyncEnumerable object based on a selector which returns
+        either an iterable or an async iterable.
+        """
+        return AsyncEnumerable().of(_select_many(_aiter(self._values), selector))
+
+    def distinct(self) -> 'AsyncEnumerable':
+        """
+        The `distinct` method is used to remove duplicate values from the AsyncEnumerable object.
+        """
+        return self.distinct_by(lambda x: x)
+
+    def distinct_by(self, key_selector: Callable[[T], T]) -> 'AsyncEnumerable':
+        """
+        The `distinct_by` method is used to remove duplicate values from the AsyncEnumerable object based on a key
+        selector.
+        """
+        return AsyncEnumerable().of(_distinct_by(_aiter(self._values), key_selector))
+
+    def take(self, count: int) -> 'AsyncEnumerable':
+        """
+        The `take` method is used to take the first `count` values from the AsyncEnumerable object.
+        """
+        return AsyncEnumerable().of(_take(_aiter(self._values), count))
+
+    def take_while(self, predicate: Callable[[T], bool]) -> 'AsyncEnumerable':
+        """
+        The `take_while` method is used to take values from the AsyncEnumerable object while the predicate is true.
+        """
+        return AsyncEnumerable().of(_take_while(_aiter(self._values), predicate))
+
+    def skip(self, count: int) -> 'AsyncEnumerable':
+        """
+        The `skip` method is used to skip the first `count` values from the AsyncEnumerable object.
+        """
+        return AsyncEnumerable().of(_skip(_aiter(self._values), count))
+
+    def skip_while(self, predicate: Callable[[T], bool]) -> 'AsyncEnumerable':
+        """
+        The `skip_while` method is used to skip values from the AsyncEnumerable object while the predicate is true.
+        """
+        return AsyncEnumerable().of(_skip_while(_aiter(self._values), predicate))
+
+    async def aggregate(self, func: Callable[[T, T], T]) -> T:
+        """
+        The `aggregate` method is used to apply an accumulator function over the values of the AsyncEnumerable object.
+        """
+        values = _aiter(self._values)
+        try:
+            result = await anext(values)
+        except StopAsyncIteration:
+            raise TypeError("aggregate() of empty sequence with no initial value") from None
+        async for x in values:
+            result = await _call(func, result, x)
+        return result
+
+    async def aggregate_with_seed(self, func: Callable[[T, T], T], seed: T) -> T:
+        """
+        The `aggregate_with_seed` method is used to apply an accumulator function over the values of the
+        AsyncEnumerable object with a seed/initial value.
+        """
+        async for x in _aiter(self._values):
+            seed = await _call(func, seed, x)
+        return seed
+
+    async def count(self) -> int:
+        """
+        The `count` method is used to count the number of values in the AsyncEnumerable object.
+        """
+        counter = 0
+        async for _ in _aiter(self._values):
+            counter += 1
+        return counter
+
+    async def count_where(self, predicate: Callable[[T], bool]) -> int:
+        """
+        The `count_where` method is used to count the number of values in the AsyncEnumerable object that satisfy a
+        predicate.
+        """
+        return await self.where(predicate).count()
+
+    async def first(self) -> T:
+        """
+        The `first` method is used to get the first value of the AsyncEnumerable object. If the AsyncEnumerable
+        object is empty, it returns `None`.
+        """
+        return await anext(_aiter(self._values), None)
+
+    async def first_where(self, predicate: Callable[[T], bool]) -> T:
+        """
+        The `first_where` method is used to get the first value of the AsyncEnumerable object that satisfies a
+        predicate.
+        """
+        return await self.where(predicate).first()
+
+    async def foreach(self, action: Callable[[T], None]) -> None:
+        """
+        The `foreach` method is used to perform an action on each value of the AsyncEnumerable object.
+        """
+        async for x in _aiter(self._values):
+            await _call(action, x)
+
+    async def any(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `any` method is used to check if any value in the AsyncEnumerable object satisfies a predicate.
+        """
+        async for x in _aiter(self._values):
+            if await _call(predicate, x):
+                return True
+        return False
+
+    async def all(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `all` method is used to check if all values in the AsyncEnumerable object satisfy a predicate.
+        """
+        async for x in _aiter(self._values):
+            if not await _call(predicate, x):
+                return False
+        return True
+
+    async def is_empty(self) -> bool:
+        """
+        The `is_empty` method is used to check if the AsyncEnumerable object is empty.
+        """
+        async for _ in _aiter(self._values):
+            return False
+        return True
+
+    async def to_list(self) -> List:
+        """
+        The `to_list` method is used to convert the AsyncEnumerable object to a list.
+        """
+        return [x async for x in _aiter(self._values)]
+
+    async def to_set(self) -> set:
+        """
+        The `to_set` method is used to convert the AsyncEnumerable object to a set.
+        """
+        return {x async for x in _aiter(self._values)}
+
+    def __or__(self, func: Callable) -> UnionType:
+        if isinstance(func, Predicate):
+            return self.where(func)
+        elif isinstance(func, Selector):
+            return self.select(func)
+        elif isinstance(func, Accumulator):
+            return self.aggregate(func)
+        elif isinstance(func, Action):
+            return self.foreach(func)
+        else:
+            return func(self)
+
+    def __aiter__(self) -> AsyncIterator:
+        return _aiter(self._values)
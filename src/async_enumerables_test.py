@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+from async_enumerables import *
+
+async def numbers(count: int):
+    for x in range(count):
+        await asyncio.sleep(0)
+        yield x
+
+class TestAsyncEnumerables(unittest.IsolatedAsyncioTestCase):
+    async def test_where_select(self):
+        async def is_even(x):
+            return x % 2 == 0
+        result = await AsyncEnumerable().of(numbers(10)).where(is_even).select(lambda x: x * 2).to_list()
+        expected = [0, 4, 8, 12, 16]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    async def test_select_many(self):
+        async def pairs(x):
+            return numbers(x)
+        result = await AsyncEnumerable().of([1, 2, 3]).select_many(pairs).to_list()
+        expected = [0, 0, 1, 0, 1, 2]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    async def test_take_skip(self):
+        result = await AsyncEnumerable().of(numbers(10)).skip(2).take(3).to_list()
+        expected = [2, 3, 4]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+        result = await AsyncEnumerable().of(numbers(10)).skip_while(lambda x: x < 7).take_while(lambda x: x < 9).to_list()
+        self.assertEqual(result, [7, 8])
+
+    async def test_terminals(self):
+        enumerable = lambda: AsyncEnumerable().of(numbers(6))
+        self.assertEqual(await enumerable().aggregate(lambda x, y: x + y), 15)
+        self.assertEqual(await enumerable().aggregate_with_seed(lambda x, y: x + y, 10), 25)
+        self.assertEqual(await enumerable().count(), 6)
+        self.assertEqual(await enumerable().count_where(lambda x: x > 3), 2)
+        self.assertEqual(await enumerable().first(), 0)
+        self.assertEqual(await enumerable().first_where(lambda x: x > 3), 4)
+        self.assertTrue(await enumerable().any(lambda x: x == 5))
+        self.assertFalse(await enumerable().all(lambda x: x < 5))
+        self.assertFalse(await enumerable().is_empty())
+        self.assertEqual(await enumerable().select(lambda x: x % 2).distinct().to_set(), {0, 1})
+        with self.assertRaises(TypeError):
+            await AsyncEnumerable().empty().aggregate(lambda x, y: x + y)
+
+    async def test_piping(self):
+        async def double(x):
+            return x * 2
+        result = await (
+            AsyncEnumerable().of(numbers(10))
+            | Selector(double)
+            | Predicate(lambda x: x > 10)
+            | Accumulator(lambda x, y: x + y)
+        )
+        expected = sum([12, 14, 16, 18])
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    async def test_max_concurrency_keeps_order(self):
+        running = 0
+        peak = 0
+
+        async def slow(x):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - x % 5))
+            running -= 1
+            return x * 10
+
+        result = await AsyncEnumerable().of(range(20)).select(slow, max_concurrency=4).to_list()
+        self.assertEqual(result, [x * 10 for x in range(20)])
+        self.assertEqual(peak, 4)
+
+    async def test_concurrent_where(self):
+        async def is_odd(x):
+            await asyncio.sleep(0.001 * (10 - x))
+            return x % 2 == 1
+        result = await AsyncEnumerable().of(range(10)).where(is_odd, max_concurrency=3).to_list()
+        self.assertEqual(result, [1, 3, 5, 7, 9])
+
+    async def test_async_iteration(self):
+        result = [x async for x in AsyncEnumerable().of(numbers(3))]
+        self.assertEqual(result, [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+Benchmarks for pynq. Run them from the `src` directory, e.g. `python -m benchmarks.fusion_bench`.
+"""
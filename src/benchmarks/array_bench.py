@@ -0,0 +1,30 @@
+"""
+Numeric filter and projection on columns: `Enumerable` with lambdas over rows against `ArrayEnumerable` with
+expressions. Requires NumPy.
+
+    python -m benchmarks.array_bench [size]
+"""
+import sys
+from timeit import repeat
+import numpy as np
+from enumerables import Enumerable
+from array_enumerables import ArrayEnumerable, col
+
+
+def main(size: int = 10_000_000) -> None:
+    rng = np.random.default_rng(0)
+    price = rng.uniform(1, 100, size)
+    qty = rng.integers(1, 10, size)
+    rows = list(zip(price.tolist(), qty.tolist()))
+    columns = ArrayEnumerable().of({"price": price, "qty": qty})
+
+    per_row = lambda: Enumerable().of(rows).where(lambda r: r[0] * r[1] > 100).select(lambda r: r[0] * r[1]).count()
+    vectorized = lambda: columns.where(col("price") * col("qty") > 100).select(col("price") * col("qty")).count()
+    assert per_row() == vectorized()
+    old = min(repeat(per_row, number=1, repeat=3))
+    new = min(repeat(vectorized, number=1, repeat=3))
+    print(f"per row: {old * 1e3:9.1f} ms, vectorized: {new * 1e3:7.1f} ms ({old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,45 @@
+"""
+Collecting numbers into a list against a typed array, and querying a list against a zero-copy view of a buffer. A list
+holds a pointer per value plus an int object per value, an array('q') 8 bytes per value. Slicing, counting and
+indexing a buffer view reads no values at all.
+
+    python -m benchmarks.buffer_bench [values]
+"""
+import sys
+import tracemalloc
+from array import array
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def best(func) -> float:
+    return min(repeat(func, number=1, repeat=3)) * 1e3
+
+
+def main(values: int = 1_000_000) -> None:
+    query = Enumerable().of(range(values)).select(lambda x: x * 1_000)
+    print(f"{values} values")
+    for name, run in (("to_list", query.to_list), ("to_array('q')", lambda: query.to_array("q"))):
+        print(f"{name:>14}: {best(run):8.1f} ms, peak {peak_memory(run):7.2f} MiB")
+    numbers = list(range(values))
+    buffer = Enumerable.of_buffer(array("q", numbers))
+    listed = Enumerable().of(numbers)
+    for name, run in (
+        ("sum", lambda source: source.aggregate_with_seed(int.__add__, 0)),
+        ("skip/take/count", lambda source: source.skip(values // 2).take(values // 4).count()),
+        ("skip/last", lambda source: source.skip(values // 2).last()),
+        ("skip/to_array", lambda source: source.skip(values // 2).to_array("q")),
+    ):
+        print(f"{name:>16}: list {best(lambda: run(listed)):8.3f} ms, buffer {best(lambda: run(buffer)):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,42 @@
+"""
+An expensive selector (a normalization costing `cost` microseconds of CPU) over keys with a skewed, Zipf-like
+popularity, as in geo lookups or user-agent parsing: uncached, and with caches of growing size shared by every query.
+The hit ratios come from the cache counters, which is how a cache is sized from production traffic.
+
+    python -m benchmarks.cache_bench [queries] [rows] [keys] [cost]
+"""
+import random
+import sys
+import time
+from caches import LRU, TTL
+from enumerables import Enumerable
+
+
+def main(queries: int = 50, rows: int = 2_000, keys: int = 10_000, cost: int = 20) -> None:
+    def normalize(key):
+        deadline = time.perf_counter() + cost / 1e6
+        while time.perf_counter() < deadline:
+            pass
+        return key % 977
+
+    rng = random.Random(1)
+    weights = [1 / (rank + 1) for rank in range(keys)]
+    batches = [rng.choices(range(keys), weights, k=rows) for _ in range(queries)]
+    print(f"{queries} queries of {rows} rows over {keys} keys, {cost} us per call")
+    expected = None
+    for name, cache in (("uncached", None), ("LRU(100)", LRU(100)), ("LRU(1000)", LRU(1_000)),
+                        ("LRU(10000)", LRU(10_000)), ("TTL(60)", TTL(60))):
+        started = time.perf_counter()
+        results = [Enumerable().of(batch).select(normalize, cache=cache).to_list() for batch in batches]
+        elapsed = time.perf_counter() - started
+        expected = expected or results
+        assert results == expected
+        line = f"{name:>10}: {elapsed * 1e3:8.1f} ms"
+        if cache is not None:
+            stats = cache.stats()
+            line += f", hit ratio {stats.hit_ratio:6.1%}, {stats.evictions} evictions, {stats.size} entries"
+        print(line)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:5]))
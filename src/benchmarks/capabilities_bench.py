@@ -0,0 +1,36 @@
+"""
+Operators on `Sequence` sources: the generic iterator based functions from `enumerable_funcs` (which is what every
+`Enumerable` method used before source capabilities were tracked) against the `Enumerable` methods.
+
+    python -m benchmarks.capabilities_bench [size]
+"""
+import sys
+from timeit import repeat
+from enumerables import Enumerable
+from enumerable_funcs import count, last, is_empty, skip, select, reverse, first
+
+double = lambda x: x * 2
+
+
+def cases(values):
+    enumerable = Enumerable().of(values)
+    return (
+        ("count", lambda: count(select(values, double)), lambda: enumerable.select(double).count()),
+        ("last", lambda: last(select(values, double)), lambda: enumerable.select(double).last()),
+        ("is_empty", lambda: is_empty(values), lambda: enumerable.is_empty()),
+        ("skip(n - 10)", lambda: list(skip(values, len(values) - 10)), lambda: enumerable.skip(len(values) - 10).to_list()),
+        ("reverse.first", lambda: first(reverse(values)), lambda: enumerable.reverse().first()),
+    )
+
+
+def main(size: int = 10_000_000) -> None:
+    for name, values in (("range", range(size)), ("list", list(range(size)))):
+        for operator, before, after in cases(values):
+            assert before() == after(), operator
+            old = min(repeat(before, number=1, repeat=3))
+            new = min(repeat(after, number=1, repeat=3))
+            print(f"{name:>5} {operator:>14}: {old * 1e3:10.3f} ms -> {new * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
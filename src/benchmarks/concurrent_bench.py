@@ -0,0 +1,40 @@
+"""
+A selector which blocks on I/O for `latency` milliseconds (simulated with `time.sleep`, which releases the GIL like a
+socket read) run serially with `select` against `select_concurrent` with growing thread pools, ordered and unordered.
+The last line reads an endless source with `take`, which only works because `select_concurrent` reads the source as
+calls finish instead of submitting all of it.
+
+    python -m benchmarks.concurrent_bench [values] [latency]
+"""
+import itertools
+import sys
+import time
+from enumerables import Enumerable
+
+
+def main(values: int = 200, latency: float = 5) -> None:
+    def fetch(x):
+        time.sleep(latency / 1000)
+        return x
+
+    def timed(run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
+
+    source = Enumerable().of(range(values))
+    print(f"{values} calls of {latency} ms")
+    serial = timed(lambda: source.select(fetch).to_list())
+    print(f"{'select':>32}: {serial * 1e3:8.1f} ms")
+    for workers in (4, 16, 64):
+        for ordered in (True, False):
+            elapsed = timed(lambda: source.select_concurrent(fetch, workers, ordered=ordered).to_list())
+            name = f"select_concurrent({workers}{'' if ordered else ', unordered'})"
+            print(f"{name:>32}: {elapsed * 1e3:8.1f} ms ({serial / elapsed:.1f}x)")
+    endless = Enumerable().of(itertools.count())
+    elapsed = timed(lambda: endless.select_concurrent(fetch, 16).take(values).to_list())
+    print(f"{'endless source, take':>32}: {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(float(arg) if i else int(arg) for i, arg in enumerate(sys.argv[1:3])))
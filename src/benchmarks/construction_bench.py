@@ -0,0 +1,57 @@
+"""
+Cost of building an `Enumerable` chain without enumerating it, per chain step, compared to a node which allocates and
+acquires a `threading.Lock` for every step (the design `Enumerable` used before its nodes became immutable).
+
+    python -m benchmarks.construction_bench [steps]
+"""
+import sys
+from threading import Lock
+from timeit import repeat
+from enumerables import Enumerable
+import query_plan
+
+is_even = lambda x: x % 2 == 0
+double = lambda x: x * 2
+
+
+class LockedNode:
+    def __init__(self) -> None:
+        self._values = []
+        self._plan = ()
+        self._lock = Lock()
+
+    def of(self, values):
+        with self._lock:
+            self._values = values
+            self._plan = ()
+            return self
+
+    def _then(self, stage):
+        node = LockedNode().of(self._values)
+        node._plan = self._plan + (stage,)
+        return node
+
+    def where(self, predicate):
+        with self._lock:
+            return self._then(query_plan.Where(predicate))
+
+    def select(self, selector):
+        with self._lock:
+            return self._then(query_plan.Select(selector))
+
+
+def build(node, steps: int) -> None:
+    node = node.of(range(10))
+    for _ in range(steps // 2):
+        node = node.where(is_even).select(double)
+
+
+def main(steps: int = 20) -> None:
+    number = 20_000
+    for name, node in (("locked", LockedNode()), ("immutable", Enumerable())):
+        best = min(repeat(lambda: build(node, steps), number=number, repeat=5))
+        print(f"{name:>10}: {best * 1e9 / (number * steps):8.1f} ns/step")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,74 @@
+"""
+File sources and sinks against the hand-rolled code they replace: `Enumerable().of(open(path))` with per-line
+parsing, and writing one line at a time. The peak memory of the sources stays at about one block however big the file is.
+
+    python -m benchmarks.file_bench [rows]
+"""
+import csv
+import json
+import os
+import sys
+import tracemalloc
+from tempfile import TemporaryDirectory
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def hand_rolled_lines(path):
+    with open(path) as file:
+        return Enumerable().of(file).select(lambda line: line.rstrip("\n")).count_where(lambda line: line.endswith("0"))
+
+
+def hand_rolled_jsonl(path):
+    with open(path) as file:
+        rows = Enumerable().of(file).select(json.loads).where(lambda row: row["level"] == "error")
+        return rows.select(lambda row: row["status"]).aggregate_with_seed(int.__add__, 0)
+
+
+def hand_rolled_csv(path):
+    with open(path, newline="") as file:
+        rows = Enumerable().of(csv.DictReader(file)).where(lambda row: row["level"] == "error")
+        return rows.select(lambda row: int(row["status"])).aggregate_with_seed(int.__add__, 0)
+
+
+def hand_rolled_write(rows, path):
+    with open(path, "w") as file:
+        for row in rows:
+            file.write(json.dumps(row) + "\n")
+
+
+def main(rows: int = 1_000_000) -> None:
+    with TemporaryDirectory() as directory:
+        jsonl = os.path.join(directory, "events.jsonl")
+        records = [{"id": i, "level": "error" if i % 10 == 0 else "info", "status": i % 500, "message": "x" * 40}
+                   for i in range(rows)]
+        Enumerable().of(records).to_jsonl(jsonl)
+        table = os.path.join(directory, "events.csv")
+        Enumerable().of(records).to_csv(table)
+        is_error = lambda row: row["level"] == "error"
+        status = lambda row: row["status"]
+        cases = (
+            ("lines", lambda: hand_rolled_lines(jsonl),
+             lambda: Enumerable.from_lines(jsonl).count_where(lambda line: line.endswith("0"))),
+            ("lines/mmap", lambda: hand_rolled_lines(jsonl),
+             lambda: Enumerable.from_lines(jsonl, use_mmap=True).count_where(lambda line: line.endswith("0"))),
+            ("jsonl", lambda: hand_rolled_jsonl(jsonl),
+             lambda: Enumerable.from_jsonl(jsonl).where(is_error).select(status).aggregate_with_seed(int.__add__, 0)),
+            ("csv", lambda: hand_rolled_csv(table),
+             lambda: Enumerable.from_csv(table, columns=["level", "status"], types={"status": int})
+             .where(is_error).select(status).aggregate_with_seed(int.__add__, 0)),
+            ("write jsonl", lambda: hand_rolled_write(records, jsonl), lambda: Enumerable().of(records).to_jsonl(jsonl)),
+        )
+        print(f"{os.path.getsize(jsonl) / 2 ** 20:.0f} MiB of JSON lines, {os.path.getsize(table) / 2 ** 20:.0f} MiB of CSV")
+        for name, before, after in cases:
+            old = min(repeat(before, number=1, repeat=3))
+            new = min(repeat(after, number=1, repeat=3))
+            print(f"{name:>12}: hand-rolled {old * 1e3:8.1f} ms, pynq {new * 1e3:8.1f} ms ({old / new:.2f}x)")
+        tracemalloc.start()
+        Enumerable.from_jsonl(jsonl).where(is_error).count()
+        print(f"peak memory of from_jsonl: {tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f} MiB")
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,75 @@
+"""
+Per-element overhead of an `Enumerable` chain compared to a hand-written loop and to the stacked
+`filter`/`map`/`islice` iterators built directly from `enumerable_funcs`, with plain callables and
+with `Predicate`/`Selector` wrappers (the pipe syntax).
+
+    python -m benchmarks.fusion_bench [size]
+"""
+import sys
+from timeit import repeat
+from enumerables import Enumerable
+from enumerable_funcs import Predicate, Selector, where, select, take, skip
+
+is_even = lambda x: x % 2 == 0
+not_five = lambda x: x % 5 != 0
+double = lambda x: x * 2
+add_one = lambda x: x + 1
+below = lambda x: x < 10 ** 9
+
+
+def hand_written(values, limit):
+    out = []
+    seen = 0
+    for x in values:
+        if x % 2 == 0 and x % 5 != 0:
+            x = x * 2 + 1
+            if x < 10 ** 9:
+                seen += 1
+                if seen > 10:
+                    out.append(x)
+                    if len(out) >= limit:
+                        break
+    return out
+
+
+def stacked(values, limit, wrap=False):
+    p, s = (Predicate, Selector) if wrap else (lambda f: f, lambda f: f)
+    values = where(where(values, p(is_even)), p(not_five))
+    values = select(select(values, s(double)), s(add_one))
+    values = take(skip(where(values, p(below)), 10), limit)
+    return list(values)
+
+
+def enumerable(values, limit, wrap=False):
+    p, s = (Predicate, Selector) if wrap else (lambda f: f, lambda f: f)
+    return (
+        Enumerable().of(values)
+        .where(p(is_even))
+        .where(p(not_five))
+        .select(s(double))
+        .select(s(add_one))
+        .where(p(below))
+        .skip(10)
+        .take(limit)
+        .to_list()
+    )
+
+
+def main(size: int = 1_000_000) -> None:
+    values = range(size)
+    expected = hand_written(values, size)
+    cases = (
+        ("hand-written", lambda: hand_written(values, size)),
+        ("stacked", lambda: stacked(values, size)),
+        ("enumerable", lambda: enumerable(values, size)),
+        ("stacked/wrapped", lambda: stacked(values, size, wrap=True)),
+        ("enumerable/wrapped", lambda: enumerable(values, size, wrap=True)),
+    )
+    for name, func in cases:
+        assert func() == expected, name
+        best = min(repeat(func, number=1, repeat=5))
+        print(f"{name:>18}: {best * 1e9 / size:8.1f} ns/element")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,65 @@
+"""
+`aggregate_by` and `group_by` against the ways dashboards grouped before them: `to_list` plus a dict loop, and one
+`count_where` pass per key. `aggregate_by` keeps one state per group, so its peak memory does not grow with the rows.
+The dict loop inlines its key and value expressions, `aggregate_by` calls them, which `operator.itemgetter` makes cheap.
+With `max_groups` below the number of groups the states are spilled to disk; the keys of this benchmark cycle, the
+worst case, where almost every value ends up in a spilled state.
+
+    python -m benchmarks.group_bench [rows] [groups]
+"""
+import sys
+import tracemalloc
+from operator import itemgetter
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def dict_loop(query):
+    totals = {}
+    for row in query.to_list():
+        total = totals.get(row[0])
+        if total is None:
+            totals[row[0]] = [1, row[1]]
+        else:
+            total[0] += 1
+            total[1] += row[1]
+    return [{"key": key, "count": count, "sum": amount} for key, (count, amount) in totals.items()]
+
+
+def count_where_per_key(query, keys):
+    return [{"key": key, "count": query.count_where(lambda row: row[0] == key)} for key in keys]
+
+
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main(rows: int = 1_000_000, groups: int = 100) -> None:
+    region, amount = lambda row: row[0], lambda row: row[1]
+    replayable = Enumerable().of([(i % groups, i % 97) for i in range(rows)])
+    cases = (
+        ("to_list + dict loop", lambda: dict_loop(replayable)),
+        ("group_by + sum", lambda: [(group.key, len(group), sum(map(amount, group)))
+                                    for group in replayable.group_by(region)]),
+        ("aggregate_by", lambda: replayable.aggregate_by(region, count=True, sum=amount).to_list()),
+        ("aggregate_by itemgetter", lambda: replayable.aggregate_by(itemgetter(0), count=True, sum=itemgetter(1)).to_list()),
+        ("aggregate_by spilled", lambda: replayable.aggregate_by(region, count=True, sum=amount,
+                                                                 max_groups=max(1, groups // 4)).to_list()),
+    )
+    print(f"{rows} rows, {groups} groups")
+    for name, run in cases:
+        best = min(repeat(run, number=1, repeat=3))
+        print(f"{name:>24}: {best * 1e3:8.1f} ms, peak {peak_memory(run):6.2f} MiB")
+    keys = range(min(groups, 10))
+    per_key = min(repeat(lambda: count_where_per_key(replayable, keys), number=1, repeat=3))
+    single = min(repeat(lambda: replayable.aggregate_by(region, count=True).to_list(), number=1, repeat=3))
+    print(f"counts of {len(keys)} keys: count_where per key {per_key * 1e3:.1f} ms, aggregate_by {single * 1e3:.1f} ms "
+          f"({per_key / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
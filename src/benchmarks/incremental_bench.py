@@ -0,0 +1,57 @@
+"""
+A dashboard refreshing the same queries while its source grows: re-running them over the whole history on every
+refresh against a materialized query, which only processes the values appended since the previous refresh. The
+re-run cost grows with the history, the materialized one stays proportional to the batch.
+
+    python -m benchmarks.incremental_bench [refreshes] [batch]
+"""
+import sys
+import time
+from enumerables import Enumerable
+from incremental import LiveSource
+
+
+def is_error(row):
+    return row[1] >= 500
+
+
+def service(row):
+    return row[0]
+
+
+def latency(row):
+    return row[2]
+
+
+def add_latency(total, row):
+    return total + row[2]
+
+
+def refresh(errors):
+    return errors.count(), errors.aggregate_with_seed(add_latency, 0), errors.aggregate_by(service, max=latency).to_list()
+
+
+def main(refreshes: int = 200, batch: int = 5_000) -> None:
+    history = []
+    source = LiveSource()
+    view = Enumerable().of(source).where(is_error).materialize()
+    times = {"re-run": [], "materialized": []}
+    for step in range(refreshes):
+        rows = [(i % 50, 503 if i % 7 == 0 else 200, i % 1000) for i in range(step * batch, (step + 1) * batch)]
+        history.extend(rows)
+        source.extend(rows)
+        started = time.perf_counter()
+        expected = refresh(Enumerable().of(history).where(is_error))
+        times["re-run"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        result = refresh(view)
+        times["materialized"].append(time.perf_counter() - started)
+        assert result == expected
+    print(f"{refreshes} refreshes of {batch} new rows each, {len(history)} rows in the end")
+    for name, elapsed in times.items():
+        print(f"{name:>13}: first {elapsed[0] * 1e3:7.2f} ms, last {elapsed[-1] * 1e3:7.2f} ms, "
+              f"total {sum(elapsed):7.2f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,45 @@
+"""
+Point and range lookups against the same collection, answered by a linear scan (`first_where`, `where`) and by the
+indexes of an `IndexedEnumerable` (`where_key_eq`, `where_key_between`), plus the cost of keeping the indexes up to date.
+
+    python -m benchmarks.index_bench [size] [queries]
+"""
+import sys
+from timeit import timeit
+from enumerables import Enumerable
+
+
+def by_id(row):
+    return row["id"]
+
+
+def by_age(row):
+    return row["age"]
+
+
+def main(size: int = 100_000, queries: int = 1_000) -> None:
+    rows = [{"id": i, "age": i % 90, "name": f"user{i}"} for i in range(size)]
+    scanned = Enumerable().of(rows)
+    indexed = scanned.to_indexed(hash_keys=[by_id], sorted_keys=[by_age])
+    ids = [(i * 7919) % size for i in range(queries)]
+    cases = (
+        ("point lookup", lambda: [scanned.first_where(lambda row, i=i: row["id"] == i) for i in ids],
+         lambda: [indexed.where_key_eq(by_id, i).first() for i in ids]),
+        ("range of 1 age", lambda: [scanned.where(lambda row, a=i % 90: row["age"] == a).count() for i in ids[:20]],
+         lambda: [indexed.where_key_between(by_age, i % 90, i % 90).count() for i in ids[:20]]),
+    )
+    print(f"{size} rows")
+    for name, scan, lookup in cases:
+        assert scan() == lookup()
+        before, after = timeit(scan, number=1), timeit(lookup, number=1)
+        count = queries if name == "point lookup" else 20
+        print(f"{name:>15}: scan {before / count * 1e6:10.1f} us, index {after / count * 1e6:8.2f} us "
+              f"({before / after:.0f}x)")
+    extra = [{"id": size + i, "age": i % 90} for i in range(queries)]
+    added = timeit(lambda: [indexed.add(row) for row in extra], number=1)
+    removed = timeit(lambda: [indexed.remove(row) for row in extra], number=1)
+    print(f"{'maintenance':>15}: add {added / queries * 1e6:.1f} us, remove {removed / queries * 1e6:.1f} us per row")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,35 @@
+"""
+Overhead of query profiling: a query with profiling off and on, against the same `filter`/`map` iterators built by
+hand, which is what the query runs when profiling is off. Small inputs show the fixed cost per query execution, large
+ones the cost per element.
+
+    python -m benchmarks.profiling_bench
+"""
+from timeit import repeat
+from enumerables import Enumerable
+import profiling
+
+is_even = lambda x: x % 2 == 0
+double = lambda x: x * 2
+
+
+def main() -> None:
+    for size in (10, 1_000, 100_000):
+        values = list(range(size))
+        query = Enumerable().of(values).where(is_even).select(double)
+        number = max(1, 1_000_000 // size)
+        cases = (
+            ("hand-built", lambda: list(map(double, filter(is_even, values)))),
+            ("profiling off", query.to_list),
+        )
+        for name, func in cases:
+            best = min(repeat(func, number=number, repeat=5)) / number
+            print(f"{size:>8} {name:>14}: {best * 1e6:10.2f} us")
+        with profiling.profiled() as profiles:
+            best = min(repeat(query.to_list, number=number, repeat=5)) / number
+        assert len(profiles) == 5 * number
+        print(f"{size:>8} {'profiling on':>14}: {best * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Exact answers against the sketches replacing them on a high-cardinality stream: `to_set` against
+`approx_distinct_count`, sorting against `approx_quantiles`, `to_list` plus `random.sample` against `sample`, and
+`distinct` against the bounded `distinct(max_keys=...)` modes. The exact versions hold every (distinct) value, the
+sketches a fixed amount of memory however long the stream runs.
+
+    python -m benchmarks.sketch_bench [values]
+"""
+import random
+import sys
+import tracemalloc
+from bisect import bisect_right
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main(size: int = 1_000_000) -> None:
+    # a generator source, so nothing but the operator itself holds the values
+    stream = lambda: Enumerable().of(x * 7919 % (size // 2) for x in range(size))
+    exact_count = len(stream().to_set())
+    exact_sorted = sorted(stream().to_list())
+    cases = (
+        ("len(to_set)", lambda: len(stream().to_set()), lambda result: f"{result}"),
+        ("approx_distinct_count", lambda: stream().approx_distinct_count(),
+         lambda result: f"{result} ({(result - exact_count) / exact_count:+.2%})"),
+        ("sorted median", lambda: sorted(stream().to_list())[size // 2], lambda result: f"{result}"),
+        ("approx_quantiles", lambda: stream().approx_quantiles([0.5])[0],
+         lambda result: f"{result} (rank {bisect_right(exact_sorted, result) / size:.4f})"),
+        ("random.sample(to_list)", lambda: random.sample(stream().to_list(), 100), lambda result: f"{len(result)}"),
+        ("sample", lambda: stream().sample(100), lambda result: f"{len(result)}"),
+        ("distinct", lambda: stream().distinct().count(), lambda result: f"{result}"),
+        ("distinct lru 10k", lambda: stream().distinct(max_keys=10_000).count(), lambda result: f"{result}"),
+        ("distinct bloom 10k", lambda: stream().distinct(max_keys=10_000, mode="bloom").count(),
+         lambda result: f"{result}"),
+    )
+    print(f"{size} values, {exact_count} distinct")
+    for name, run, describe in cases:
+        best = min(repeat(run, number=1, repeat=3))
+        print(f"{name:>24}: {best * 1e3:8.1f} ms, peak {peak_memory(run):7.2f} MiB, result {describe(run())}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
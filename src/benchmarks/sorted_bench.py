@@ -0,0 +1,47 @@
+"""
+Operators on inputs which are already sorted, e.g. time-ordered logs: the general versions, which hash or sort
+everything, against the ones `assume_sorted` enables, which walk the inputs side by side. All sources are generators,
+so the peak memory is what the operator itself holds.
+
+    python -m benchmarks.sorted_bench [values]
+"""
+import sys
+import tracemalloc
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main(size: int = 1_000_000) -> None:
+    log = lambda: Enumerable().of(x // 2 for x in range(size))
+    evens = lambda: (x for x in range(0, size, 2))
+    runs = lambda: [range(start, size, 8) for start in range(8)]
+    key = lambda x: x
+    cases = (
+        ("distinct", lambda: log().distinct().count()),
+        ("sorted distinct", lambda: log().assume_sorted().distinct().count()),
+        ("intersect", lambda: log().intersect(Enumerable().of(evens())).count()),
+        ("sorted intersect", lambda: log().assume_sorted().intersect(Enumerable().of(evens()).assume_sorted()).count()),
+        ("without", lambda: log().without(Enumerable().of(evens())).count()),
+        ("sorted without", lambda: log().assume_sorted().without(Enumerable().of(evens()).assume_sorted()).count()),
+        ("concat + sort", lambda: Enumerable().of(runs()[0]).concat(x for run in runs()[1:] for x in run)
+         .sort(key).count()),
+        ("merge", lambda: Enumerable().of(runs()[0]).merge(*runs()[1:]).count()),
+        ("join", lambda: log().join(evens(), key, key).count()),
+        ("merge_join", lambda: log().merge_join(evens(), key).count()),
+    )
+    print(f"{size} values")
+    for name, run in cases:
+        best = min(repeat(run, number=1, repeat=3))
+        print(f"{name:>18}: {best * 1e3:8.1f} ms, peak {peak_memory(run):7.2f} MiB, result {run()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,413 @@
+"""
+Benchmark suite timing every `Enumerable` method, every public `enumerable_funcs` function, multi-stage chains (method
+chaining and pipe syntax) and plain comprehension/`itertools` baselines over list, range and generator sources.
+
+Each result records the best time per run, the throughput in source elements per second and the peak memory
+allocated during one run (measured separately with `tracemalloc`, so it does not slow down the timing):
+
+    python -m benchmarks.suite run --sizes 1000 100000 --sources list generator --output after.json
+    python -m benchmarks.suite run --filter "chain/*" --output after.json
+    python -m benchmarks.suite compare before.json after.json --threshold 0.1
+
+`compare` prints the changes of every result both files have in common and exits with status 1 if any case got
+slower (or, above `--min-memory` bytes, bigger) by more than the threshold.
+"""
+import argparse
+import fnmatch
+import inspect
+import json
+import operator
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from array import array
+from datetime import datetime, timezone
+from functools import cache
+from itertools import chain, dropwhile, islice, takewhile
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+import enumerable_funcs as funcs
+from caches import LRU
+from enumerable_funcs import Predicate, Selector, Accumulator
+from enumerables import Enumerable
+from incremental import LiveSource
+import profiling
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SOURCES: Dict[str, Callable[[int], Callable[[], Iterable]]] = {
+    "list": lambda size: (lambda values=list(range(size)): values),
+    "range": lambda size: (lambda: range(size)),
+    "generator": lambda size: (lambda: (x for x in range(size))),
+}
+
+is_even = lambda x: x % 2 == 0
+double = lambda x: x * 2
+negate = lambda x: -x
+bucket = lambda x: x % 1000
+pair = lambda x: (x, x)
+below_zero = lambda x: x < 0
+not_negative = lambda x: x >= 0
+nothing = lambda x: None
+identity = lambda x: x
+as_pair = lambda x, y: (x, y)
+batch_double = lambda xs: [x * 2 for x in xs]
+batch_is_even = lambda xs: [x % 2 == 0 for x in xs]
+
+
+@cache
+def others(size: int) -> List[int]:
+    """
+    The second input of joins and set operations: every tenth value, so the result is smaller than the source.
+    """
+    return list(range(0, size, 10))
+
+
+_directory = TemporaryDirectory()
+
+
+@cache
+def files(size: int) -> Dict[str, str]:
+    """
+    Lines, CSV and JSON lines files of `size` rows for the file sources, written once per size.
+    """
+    paths = {kind: os.path.join(_directory.name, f"{size}.{kind}") for kind in ("txt", "csv", "jsonl")}
+    rows = [{"id": i, "bucket": i % 1000} for i in range(size)]
+    Enumerable().of(range(size)).to_lines(paths["txt"])
+    Enumerable().of(rows).to_csv(paths["csv"])
+    Enumerable().of(rows).to_jsonl(paths["jsonl"])
+    return paths
+
+
+class Case(NamedTuple):
+    name: str
+    group: str
+    run: Callable[[Iterable, int], Any]
+
+
+def _enumerable_cases() -> List[Case]:
+    e = lambda values: Enumerable().of(values)
+    cases = {
+        "of": lambda v, n: e(v),
+        "empty": lambda v, n: Enumerable().empty().to_list(),
+        "where": lambda v, n: e(v).where(is_even).to_list(),
+        "select": lambda v, n: e(v).select(double).to_list(),
+        "select_many": lambda v, n: e(v).select_many(pair).to_list(),
+        "chunk": lambda v, n: e(v).chunk(100).to_list(),
+        "batch_select": lambda v, n: e(v).batch_select(batch_double, 100).to_list(),
+        "batch_where": lambda v, n: e(v).batch_where(batch_is_even, 100).to_list(),
+        # thread hand-offs cost microseconds per value, so the concurrent cases stop after 1000 values
+        "select/cached": lambda v, n: e(v).select(bucket, cache=LRU(1000)).to_list(),
+        "select_concurrent": lambda v, n: e(v).take(1000).select_concurrent(double, 4).to_list(),
+        "where_concurrent": lambda v, n: e(v).take(1000).where_concurrent(is_even, 4, ordered=False).to_list(),
+        "distinct": lambda v, n: e(v).select(bucket).distinct().to_list(),
+        "distinct_by": lambda v, n: e(v).distinct_by(bucket).to_list(),
+        "distinct/lru": lambda v, n: e(v).select(bucket).distinct(max_keys=100).to_list(),
+        "distinct/bloom": lambda v, n: e(v).select(bucket).distinct(max_keys=100, mode="bloom").to_list(),
+        "take": lambda v, n: e(v).take(n // 2).to_list(),
+        "take_while": lambda v, n: e(v).take_while(lambda x: x < n // 2).to_list(),
+        "skip": lambda v, n: e(v).skip(n // 2).to_list(),
+        "skip_while": lambda v, n: e(v).skip_while(lambda x: x < n // 2).to_list(),
+        "aggregate": lambda v, n: e(v).aggregate(operator.add),
+        "aggregate_with_seed": lambda v, n: e(v).aggregate_with_seed(operator.add, 0),
+        "count": lambda v, n: e(v).count(),
+        "count_where": lambda v, n: e(v).count_where(is_even),
+        "approx_distinct_count": lambda v, n: e(v).select(bucket).approx_distinct_count(),
+        "approx_quantiles": lambda v, n: e(v).approx_quantiles([0.5, 0.99]),
+        "sample": lambda v, n: e(v).where(is_even).sample(100),
+        "concat": lambda v, n: e(v).concat(others(n)).to_list(),
+        "first": lambda v, n: e(v).first(),
+        "first_where": lambda v, n: e(v).first_where(lambda x: x >= n // 2),
+        "last": lambda v, n: e(v).last(),
+        "element_at": lambda v, n: e(v).element_at(n // 2),
+        "last_where": lambda v, n: e(v).last_where(is_even),
+        "sort": lambda v, n: e(v).sort(negate).to_list(),
+        "sort_by": lambda v, n: e(v).sort_by(negate).to_list(),
+        "order_by": lambda v, n: e(v).order_by(negate).to_list(),
+        "order_by_descending": lambda v, n: e(v).order_by_descending(bucket).take(10).to_list(),
+        "then_by": lambda v, n: e(v).order_by(bucket).then_by(negate).to_list(),
+        "then_by_descending": lambda v, n: e(v).order_by(bucket).then_by_descending(negate).to_list(),
+        "reverse": lambda v, n: e(v).reverse().to_list(),
+        "assume_sorted": lambda v, n: e(v).assume_sorted().select(bucket).distinct().to_list(),
+        "distinct/sorted": lambda v, n: e(v).assume_sorted().distinct().to_list(),
+        "intersect/sorted": lambda v, n: e(v).assume_sorted().intersect(e(others(n)).assume_sorted()).to_list(),
+        "without/sorted": lambda v, n: e(v).assume_sorted().without(e(others(n)).assume_sorted()).to_list(),
+        "merge": lambda v, n: e(v).merge(others(n)).to_list(),
+        "merge_join": lambda v, n: e(v).merge_join(others(n)).count(),
+        "window": lambda v, n: e(v).window(10, 5).count(),
+        "sliding_aggregate": lambda v, n: e(v).sliding_aggregate(10, "max").to_list(),
+        "tumbling_by_time": lambda v, n: e(v).tumbling_by_time(identity, 100, allowed_lateness=100).count(),
+        "foreach": lambda v, n: e(v).foreach(nothing),
+        "any": lambda v, n: e(v).any(below_zero),
+        "all": lambda v, n: e(v).all(not_negative),
+        "is_empty": lambda v, n: e(v).is_empty(),
+        "to_list": lambda v, n: e(v).to_list(),
+        "to_set": lambda v, n: e(v).to_set(),
+        "to_dict": lambda v, n: e(v).to_dict(identity),
+        "to_lookup": lambda v, n: e(v).to_lookup(bucket),
+        "to_array": lambda v, n: e(v).to_array("q"),
+        "to_bytes": lambda v, n: e(v).select(bucket).to_bytes("h"),
+        "to_buffer": lambda v, n: e(v).to_buffer("q"),
+        "of_buffer": lambda v, n: Enumerable.of_buffer(array("q", v)).skip(n // 2).to_buffer("q"),
+        "to_indexed": lambda v, n: e(v).to_indexed([identity], [bucket]).where_key_between(bucket, 10, 20).count(),
+        "combine": lambda v, n: e(v).combine(e(others(n))).to_list(),
+        "zip": lambda v, n: e(v).zip(others(n)).to_list(),
+        "intersect": lambda v, n: e(v).intersect(others(n)).to_list(),
+        "without": lambda v, n: e(v).without(others(n)).to_list(),
+        "join": lambda v, n: e(v).join(others(n), identity, identity).count(),
+        "group_join": lambda v, n: e(v).group_join(others(n), identity, identity).count(),
+        "left_join": lambda v, n: e(v).left_join(others(n), identity, identity).count(),
+        "group_by": lambda v, n: e(v).group_by(bucket).count(),
+        "aggregate_by": lambda v, n: e(v).aggregate_by(bucket, count=True, sum=identity, max=identity).count(),
+        "memoize": lambda v, n: e(v).memoize().count(),
+        "share": lambda v, n: e(v).share(True).count(),
+        "materialize": lambda v, n: e(LiveSource(v)).where(is_even).materialize().count(),
+        "from_lines": lambda v, n: Enumerable.from_lines(files(n)["txt"]).count(),
+        "from_csv": lambda v, n: Enumerable.from_csv(files(n)["csv"], columns=["bucket"], types={"bucket": int}).count(),
+        "from_jsonl": lambda v, n: Enumerable.from_jsonl(files(n)["jsonl"]).count(),
+        "to_lines": lambda v, n: e(v).to_lines(os.path.join(_directory.name, "out.txt")),
+        "to_csv": lambda v, n: e(v).select(pair).to_csv(os.path.join(_directory.name, "out.csv")),
+        "to_jsonl": lambda v, n: e(v).to_jsonl(os.path.join(_directory.name, "out.jsonl")),
+        "explain": lambda v, n: e(v).where(is_even).select(double).distinct().take(10).explain(),
+        # builtins only: the callables have to be picklable for the worker processes
+        "as_parallel": lambda v, n: e(v).as_parallel(workers=2, chunk_size=max(1, n // 8)).where(bool).count(),
+    }
+    return [Case(f"enumerable/{name}", "enumerable", run) for name, run in cases.items()]
+
+
+def _funcs_cases() -> List[Case]:
+    keys = [(bucket, False), (negate, True)]
+    cases = {
+        "where": lambda v, n: list(funcs.where(v, is_even)),
+        "select": lambda v, n: list(funcs.select(v, double)),
+        "select_many": lambda v, n: list(funcs.select_many(v, pair)),
+        "chunk": lambda v, n: list(funcs.chunk(v, 100)),
+        "batch_select": lambda v, n: list(funcs.batch_select(v, batch_double, 100)),
+        "batch_where": lambda v, n: list(funcs.batch_where(v, batch_is_even, 100)),
+        "select_concurrent": lambda v, n: list(funcs.select_concurrent(islice(v, 1000), double, 4)),
+        "where_concurrent": lambda v, n: list(funcs.where_concurrent(islice(v, 1000), is_even, 4, ordered=False)),
+        "distinct": lambda v, n: list(funcs.distinct(funcs.select(v, bucket))),
+        "distinct_by": lambda v, n: list(funcs.distinct_by(v, bucket)),
+        "take": lambda v, n: list(funcs.take(v, n // 2)),
+        "take_while": lambda v, n: list(funcs.take_while(v, lambda x: x < n // 2)),
+        "skip": lambda v, n: list(funcs.skip(v, n // 2)),
+        "skip_while": lambda v, n: list(funcs.skip_while(v, lambda x: x < n // 2)),
+        "aggregate": lambda v, n: funcs.aggregate(v, operator.add),
+        "aggregate_with_seed": lambda v, n: funcs.aggregate_with_seed(v, operator.add, 0),
+        "count": lambda v, n: funcs.count(v),
+        "count_where": lambda v, n: funcs.count_where(v, is_even),
+        "concat": lambda v, n: list(funcs.concat(v, others(n))),
+        "first": lambda v, n: funcs.first(v),
+        "first_where": lambda v, n: funcs.first_where(v, lambda x: x >= n // 2),
+        "last": lambda v, n: funcs.last(v),
+        "last_where": lambda v, n: funcs.last_where(v, is_even),
+        "sort": lambda v, n: list(funcs.sort(v, negate)),
+        "sort_by": lambda v, n: list(funcs.sort_by(v, negate)),
+        "order_by": lambda v, n: list(funcs.order_by(v, keys)),
+        "external_sort": lambda v, n: list(funcs.external_sort(v, negate, max_memory_items=max(1, n // 4))),
+        "top": lambda v, n: funcs.top(v, keys, 10),
+        "reverse": lambda v, n: list(funcs.reverse(v)),
+        "foreach": lambda v, n: funcs.foreach(v, nothing),
+        "intersect": lambda v, n: list(funcs.intersect(v, others(n))),
+        "without": lambda v, n: list(funcs.without(v, others(n))),
+        "join": lambda v, n: funcs.count(funcs.join(v, others(n), identity, identity, as_pair)),
+        "group_join": lambda v, n: funcs.count(funcs.group_join(v, others(n), identity, identity, as_pair)),
+        "left_join": lambda v, n: funcs.count(funcs.left_join(v, others(n), identity, identity, as_pair)),
+        "merge_sorted": lambda v, n: list(funcs.merge_sorted(v, [others(n)])),
+        "distinct_sorted": lambda v, n: list(funcs.distinct_sorted(v)),
+        "intersect_sorted": lambda v, n: list(funcs.intersect_sorted(v, others(n))),
+        "without_sorted": lambda v, n: list(funcs.without_sorted(v, others(n))),
+        "merge_join": lambda v, n: funcs.count(funcs.merge_join(v, others(n), None, None, as_pair)),
+        "window": lambda v, n: funcs.count(funcs.window(v, 10, 5)),
+        "sliding_aggregate": lambda v, n: list(funcs.sliding_aggregate(v, 10, "max")),
+        "tumbling_by_time": lambda v, n: funcs.count(funcs.tumbling_by_time(v, identity, 100, 100)),
+        "group_by": lambda v, n: funcs.count(funcs.group_by(v, bucket)),
+        "aggregate_by": lambda v, n: funcs.count(funcs.aggregate_by(v, bucket, funcs.Aggregation(count=True, sum=identity),
+                                                                    max_groups=100)),
+        "approx_distinct_count": lambda v, n: funcs.approx_distinct_count(map(bucket, v)),
+        "approx_quantiles": lambda v, n: funcs.approx_quantiles(v, [0.5, 0.99]),
+        "sample": lambda v, n: funcs.sample(v, 100),
+        "anything": lambda v, n: funcs.anything(v, below_zero),
+        "every": lambda v, n: funcs.every(v, not_negative),
+        "is_empty": lambda v, n: funcs.is_empty(v),
+        "to_list": lambda v, n: funcs.to_list(v),
+        "to_set": lambda v, n: funcs.to_set(v),
+        "to_dict": lambda v, n: funcs.to_dict(v, identity),
+        "to_lookup": lambda v, n: funcs.to_lookup(v, bucket),
+        "typed_view": lambda v, n: funcs.typed_view(array("q", v).tobytes(), "q")[n // 2:],
+        "to_array": lambda v, n: funcs.to_array(v, "q"),
+        "to_bytes": lambda v, n: funcs.to_bytes(map(bucket, v), "h"),
+        "to_buffer": lambda v, n: funcs.to_buffer(v, "q"),
+    }
+    return [Case(f"funcs/{name}", "funcs", run) for name, run in cases.items()]
+
+
+def _profiled(func: Callable[[], Any]) -> Any:
+    with profiling.profiled():
+        return func()
+
+
+def _chain_cases() -> List[Case]:
+    """
+    Representative multi-stage queries, each with the same query as method chain, pipe and baseline.
+    """
+    e = lambda values: Enumerable().of(values)
+    cases = [
+        ("filter-map", "chain", lambda v, n: e(v).where(is_even).select(double).to_list()),
+        ("filter-map", "pipe", lambda v, n: (e(v) | Predicate(is_even) | Selector(double)).to_list()),
+        ("filter-map", "profiled", lambda v, n: _profiled(e(v).where(is_even).select(double).to_list)),
+        ("filter-map", "comprehension", lambda v, n: [x * 2 for x in v if x % 2 == 0]),
+        ("filter-map", "itertools", lambda v, n: list(map(double, filter(is_even, v)))),
+        ("filter-map-sum", "chain", lambda v, n: e(v).where(is_even).select(double).aggregate(operator.add)),
+        ("filter-map-sum", "pipe", lambda v, n: e(v) | Predicate(is_even) | Selector(double) | Accumulator(operator.add)),
+        ("filter-map-sum", "comprehension", lambda v, n: sum(x * 2 for x in v if x % 2 == 0)),
+        ("filter-map-sum", "itertools", lambda v, n: sum(map(double, filter(is_even, v)))),
+        ("paging", "chain", lambda v, n: e(v).where(is_even).skip(n // 4).take(100).select(double).to_list()),
+        ("paging", "pipe", lambda v, n: (e(v) | Predicate(is_even) | Selector(double)).skip(n // 4).take(100).to_list()),
+        ("paging", "comprehension", lambda v, n: [x * 2 for x in v if x % 2 == 0][n // 4:n // 4 + 100]),
+        ("paging", "itertools", lambda v, n: list(islice(map(double, filter(is_even, v)), n // 4, n // 4 + 100))),
+        ("flatten-distinct", "chain", lambda v, n: e(v).select_many(pair).select(bucket).distinct().count()),
+        ("flatten-distinct", "comprehension", lambda v, n: len({x % 1000 for x in v for _ in (0, 1)})),
+        ("flatten-distinct", "itertools", lambda v, n: len(set(map(bucket, chain.from_iterable(map(pair, v)))))),
+        ("while", "chain", lambda v, n: e(v).skip_while(lambda x: x < n // 4).take_while(lambda x: x < n // 2).count()),
+        ("while", "itertools", lambda v, n: sum(1 for _ in takewhile(lambda x: x < n // 2, dropwhile(lambda x: x < n // 4, v)))),
+        ("top-10", "chain", lambda v, n: e(v).order_by_descending(bucket).then_by(negate).take(10).to_list()),
+        ("top-10", "comprehension", lambda v, n: sorted(v, key=lambda x: (-(x % 1000), -x))[:10]),
+    ]
+    return [Case(f"chain/{name}/{style}", "baseline" if style in ("comprehension", "itertools") else style, run)
+            for name, style, run in cases]
+
+
+def all_cases() -> List[Case]:
+    return _enumerable_cases() + _funcs_cases() + _chain_cases()
+
+
+def uncovered(cases: List[Case]) -> List[str]:
+    """
+    Returns the public `Enumerable` methods and `enumerable_funcs` functions without a benchmark case.
+    """
+    names = {case.name for case in cases}
+    methods = [f"enumerable/{name}" for name, _ in inspect.getmembers(Enumerable, inspect.isfunction)
+               if not name.startswith("_")]
+    functions = [f"funcs/{name}" for name, func in inspect.getmembers(funcs, inspect.isfunction)
+                 if not name.startswith("_") and func.__module__ == funcs.__name__]
+    return sorted(name for name in methods + functions if name not in names)
+
+
+def measure(case: Case, source: Callable[[], Iterable], size: int, repeat: int, min_time: float) -> Tuple[float, int]:
+    """
+    Returns the best time of one run out of `repeat` measurements, each of which runs the case often enough to take
+    at least `min_time` seconds, and the peak memory of a single run. A fresh source is created for every run.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            case.run(source(), size)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            case.run(source(), size)
+        best = min(best, (time.perf_counter() - started) / number)
+    values = source()
+    tracemalloc.start()
+    try:
+        case.run(values, size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(args: argparse.Namespace) -> int:
+    cases = [case for case in all_cases() if any(fnmatch.fnmatchcase(case.name, pattern) for pattern in args.filter)]
+    for name in uncovered(all_cases()):
+        print(f"warning: no benchmark case for {name}", file=sys.stderr)
+    results = []
+    for size in args.sizes:
+        for source_name in args.sources:
+            source = SOURCES[source_name](size)
+            for case in cases:
+                seconds, peak = measure(case, source, size, args.repeat, args.min_time)
+                results.append({
+                    "case": case.name,
+                    "group": case.group,
+                    "source": source_name,
+                    "size": size,
+                    "seconds": seconds,
+                    "elements_per_second": size / seconds if seconds else None,
+                    "peak_bytes": peak,
+                })
+                print(f"{case.name:>42} {source_name:>9} {size:>10}: {seconds * 1e3:10.3f} ms "
+                      f"{size / seconds if seconds else 0:14,.0f} el/s {peak / 1024:12,.1f} KiB", flush=True)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as file:
+        baseline = {(r["case"], r["source"], r["size"]): r for r in json.load(file)["results"]}
+    with open(args.current) as file:
+        current = {(r["case"], r["source"], r["size"]): r for r in json.load(file)["results"]}
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        time_ratio = after["seconds"] / before["seconds"] if before["seconds"] else 1.0
+        memory_ratio = after["peak_bytes"] / before["peak_bytes"] if before["peak_bytes"] else 1.0
+        flags = []
+        if time_ratio > 1 + args.threshold:
+            flags.append("SLOWER")
+        if memory_ratio > 1 + args.threshold and after["peak_bytes"] - before["peak_bytes"] > args.min_memory:
+            flags.append("BIGGER")
+        regressions += bool(flags)
+        if flags or args.verbose:
+            case, source, size = key
+            print(f"{case:>42} {source:>9} {size:>10}: time {time_ratio:6.2f}x memory {memory_ratio:6.2f}x "
+                  f"{' '.join(flags)}")
+    missing = len(baseline.keys() - current.keys())
+    if missing:
+        print(f"{missing} result(s) of {args.baseline} are missing from {args.current}", file=sys.stderr)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%} in {len(baseline.keys() & current.keys())} results")
+    return 1 if regressions else 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", type=lambda x: int(float(x)), nargs="+", default=list(SIZES),
+                            help="input sizes, e.g. 1e3 1e7")
+    run_parser.add_argument("--sources", choices=SOURCES, nargs="+", default=list(SOURCES))
+    run_parser.add_argument("--filter", nargs="+", default=["*"], help="glob patterns of the case names to run")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per measurement")
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+    run_parser.set_defaults(func=run)
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown")
+    compare_parser.add_argument("--min-memory", type=int, default=64 * 1024,
+                                help="memory increases below this many bytes are ignored")
+    compare_parser.add_argument("--verbose", action="store_true", help="also print results within the threshold")
+    compare_parser.set_defaults(func=compare)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+Moving aggregates over a stream, e.g. a rolling sum or maximum of a metric: re-reducing every window produced by
+`window`, which costs O(size) per value, against `sliding_aggregate`, which updates a running total or a monotonic deque
+in O(1) amortized per value.
+
+    python -m benchmarks.window_bench [values] [size]
+"""
+import random
+import sys
+from timeit import repeat
+from enumerables import Enumerable
+
+
+def main(values: int = 1_000_000, size: int = 1_000) -> None:
+    rng = random.Random(1)
+    metric = [rng.random() for _ in range(values)]
+    stream = Enumerable().of(metric)
+    cases = (
+        ("window + sum", lambda: stream.window(size).select(sum).to_list()),
+        ("sliding sum", lambda: stream.sliding_aggregate(size, "sum").to_list()),
+        ("window + max", lambda: stream.window(size).select(max).to_list()),
+        ("sliding max", lambda: stream.sliding_aggregate(size, "max").to_list()),
+    )
+    print(f"{values} values, windows of {size}")
+    for name, run in cases:
+        best = min(repeat(run, number=1, repeat=3))
+        print(f"{name:>14}: {best * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
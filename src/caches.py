@@ -0,0 +1,149 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import update_wrapper
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, NamedTuple
+
+_MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+class _Cache(ABC):
+    """
+    Results of functions by their argument (or a key derived from it), shared by every selector or predicate the cache
+    is passed to. Entries are keyed by the function as well, so one cache can serve several functions. All methods are
+    thread-safe; the function itself is called outside the lock, so concurrent misses of the same key may call it more
+    than once.
+    """
+    __slots__ = ("maxsize", "hits", "misses", "evictions", "_entries", "_lock")
+
+    def __init__(self, maxsize: int | None) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @abstractmethod
+    def _lookup(self, key: Hashable) -> Any:
+        """
+        Returns the value stored under `key`, or `_MISSING`, and counts the hit or miss.
+        """
+
+    @abstractmethod
+    def _store(self, key: Hashable, value: Any) -> None:
+        """
+        Stores `value` under `key` and evicts what no longer fits.
+        """
+
+    def _evict_oldest(self) -> None:
+        # called with the lock held
+        while self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def cached(self, func: Callable, key: Callable[[Any], Hashable] | None = None) -> Callable:
+        """
+        Returns `func` with its results stored in the cache under `key(x)` (by default the argument itself).
+        """
+        def call(x):
+            entry = (func, x if key is None else key(x))
+            with self._lock:
+                value = self._lookup(entry)
+            if value is _MISSING:
+                value = func(x)
+                with self._lock:
+                    self._store(entry, value)
+            return value
+        return update_wrapper(call, func)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def clear(self) -> None:
+        """
+        Removes every entry; the counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.stats()})"
+
+
+class LRU(_Cache):
+    """
+    A cache of at most `maxsize` results, which evicts the least recently used one.
+    """
+    __slots__ = ()
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        super().__init__(maxsize)
+
+    def _lookup(self, key: Hashable) -> Any:
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict_oldest()
+
+
+class TTL(_Cache):
+    """
+    A cache whose results expire `seconds` after they were computed, optionally also limited to `maxsize` results (the
+    oldest are evicted first). Expired results count as evictions. `clock` returns the current time in seconds.
+    """
+    __slots__ = ("seconds", "clock")
+
+    def __init__(self, seconds: float, maxsize: int | None = None, clock: Callable[[], float] = monotonic) -> None:
+        if seconds <= 0:
+            raise ValueError("seconds must be positive")
+        super().__init__(maxsize)
+        self.seconds = seconds
+        self.clock = clock
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.evictions += 1
+        self.misses += 1
+        return _MISSING
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        entries = self._entries
+        now = self.clock()
+        # entries are ordered by their expiry time, so the expired ones are at the front
+        while entries and next(iter(entries.values()))[0] <= now:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = (now + self.seconds, value)
+        entries.move_to_end(key)
+        self._evict_oldest()
@@ -0,0 +1,76 @@
+import unittest
+from threading import Thread
+from caches import *
+from caches import _Cache
+from enumerables import *
+
+
+class TestCaches(unittest.TestCase):
+    def test_lru_selector_shared_across_queries(self):
+        calls = []
+        def normalize(word):
+            calls.append(word)
+            return word.strip().lower()
+        cache = LRU(maxsize=2)
+        selector = Selector(normalize, cache=cache)
+        self.assertEqual(Enumerable().of(["A ", "b", "A "]).select(selector).to_list(), ["a", "b", "a"])
+        self.assertEqual(Enumerable().of(["b", "C", "A "]).select(selector).to_list(), ["b", "c", "a"])
+        # "A " was evicted by "C" as the least recently used entry
+        self.assertEqual(calls, ["A ", "b", "C", "A "])
+        self.assertEqual(cache.stats(), CacheStats(hits=2, misses=4, evictions=2, size=2))
+        self.assertAlmostEqual(cache.stats().hit_ratio, 1 / 3)
+        self.assertIn("select(normalize)", Enumerable().of(["x"]).select(selector).explain())
+
+    def test_cache_key_and_functions_sharing_a_cache(self):
+        cache = LRU()
+        by_id = lambda row: row["id"]
+        name = lambda row: row["name"].upper()
+        rows = [{"id": 1, "name": "ada"}, {"id": 1, "name": "ADA"}, {"id": 2, "name": "bob"}]
+        self.assertEqual(Enumerable().of(rows).select(name, cache=cache, key=by_id).to_list(), ["ADA", "ADA", "BOB"])
+        self.assertEqual(Enumerable().of([1, 2, 3]).where(lambda x: x != 1, cache=cache).to_list(), [2, 3])
+        self.assertEqual(cache.stats(), CacheStats(hits=1, misses=5, evictions=0, size=5))
+        cache.clear()
+        self.assertEqual((len(cache), cache.stats().hits), (0, 1))
+
+    def test_ttl_expires_results(self):
+        now = [0.0]
+        cache = TTL(seconds=10, clock=lambda: now[0])
+        square = Selector(lambda x: x * x, cache=cache)
+        self.assertEqual(Enumerable().of([2, 3, 2]).select(square).to_list(), [4, 9, 4])
+        now[0] = 5
+        Enumerable().of([3]).select(square).to_list()
+        now[0] = 10
+        self.assertEqual(Enumerable().of([2, 4]).select(square).to_list(), [4, 16])
+        self.assertEqual(cache.stats(), CacheStats(hits=2, misses=4, evictions=2, size=2))
+        limited = TTL(seconds=60, maxsize=1)
+        Enumerable().of([1, 2, 1]).select(square.func, cache=limited).to_list()
+        self.assertEqual(limited.stats(), CacheStats(hits=0, misses=3, evictions=2, size=1))
+
+    def test_concurrent_queries(self):
+        cache = LRU(maxsize=50)
+        selector = Selector(lambda x: x * 2, cache=cache)
+        results = []
+        def run(worker):
+            results.append(Enumerable().of(range(worker, worker + 200)).select(selector).to_list())
+        threads = [Thread(target=run, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(result == [x * 2 for x in range(result[0] // 2, result[0] // 2 + 200)]
+                            for result in results))
+        stats = cache.stats()
+        self.assertEqual((stats.hits + stats.misses, stats.size), (8 * 200, 50))
+        # concurrent misses of one key store it twice without evicting anything
+        self.assertLessEqual(stats.evictions, stats.misses - 50)
+
+    def test_incomplete_cache_cannot_be_created(self):
+        class NoStore(_Cache):
+            def _lookup(self, key):
+                return None
+        with self.assertRaises(TypeError):
+            NoStore(10)
+
+
+if __name__ == "__main__":
+    unittest.main()
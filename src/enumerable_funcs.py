@@ -1,6 +1,18 @@
-from typing import Iterable, Callable, TypeVar, List
-from itertools import islice, takewhile, dropwhile
+from typing import Iterable, Callable, TypeVar, List, Dict, Tuple, Container, Hashable
+from collections import Counter, deque
+from array import array
+from itertools import islice, takewhile, dropwhile, filterfalse, compress, groupby
 from functools import reduce
+from heapq import nsmallest, nlargest, merge, heappush, heappop
+from operator import itemgetter, lt, gt
+from tempfile import TemporaryFile
+from threading import Event, Thread
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from queue import Empty, Full, Queue
+from time import monotonic
+from caches import LRU, TTL
+from sketches import HyperLogLog, QuantileSketch, Reservoir, recent_keys
+import pickle
 
 class Func[T, U]:
     def __init__(self, func: Callable[[T], U]) -> None:
@@ -11,16 +23,18 @@ class Func[T, U]:
 
 
 class Predicate[T](Func[T, bool]):
-    def __init__(self, func: Callable[[T], bool]) -> None:
-        self.func = func
+    def __init__(self, func: Callable[[T], bool], cache: LRU | TTL | None = None,
+                 key: Callable[[T], Hashable] | None = None) -> None:
+        self.func = func if cache is None else cache.cached(func, key)
 
     def __call__(self, x: T) -> bool:
         return self.func(x)
 
 
 class Selector[T, U](Func[T, U]):
-    def __init__(self, func: Callable[[T], U]) -> None:
-        self.func = func
+    def __init__(self, func: Callable[[T], U], cache: LRU | TTL | None = None,
+                 key: Callable[[T], Hashable] | None = None) -> None:
+        self.func = func if cache is None else cache.cached(func, key)
 
     def __call__(self, x: T) -> U:
         return self.func(x)
@@ -42,6 +56,8 @@ class Accumulator[T](Func[T, T]):
 
 T = TypeVar('T')
 U = TypeVar('U')
+V = TypeVar('V')
+R = TypeVar('R')
 
 def where(values: Iterable[T], predicate: Predicate[T]) -> Iterable[T]:
     return filter(predicate, values)
@@ -52,11 +68,17 @@ def select(values: Iterable[T], selector: Selector[T, U]) -> Iterable[U]:
 def select_many(values: Iterable[T], selector: Selector[T, Iterable[U]]) -> Iterable[U]:
     return (x for y in values for x in selector(y))
 
-def distinct(values: Iterable[T]) -> Iterable[T]:
+def distinct(values: Iterable[T], max_keys: int | None = None, mode: str = "lru") -> Iterable[T]:
+    if max_keys is not None:
+        return filter(recent_keys(max_keys, mode).insert, values)
     seen = set()
     return (x for x in values if x not in seen and not seen.add(x))
 
-def distinct_by(values: Iterable[T], key_selector: Selector[T, U]) -> Iterable[U]:
+def distinct_by(values: Iterable[T], key_selector: Selector[T, U], max_keys: int | None = None,
+                mode: str = "lru") -> Iterable[U]:
+    if max_keys is not None:
+        insert = recent_keys(max_keys, mode).insert
+        return (x for x in values if insert(key_selector(x)))
     seen = set()
     return (x for x in values if (key := key_selector(x)) not in seen and not seen.add(key))
 
@@ -105,17 +127,766 @@ def sort(values: Iterable[T], key: Selector[T, U], reverse: bool = False) -> Ite
 def sort_by(values: Iterable[T], key: Selector[T, U], reverse: bool = False) -> Iterable[T]:
     return sorted(values, key=lambda x: key(x), reverse=reverse)
 
+class _SortKey:
+    """
+    Sort key for orderings which mix ascending and descending keys. `sorted` only needs `<`, but `heapq` compares
+    `(key, index, value)` entries, which only reach the index when the keys are `==`.
+    """
+    __slots__ = ("keys", "descending")
+    __hash__ = None
+
+    def __init__(self, keys: Tuple, descending: Tuple[bool, ...]) -> None:
+        self.keys = keys
+        self.descending = descending
+
+    def __lt__(self, other: '_SortKey') -> bool:
+        for a, b, descending in zip(self.keys, other.keys, self.descending):
+            if a < b:
+                return not descending
+            if b < a:
+                return descending
+        return False
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _SortKey) and self.keys == other.keys
+
+def _ordering(keys: List[Tuple[Selector[T, U], bool]]) -> Tuple[Callable[[T], object], bool]:
+    """
+    Combines `(key, descending)` pairs into a single key and a `reverse` flag, so every ordering is one sort.
+    """
+    if len(keys) == 1:
+        return keys[0]
+    selectors = tuple(key for key, _ in keys)
+    descending = tuple(flag for _, flag in keys)
+    if all(descending) or not any(descending):
+        return (lambda x: tuple(key(x) for key in selectors)), descending[0]
+    return (lambda x: _SortKey(tuple(key(x) for key in selectors), descending)), False
+
+def order_by(values: Iterable[T], keys: List[Tuple[Selector[T, U], bool]],
+             max_memory_items: int | None = None) -> Iterable[T]:
+    key, reverse = _ordering(keys)
+    if max_memory_items is not None:
+        return external_sort(values, key, reverse, max_memory_items)
+    return sorted(values, key=key, reverse=reverse)
+
+_SPILL_BLOCK = 4096
+
+def _spill(records: List[Tuple[U, T]]):
+    file = TemporaryFile()
+    for start in range(0, len(records), _SPILL_BLOCK):
+        pickle.dump(records[start:start + _SPILL_BLOCK], file, pickle.HIGHEST_PROTOCOL)
+    file.seek(0)
+    return file
+
+def _read_run(file) -> Iterable[Tuple[U, T]]:
+    while True:
+        try:
+            block = pickle.load(file)
+        except EOFError:
+            return
+        yield from block
+
+def external_sort(values: Iterable[T], key: Selector[T, U], reverse: bool = False,
+                  max_memory_items: int = 1_000_000) -> Iterable[T]:
+    """
+    Sorts with at most `max_memory_items` values in memory. The input is split into sorted runs which are
+    spilled to temporary files as blocks of pickled `(key, value)` records and lazily merged with `heapq.merge`.
+    Like `sorted` the result is stable.
+    """
+    if max_memory_items < 1:
+        raise ValueError("max_memory_items must be at least 1")
+    values = iter(values)
+    files = []
+    try:
+        while True:
+            chunk = list(islice(values, max_memory_items))
+            run = sorted(zip(map(key, chunk), chunk), key=itemgetter(0), reverse=reverse)
+            del chunk
+            if len(run) < max_memory_items:
+                break
+            files.append(_spill(run))
+            del run
+        if not files:
+            yield from map(itemgetter(1), run)
+            return
+        runs = [_read_run(file) for file in files] + [iter(run)]
+        yield from map(itemgetter(1), merge(*runs, key=itemgetter(0), reverse=reverse))
+    finally:
+        for file in files:
+            file.close()
+
+def top(values: Iterable[T], keys: List[Tuple[Selector[T, U], bool]], count: int) -> List[T]:
+    """
+    Returns the first `count` values of the ordering with a bounded heap, in O(n log count) time and O(count) memory.
+    """
+    key, reverse = _ordering(keys)
+    return (nlargest if reverse else nsmallest)(count, values, key=key)
+
 def reverse(values: Iterable[T]) -> Iterable[T]:
     return reversed(list(values))
 
 def foreach(values: Iterable[T], action: Action[T]) -> None:
     [action(x) for x in values]
 
+def _membership(values: Iterable[T]) -> Container[T]:
+    values = list(values)
+    try:
+        return set(values)
+    except TypeError:
+        return values
+
 def intersect(values: Iterable[T], other_values: Iterable[T]) -> Iterable[T]:
-    return (x for x in values if x in other_values)
+    members = _membership(other_values)
+    yield from filter(members.__contains__, values)
 
 def without(values: Iterable[T], other_values: Iterable[T]) -> Iterable[T]:
-    return (x for x in values if x not in other_values)
+    members = _membership(other_values)
+    yield from filterfalse(members.__contains__, values)
+
+def _build_lookup(values: Iterable[T], key_selector: Selector[T, U]) -> Dict[U, List[T]]:
+    lookup = {}
+    for x in values:
+        key = key_selector(x)
+        if key in lookup:
+            lookup[key].append(x)
+        else:
+            lookup[key] = [x]
+    return lookup
+
+def _is_smaller(values: Iterable, other_values: Iterable) -> bool:
+    try:
+        return len(values) < len(other_values)
+    except TypeError:
+        return False
+
+def join(values: Iterable[T], other_values: Iterable[V], key_selector: Selector[T, U],
+         other_key_selector: Selector[V, U], result_selector: Callable[[T, V], R]) -> Iterable[R]:
+    if _is_smaller(values, other_values):
+        # hash the smaller outer side and collect its matches, so pairs still come out in the order of `values`
+        values = list(values)
+        positions = _build_lookup(range(len(values)), lambda i: key_selector(values[i]))
+        matches = [[] for _ in values]
+        for y in other_values:
+            for i in positions.get(other_key_selector(y), ()):
+                matches[i].append(y)
+        for x, ys in zip(values, matches):
+            for y in ys:
+                yield result_selector(x, y)
+        return
+    lookup = _build_lookup(other_values, other_key_selector)
+    for x in values:
+        for y in lookup.get(key_selector(x), ()):
+            yield result_selector(x, y)
+
+def group_join(values: Iterable[T], other_values: Iterable[V], key_selector: Selector[T, U],
+               other_key_selector: Selector[V, U], result_selector: Callable[[T, List[V]], R]) -> Iterable[R]:
+    lookup = _build_lookup(other_values, other_key_selector)
+    for x in values:
+        yield result_selector(x, lookup.get(key_selector(x), []))
+
+def left_join(values: Iterable[T], other_values: Iterable[V], key_selector: Selector[T, U],
+              other_key_selector: Selector[V, U], result_selector: Callable[[T, V | None], R]) -> Iterable[R]:
+    lookup = _build_lookup(other_values, other_key_selector)
+    for x in values:
+        matches = lookup.get(key_selector(x))
+        if matches is None:
+            yield result_selector(x, None)
+        else:
+            for y in matches:
+                yield result_selector(x, y)
+
+def merge_sorted(values: Iterable[T], others: Iterable[Iterable[T]], key: Selector[T, U] | None = None) -> Iterable[T]:
+    """
+    Lazily merges `values` and `others`, each sorted in ascending order of `key`, into one sorted sequence, holding one
+    value per input.
+    """
+    return merge(values, *others, key=key)
+
+def distinct_sorted(values: Iterable[T], key: Selector[T, U] | None = None) -> Iterable[T]:
+    """
+    Keeps the first value of every run of equal keys, which removes all duplicate keys from values sorted by `key`
+    while only the current key is remembered.
+    """
+    return map(next, map(itemgetter(1), groupby(values, key)))
+
+def _walk_sorted(values: Iterable[T], other_values: Iterable[T], keep_matches: bool) -> Iterable[T]:
+    values, others = iter(values), iter(other_values)
+    other = next(others, _END)
+    for x in values:
+        while other is not _END and other < x:
+            other = next(others, _END)
+        if other is _END:
+            if not keep_matches:
+                yield x
+                yield from values
+            return
+        if (other == x) == keep_matches:
+            yield x
+
+def intersect_sorted(values: Iterable[T], other_values: Iterable[T]) -> Iterable[T]:
+    """
+    Keeps the values which are in `other_values`, walking both in ascending order side by side in constant memory.
+    """
+    return _walk_sorted(values, other_values, True)
+
+def without_sorted(values: Iterable[T], other_values: Iterable[T]) -> Iterable[T]:
+    """
+    Keeps the values which are not in `other_values`, walking both in ascending order side by side in constant memory.
+    """
+    return _walk_sorted(values, other_values, False)
+
+def merge_join(values: Iterable[T], other_values: Iterable[V], key_selector: Selector[T, U] | None,
+               other_key_selector: Selector[V, U] | None, result_selector: Callable[[T, V], R]) -> Iterable[R]:
+    """
+    Joins two inputs sorted in ascending order of their keys by walking them side by side. Only the values of
+    `other_values` with the current key are held in memory.
+    """
+    others = groupby(other_values, other_key_selector)
+    other_key, group = next(others, (_END, None))
+    for key, run in groupby(values, key_selector):
+        while other_key is not _END and other_key < key:
+            other_key, group = next(others, (_END, None))
+        if other_key is _END:
+            return
+        if other_key == key:
+            matches = list(group)
+            for x in run:
+                for y in matches:
+                    yield result_selector(x, y)
+
+class Grouping[K, T](list):
+    """
+    A `Grouping` is the list of values `group_by` collected for one `key`.
+    """
+    __slots__ = ("key",)
+
+    def __init__(self, key: K, values: Iterable[T] = ()) -> None:
+        super().__init__(values)
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Grouping):
+            return self.key == other.key and list.__eq__(self, other)
+        return list.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Grouping({self.key!r}, {list.__repr__(self)})"
+
+def group_by(values: Iterable[T], key_selector: Selector[T, U],
+             element_selector: Selector[T, V] | None = None) -> Iterable[Grouping[U, T | V]]:
+    """
+    Groups `values` by key in a single pass. Groups are returned in the order in which their keys first appeared.
+    """
+    groups = {}
+    for x in values:
+        key = key_selector(x)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = Grouping(key)
+        group.append(x if element_selector is None else element_selector(x))
+    yield from groups.values()
+
+def _named(aggregate: str, spec) -> List[Tuple[str, Callable | None]]:
+    if spec is None or spec is False:
+        return []
+    if spec is True:
+        return [(aggregate, None)]
+    if callable(spec):
+        return [(aggregate, spec)]
+    return [(name, None if func is True else func) for name, func in spec.items()]
+
+class Aggregation:
+    """
+    The aggregates `aggregate_by` computes per group. `count` is `True` (the number of values), a predicate (the number
+    of values it accepts) or a dict of names to either; `sum`, `min`, `max` and `avg` are a selector or a dict of
+    names to selectors. A group's state is one list: the number of values, then one slot per counting predicate, sum,
+    average (its sum), min and max, in this order.
+    """
+    __slots__ = ("counted", "summed", "minimized", "maximized", "outputs", "_selectors", "_sums_end",
+                 "_mins_end")
+
+    def __init__(self, count: bool | Callable | Dict = False, sum: Callable | Dict | None = None,
+                 min: Callable | Dict | None = None, max: Callable | Dict | None = None,
+                 avg: Callable | Dict | None = None) -> None:
+        specs = {"count": _named("count", count), "sum": _named("sum", sum), "min": _named("min", min),
+                 "max": _named("max", max), "avg": _named("avg", avg)}
+        names = ["key"] + [name for named in specs.values() for name, _ in named]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"duplicate aggregate names: {sorted(duplicates)}")
+        for kind in ("sum", "min", "max", "avg"):
+            for name, selector in specs[kind]:
+                if selector is None:
+                    raise TypeError(f"aggregate {name!r} needs a selector")
+        self.counted, self.summed, self.minimized, self.maximized = [], [], [], []
+        targets = {"count": self.counted, "sum": self.summed, "avg": self.summed, "min": self.minimized,
+                   "max": self.maximized}
+        layout = [(kind, name, func) for kind in ("count", "sum", "avg", "min", "max") for name, func in specs[kind]
+                  if func is not None]
+        # plain counts read the number of values in slot 0
+        slots = {name: 0 for name, predicate in specs["count"] if predicate is None}
+        for slot, (kind, name, func) in enumerate(layout, 1):
+            targets[kind].append((slot, func))
+            slots[name] = slot
+        self._selectors = [selector for _, selector in self.summed + self.minimized + self.maximized]
+        self._sums_end = 1 + len(self.counted) + len(self.summed)
+        self._mins_end = self._sums_end + len(self.minimized)
+        averaged = {name for name, _ in specs["avg"]}
+        self.outputs = [(name, slots[name], name in averaged) for name in names[1:]]
+
+    def start(self, x: T) -> List:
+        if self.counted:
+            return [1, *[1 if predicate(x) else 0 for _, predicate in self.counted], *[f(x) for f in self._selectors]]
+        return [1, *[selector(x) for selector in self._selectors]]
+
+    def counts_only(self) -> bool:
+        return not (self.counted or self.summed or self.minimized or self.maximized)
+
+    def accumulate(self, groups: Dict[U, List], values: Iterable[T], key_selector: Selector[T, U],
+                   max_groups: int | None = None, spill: Callable[[], None] | None = None) -> None:
+        """
+        Adds `values` to the states in `groups`, a dict of keys to states. `spill` is called to empty `groups` before
+        a new key would make it exceed `max_groups`.
+        """
+        counted, summed, minimized, maximized = self.counted, self.summed, self.minimized, self.maximized
+        start = self.start
+        get = groups.get
+        for x in values:
+            key = key_selector(x)
+            state = get(key)
+            if state is None:
+                if max_groups is not None and len(groups) >= max_groups:
+                    spill()
+                groups[key] = start(x)
+                continue
+            # the empty kinds are skipped, their loops would cost more than the checks
+            state[0] += 1
+            if counted:
+                for slot, predicate in counted:
+                    if predicate(x):
+                        state[slot] += 1
+            if summed:
+                for slot, selector in summed:
+                    state[slot] += selector(x)
+            if minimized:
+                for slot, selector in minimized:
+                    value = selector(x)
+                    if value < state[slot]:
+                        state[slot] = value
+            if maximized:
+                for slot, selector in maximized:
+                    value = selector(x)
+                    if state[slot] < value:
+                        state[slot] = value
+
+    def combine(self, state: List, other: List) -> None:
+        for slot in range(self._sums_end):
+            state[slot] += other[slot]
+        for slot in range(self._sums_end, self._mins_end):
+            if other[slot] < state[slot]:
+                state[slot] = other[slot]
+        for slot in range(self._mins_end, len(state)):
+            if state[slot] < other[slot]:
+                state[slot] = other[slot]
+
+    def result(self, key: U, state: List) -> Dict[str, object]:
+        record = {"key": key}
+        for name, slot, average in self.outputs:
+            record[name] = state[slot] / state[0] if average else state[slot]
+        return record
+
+_PARTITIONS = 16
+_MAX_PARTITION_LEVEL = 8
+
+def _spill_partitions(groups: Dict[U, List], partitions: List, level: int) -> None:
+    """
+    Appends the `(key, state)` records of `groups` to one of the `partitions` files each, by the hash of the key, so
+    every key of a partition can be combined without reading the others. `level` salts the hash for nested partitions.
+    """
+    buckets = [[] for _ in partitions]
+    for record in groups.items():
+        buckets[hash((level, record[0])) % len(partitions)].append(record)
+    for file, bucket in zip(partitions, buckets):
+        if bucket:
+            pickle.dump(bucket, file, pickle.HIGHEST_PROTOCOL)
+    groups.clear()
+
+def _combine_partitions(partitions: List, aggregation: 'Aggregation', max_groups: int,
+                        level: int) -> Iterable[Tuple[U, List]]:
+    for file in partitions:
+        file.seek(0)
+        groups = {}
+        nested = []
+        try:
+            for key, state in _read_run(file):
+                current = groups.get(key)
+                if current is not None:
+                    aggregation.combine(current, state)
+                    continue
+                if len(groups) >= max_groups and level < _MAX_PARTITION_LEVEL:
+                    # more keys than fit in memory ended up in this partition, split it up once more
+                    if not nested:
+                        nested = [TemporaryFile() for _ in range(_PARTITIONS)]
+                    _spill_partitions(groups, nested, level + 1)
+                groups[key] = state
+            file.close()
+            if nested:
+                _spill_partitions(groups, nested, level + 1)
+                yield from _combine_partitions(nested, aggregation, max_groups, level + 1)
+            else:
+                yield from groups.items()
+        finally:
+            for nested_file in nested:
+                nested_file.close()
+
+def aggregate_by(values: Iterable[T], key_selector: Selector[T, U], aggregation: Aggregation,
+                 max_groups: int | None = None) -> Iterable[Dict[str, object]]:
+    """
+    Aggregates `values` per key in a single pass, keeping one small state per group instead of its values. Results
+    are dicts of the `key` and the aggregates, in the order in which the keys first appeared.
+
+    With `max_groups` at most that many states are held in memory: whenever a new key would exceed it, the states are
+    spilled to 16 temporary files partitioned by the hash of their keys. At the end the partitions are combined one at
+    a time (a partition with too many keys is partitioned again), so keys and aggregates have to be picklable and
+    results come in no particular order.
+    """
+    if max_groups is not None and max_groups < 1:
+        raise ValueError("max_groups must be at least 1")
+    result = aggregation.result
+    if max_groups is None and aggregation.counts_only():
+        # only the number of values per key: counted in C
+        for key, size in Counter(map(key_selector, values)).items():
+            yield result(key, [size])
+        return
+    groups = {}
+    partitions = []
+
+    def spill() -> None:
+        if not partitions:
+            partitions.extend(TemporaryFile() for _ in range(_PARTITIONS))
+        _spill_partitions(groups, partitions, 0)
+    try:
+        aggregation.accumulate(groups, values, key_selector, max_groups, spill)
+        if partitions:
+            _spill_partitions(groups, partitions, 0)
+            states = _combine_partitions(partitions, aggregation, max_groups, 0)
+        else:
+            states = groups.items()
+        for key, state in states:
+            yield result(key, state)
+    finally:
+        for file in partitions:
+            file.close()
+
+def _chunks(values: Iterable[T], size: int, factory: Callable[[List[T]], U]) -> Iterable[U]:
+    values = iter(values)
+    while batch := list(islice(values, size)):
+        yield factory(batch)
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+_END = object()
+
+def _read_ahead(values: Iterable[T], queue: Queue, stopped: Event) -> None:
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+    try:
+        for x in values:
+            if not put(x):
+                return
+    except BaseException as error:
+        put(_Failure(error))
+        return
+    put(_END)
+
+def _timed_chunks(values: Iterable[T], size: int, factory: Callable[[List[T]], U], max_latency: float) -> Iterable[U]:
+    """
+    Chunks `values` like `_chunks`, but also yields a partial chunk once its first value waited `max_latency` seconds.
+    The source is read by a thread, at most `size` values ahead, so a slow source can't hold back a partial chunk.
+    """
+    queue = Queue(maxsize=size)
+    stopped = Event()
+    Thread(target=_read_ahead, args=(values, queue, stopped), daemon=True).start()
+    try:
+        batch = []
+        deadline = None
+        while True:
+            try:
+                x = queue.get(timeout=None if deadline is None else max(0.0, deadline - monotonic()))
+            except Empty:
+                yield factory(batch)
+                batch, deadline = [], None
+                continue
+            if x is _END:
+                break
+            if isinstance(x, _Failure):
+                raise x.error
+            batch.append(x)
+            if deadline is None:
+                deadline = monotonic() + max_latency
+            if len(batch) >= size:
+                yield factory(batch)
+                batch, deadline = [], None
+        if batch:
+            yield factory(batch)
+    finally:
+        stopped.set()
+
+def chunk(values: Iterable[T], size: int, factory: Callable[[List[T]], U] = list,
+          max_latency: float | None = None) -> Iterable[U]:
+    """
+    Splits `values` into chunks of `size` values, the last one possibly shorter, each built with `factory` from a list
+    (e.g. `tuple` or `partial(array, "d")`). With `max_latency` a chunk is also cut short once its first value waited
+    that many seconds.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    if max_latency is None:
+        return _chunks(values, size, factory)
+    return _timed_chunks(values, size, factory, max_latency)
+
+def _checked(results: Iterable[U], batch: List[T]) -> Iterable[U]:
+    if hasattr(results, "__len__") and len(results) != len(batch):
+        raise ValueError(f"batch function returned {len(results)} results for {len(batch)} values")
+    return results
+
+def _batch_select(batches: Iterable[List[T]], selector: Callable[[List[T]], Iterable[U]]) -> Iterable[U]:
+    for batch in batches:
+        yield from _checked(selector(batch), batch)
+
+def _batch_where(batches: Iterable[List[T]], predicate: Callable[[List[T]], Iterable[bool]]) -> Iterable[T]:
+    for batch in batches:
+        yield from compress(batch, _checked(predicate(batch), batch))
+
+def batch_select(values: Iterable[T], selector: Callable[[List[T]], Iterable[U]], size: int,
+                 max_latency: float | None = None) -> Iterable[U]:
+    """
+    Projects `values` with a selector which is called with lists of up to `size` values and returns one result per
+    value, in the same order.
+    """
+    return _batch_select(chunk(values, size, list, max_latency), selector)
+
+def batch_where(values: Iterable[T], predicate: Callable[[List[T]], Iterable[bool]], size: int,
+                max_latency: float | None = None) -> Iterable[T]:
+    """
+    Filters `values` with a predicate which is called with lists of up to `size` values and returns one `bool` per
+    value, in the same order.
+    """
+    return _batch_where(chunk(values, size, list, max_latency), predicate)
+
+def _concurrent(values: Iterable[T], func: Callable[[T], U], max_workers: int, prefetch: int, ordered: bool,
+                filtering: bool) -> Iterable[T | U]:
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix="select_concurrent")
+    pending: Dict[Future, T] = {}
+    try:
+        source = iter(values)
+        for x in islice(source, prefetch):
+            pending[executor.submit(func, x)] = x
+        while pending:
+            if ordered:
+                # dicts keep insertion order, so the first future belongs to the oldest value
+                done = (next(iter(pending)),)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                x = pending.pop(future)
+                result = future.result()
+                for y in islice(source, 1):
+                    pending[executor.submit(func, y)] = y
+                if not filtering:
+                    yield result
+                elif result:
+                    yield x
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+def _checked_workers(max_workers: int, prefetch: int | None) -> int:
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    if prefetch is None:
+        return 2 * max_workers
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    return prefetch
+
+def select_concurrent(values: Iterable[T], selector: Selector[T, U], max_workers: int, prefetch: int | None = None,
+                      ordered: bool = True) -> Iterable[U]:
+    """
+    Projects `values` with `selector` called in `max_workers` threads, for selectors which wait on I/O. At most
+    `prefetch` calls (twice `max_workers` by default) are in flight, and a value is only read from the source when a
+    call finishes. Results come in source order unless `ordered` is false, then in the order the calls finish. A
+    selector's exception is raised when its result is due; closing the iterator cancels the calls which haven't started
+    and waits for the running ones.
+    """
+    prefetch = _checked_workers(max_workers, prefetch)
+    return _concurrent(values, selector, max_workers, prefetch, ordered, False)
+
+def where_concurrent(values: Iterable[T], predicate: Predicate[T], max_workers: int, prefetch: int | None = None,
+                     ordered: bool = True) -> Iterable[T]:
+    """
+    Filters `values` with `predicate` called in `max_workers` threads, like `select_concurrent`.
+    """
+    prefetch = _checked_workers(max_workers, prefetch)
+    return _concurrent(values, predicate, max_workers, prefetch, ordered, True)
+
+def window(values: Iterable[T], size: int, step: int = 1) -> Iterable[Tuple[T, ...]]:
+    """
+    Yields every full window of `size` consecutive values as a tuple, starting a new window every `step` values, so
+    windows overlap if `step` is smaller than `size` and leave gaps if it is larger. Only `size` values are held.
+    """
+    if size < 1 or step < 1:
+        raise ValueError("size and step must be at least 1")
+    return _windows(values, size, step)
+
+def _windows(values: Iterable[T], size: int, step: int) -> Iterable[Tuple[T, ...]]:
+    values = iter(values)
+    buffer = deque(islice(values, size), maxlen=size)
+    if len(buffer) < size:
+        return
+    yield tuple(buffer)
+    gap, advance = max(0, step - size), min(step, size)
+    while True:
+        if gap:
+            deque(islice(values, gap), maxlen=0)
+        added = list(islice(values, advance))
+        if len(added) < advance:
+            return
+        buffer.extend(added)
+        yield tuple(buffer)
+
+def _sliding_sum(values: Iterable[T], size: int, average: bool) -> Iterable[T]:
+    buffer = deque()
+    total = 0
+    removed = 0
+    for x in values:
+        buffer.append(x)
+        total += x
+        if len(buffer) > size:
+            total -= buffer.popleft()
+            removed += 1
+            if removed == size:
+                # adding and subtracting floats accumulates rounding errors, re-summing once per window bounds them
+                total = sum(buffer)
+                removed = 0
+        if len(buffer) == size:
+            yield total / size if average else total
+
+def _sliding_extreme(values: Iterable[T], size: int, keeps: Callable[[T, T], bool]) -> Iterable[T]:
+    # a monotonic deque: each candidate beats every later one, so the first is the extreme of the window
+    candidates = deque()
+    for i, x in enumerate(values):
+        while candidates and not keeps(candidates[-1][1], x):
+            candidates.pop()
+        candidates.append((i, x))
+        if candidates[0][0] <= i - size:
+            candidates.popleft()
+        if i >= size - 1:
+            yield candidates[0][1]
+
+def sliding_aggregate(values: Iterable[T], size: int, aggregate: str | Callable[[Tuple[T, ...]], U] = "sum") -> Iterable[U]:
+    """
+    Yields an aggregate of the last `size` values for every value from the `size`-th on. `"sum"` and `"avg"` keep a
+    running sum and `"min"` and `"max"` a monotonic deque, so each value costs O(1). Any other `aggregate` is a function
+    called with every window as a tuple, which costs O(size) per value.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    if callable(aggregate):
+        return map(aggregate, _windows(values, size, 1))
+    if aggregate in ("sum", "avg"):
+        return _sliding_sum(values, size, aggregate == "avg")
+    if aggregate in ("min", "max"):
+        return _sliding_extreme(values, size, lt if aggregate == "min" else gt)
+    raise ValueError(f"aggregate must be 'sum', 'avg', 'min', 'max' or a function, not {aggregate!r}")
+
+class TimeWindow[T](list):
+    """
+    A `TimeWindow` is the list of values `tumbling_by_time` collected for the time span from `start` (inclusive) to
+    `end` (exclusive).
+    """
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: float, end: float, values: Iterable[T] = ()) -> None:
+        super().__init__(values)
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TimeWindow):
+            return (self.start, self.end) == (other.start, other.end) and list.__eq__(self, other)
+        return list.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TimeWindow({self.start!r}, {self.end!r}, {list.__repr__(self)})"
+
+def tumbling_by_time(values: Iterable[T], ts_selector: Selector[T, float], width: float, allowed_lateness: float = 0,
+                     on_late: Callable[[T], None] | None = None) -> Iterable[TimeWindow[T]]:
+    """
+    Groups values into consecutive windows of `width` by their numeric timestamps, e.g. epoch seconds. Values may arrive
+    out of order: a window is emitted once a timestamp of at least its end plus `allowed_lateness` was seen (or at the
+    end of the input), in order of their start. Values for a window which was already emitted are late and passed to
+    `on_late` if given, otherwise dropped. Empty windows are skipped.
+    """
+    if width <= 0:
+        raise ValueError("width must be positive")
+    if allowed_lateness < 0:
+        raise ValueError("allowed_lateness must not be negative")
+    return _tumbling_by_time(values, ts_selector, width, allowed_lateness, on_late)
+
+def _tumbling_by_time(values: Iterable[T], ts_selector: Selector[T, float], width: float, allowed_lateness: float,
+                      on_late: Callable[[T], None] | None) -> Iterable[TimeWindow[T]]:
+    windows: Dict[float, TimeWindow[T]] = {}
+    starts = []
+    watermark = None
+    for x in values:
+        ts = ts_selector(x)
+        start = ts - ts % width
+        if watermark is not None and start + width <= watermark:
+            if on_late is not None:
+                on_late(x)
+            continue
+        window = windows.get(start)
+        if window is None:
+            window = windows[start] = TimeWindow(start, start + width)
+            heappush(starts, start)
+        window.append(x)
+        if watermark is None or ts - allowed_lateness > watermark:
+            watermark = ts - allowed_lateness
+            while starts and starts[0] + width <= watermark:
+                yield windows.pop(heappop(starts))
+    while starts:
+        yield windows.pop(heappop(starts))
+
+def approx_distinct_count(values: Iterable[T], precision: int = 14) -> int:
+    sketch = HyperLogLog(precision)
+    sketch.update(values)
+    return sketch.count()
+
+def approx_quantiles(values: Iterable[T], quantiles: Iterable[float], k: int = 200) -> List[T]:
+    sketch = QuantileSketch(k)
+    sketch.update(values)
+    return sketch.quantiles(quantiles)
+
+def sample(values: Iterable[T], k: int, seed=None) -> List[T]:
+    reservoir = Reservoir(k, seed)
+    reservoir.update(values)
+    return reservoir.values
 
 def anything(values: Iterable[T], predicate: Predicate[T]) -> bool:
     return any(predicate(x) for x in values)
@@ -124,7 +895,9 @@ def every(values: Iterable[T], predicate: Predicate[T]) -> bool:
     return all(predicate(x) for x in values)
 
 def is_empty(values: Iterable[T]) -> bool:
-    return sum(1 for _ in values) == 0
+    for _ in values:
+        return False
+    return True
 
 def to_list(values: Iterable[T]) -> List[T]:
     return list(values)
@@ -133,3 +906,71 @@ def to_set(values: Iterable[T]) -> set[T]:
     return set(values)
 
 
+
+def typed_view(buffer, format: str | None = None) -> memoryview:
+    """
+    Returns a one dimensional memoryview of `buffer` (`bytes`, `bytearray`, `array.array`, `mmap`, ...) without
+    copying it. Its elements have the `struct` `format` of a single native type like `"i"` or `"d"`, by default the
+    format of the buffer.
+    """
+    view = memoryview(buffer)
+    if (format is None or format == view.format) and view.ndim == 1:
+        return view
+    if not view.c_contiguous:
+        raise ValueError("only contiguous buffers can be viewed as typed elements")
+    return view.cast("B").cast(format or view.format)
+
+def _same_format(values: Iterable, typecode: str) -> bool:
+    return isinstance(values, memoryview) and values.format == typecode and values.c_contiguous
+
+def to_array(values: Iterable[T], typecode: str) -> array:
+    if _same_format(values, typecode):
+        result = array(typecode)
+        result.frombytes(values.cast("B"))
+        return result
+    return array(typecode, values)
+
+def to_bytes(values: Iterable[T], typecode: str = "B") -> bytes:
+    if _same_format(values, typecode):
+        return values.tobytes()
+    return to_array(values, typecode).tobytes()
+
+def to_buffer(values: Iterable[T], typecode: str) -> memoryview:
+    if _same_format(values, typecode):
+        return values
+    return memoryview(to_array(values, typecode))
+
+class Lookup[K, T](dict):
+    """
+    A `Lookup` maps keys to the lists of values with that key. Unlike a dict it returns an empty list for a missing key.
+    """
+    __slots__ = ()
+
+    def __missing__(self, key: K) -> List[T]:
+        return []
+
+def to_lookup(values: Iterable[T], key_selector: Selector[T, U],
+              value_selector: Selector[T, V] | None = None) -> Lookup[U, T | V]:
+    lookup = Lookup()
+    get = lookup.get
+    for x in values:
+        key = key_selector(x)
+        group = get(key)
+        if group is None:
+            group = lookup[key] = []
+        group.append(x if value_selector is None else value_selector(x))
+    return lookup
+
+def to_dict(values: Iterable[T], key_selector: Selector[T, U],
+            value_selector: Selector[T, V] | None = None) -> Dict[U, T | V]:
+    """
+    Maps the key of every value to the value (or `value_selector` applied to it). Raises `ValueError` if two values have
+    the same key.
+    """
+    values = values if isinstance(values, list) else list(values)
+    result = dict(zip(map(key_selector, values), values if value_selector is None else map(value_selector, values)))
+    if len(result) < len(values):
+        keys = set()
+        duplicate = next(key for key in map(key_selector, values) if key in keys or keys.add(key))
+        raise ValueError(f"duplicate key: {duplicate!r}")
+    return result
@@ -1,252 +1,667 @@
+from array import array
 from collections.abc import Iterable
+from random import Random
 from types import UnionType
-from typing import Callable, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 from enumerable_funcs import *
-from threading import Lock
+from parallel_enumerables import ParallelEnumerable
+from memoized_iterables import MemoizedIterable
+from caches import LRU, TTL
+import file_io
+import incremental
+import indexes
+import query_plan
 
 class Enumerable:
     """
     The `Enumerable` class is  used to perform LINQ-like operations on a collection of values.
+
+    Enumerable objects are immutable: every method returns a new object which shares the source and extends the query
+    plan, so building and sharing queries between threads needs no locking. Enumerating the same query from several
+    threads is safe as long as the source itself can be iterated concurrently (e.g. a list, or see `memoize`).
     """
-    def __init__(self) -> None:
-        self._values: Iterable = []
-        self._lock = Lock()
+    __slots__ = ("_values", "_plan")
+
+    def __init__(self, values: Iterable = (), plan: Tuple[query_plan.Stage, ...] = ()) -> None:
+        self._values = values
+        self._plan = plan
 
     def of(self, values: Iterable) -> 'Enumerable':
         """
         The `of` method is used to create an Enumerable object from a collection of values.
         """
-        with self._lock:
-            self._values = values
-            return self
+        return Enumerable(values)
+
+    def _then(self, stage: query_plan.Stage) -> 'Enumerable':
+        return Enumerable(self._values, self._plan + (stage,))
+
+    def _iterable(self) -> Iterable:
+        if not self._plan:
+            return self._values
+        return query_plan.iterate(self._values, self._plan)
+
+    def _compiled(self) -> Iterable:
+        # unlike `_iterable` a sliced buffer or range source stays a slice of it
+        if not self._plan:
+            return self._values
+        return query_plan.compile_plan(self._values, self._plan)
 
     def empty(self) -> 'Enumerable':
         """
         The `empty` method is used to create an empty Enumerable object.
         """
-        return Enumerable().of([])
+        return Enumerable([])
+
+    @staticmethod
+    def from_lines(path: file_io.Path, encoding: str = "utf-8", compression: str | None = "infer",
+                   use_mmap: bool = False, block_size: int = file_io.BLOCK_SIZE) -> 'Enumerable[str]':
+        """
+        The `from_lines` method is used to create an Enumerable object over the lines of a text file, without line
+        breaks. The file is read lazily in blocks of `block_size` bytes, optionally memory-mapped, and reopened
+        whenever the Enumerable object is enumerated. Files ending in `.gz` are decompressed unless `compression`
+        is `None`.
+        """
+        return Enumerable(file_io.LineSource(path, encoding, compression, use_mmap, block_size))
+
+    @staticmethod
+    def from_csv(path: file_io.Path, columns: List[str | int] | None = None,
+                 types: Dict[str | int, Callable[[str], T]] | None = None, header: bool = True,
+                 encoding: str = "utf-8", compression: str | None = "infer", use_mmap: bool = False,
+                 block_size: int = file_io.BLOCK_SIZE, **dialect: Any) -> 'Enumerable':
+        """
+        The `from_csv` method is used to create an Enumerable object over the rows of a CSV file, as dicts if the file
+        has a header row and as lists otherwise. With `columns` only those columns are kept (lists of the selected
+        values without a header) and only the kept columns are converted with `types`, e.g. `{"status": int}`.
+        Further keyword arguments are passed to `csv.reader`.
+        """
+        lines = file_io.LineSource(path, encoding, compression, use_mmap, block_size)
+        return Enumerable(file_io.CsvSource(lines, columns, types, header, **dialect))
+
+    @staticmethod
+    def from_jsonl(path: file_io.Path, fields: List[str] | None = None, encoding: str = "utf-8",
+                   compression: str | None = "infer", use_mmap: bool = False,
+                   block_size: int = file_io.BLOCK_SIZE) -> 'Enumerable':
+        """
+        The `from_jsonl` method is used to create an Enumerable object over the values of a JSON lines file. Lines are
+        only parsed when they are enumerated; with `fields` every object is reduced to those keys.
+        """
+        lines = file_io.LineSource(path, encoding, compression, use_mmap, block_size)
+        return Enumerable(file_io.JsonlSource(lines, fields))
 
-    def where(self, predicate: Callable[[T], bool]) -> 'Enumerable':
+    @staticmethod
+    def of_buffer(buffer: Any, format: str | None = None) -> 'Enumerable':
         """
-        The `where` method is used to filter the values of the Enumerable object based on a predicate.
+        The `of_buffer` method is used to create an Enumerable object over the typed elements of a buffer (`bytes`,
+        `bytearray`, `array.array`, `mmap`, `memoryview`, ...) without copying it. `format` is a `struct` format
+        character like `"i"` or `"d"`, by default the format of the buffer. `skip`, `take`, `count`, `last` and
+        `element_at` slice or index the buffer instead of iterating it.
         """
-        with self._lock:
-            return Enumerable().of(where(self._values, predicate))
+        return Enumerable(typed_view(buffer, format))
 
-    def select(self, selector: Callable[[T], T]) -> 'Enumerable':
+    def where(self, predicate: Callable[[T], bool], cache: LRU | TTL | None = None,
+              key: Callable[[T], Any] | None = None) -> 'Enumerable':
         """
-        The `select` method is used to project the values of the Enumerable object based on a selector.
+        The `where` method is used to filter the values of the Enumerable object based on a predicate. With a `cache`
+        (`LRU(maxsize)` or `TTL(seconds)`) the result of the predicate is looked up by `key(x)`, or the value itself,
+        before calling it; the cache can be shared by many queries.
         """
-        with self._lock:
-            return Enumerable().of(select(self._values, selector))
+        if cache is not None:
+            predicate = cache.cached(predicate, key)
+        return self._then(query_plan.Where(predicate))
+
+    def select(self, selector: Callable[[T], T], cache: LRU | TTL | None = None,
+               key: Callable[[T], Any] | None = None) -> 'Enumerable':
+        """
+        The `select` method is used to project the values of the Enumerable object based on a selector. With a `cache`
+        the results are looked up by `key(x)` (or the value itself) like for `where`.
+        """
+        if cache is not None:
+            selector = cache.cached(selector, key)
+        return self._then(query_plan.Select(selector))
 
     def select_many(self, selector: Callable[[T], Iterable[T]]) -> 'Enumerable':
         """
         The `select_many` method flattens the values of the Enumerable object based on a selector.
         """
-        with self._lock:
-            return Enumerable().of(select_many(self._values, selector))
+        return self._then(query_plan.SelectMany(selector))
+
+    def chunk(self, size: int, factory: Callable[[List[T]], T] = list, max_latency: float | None = None) -> 'Enumerable':
+        """
+        The `chunk` method is used to split the values of the Enumerable object into chunks of `size` values (the last
+        one may be shorter). Chunks are lists unless another `factory` is given, e.g. `tuple` or `partial(array, "d")`.
+        With `max_latency` a chunk is also emitted once its first value waited that many seconds, in which case the
+        source is read by a background thread.
+        """
+        return self._then(query_plan.Apply("chunk", chunk, size, factory, max_latency))
+
+    def batch_select(self, selector: Callable[[List[T]], Iterable[T]], size: int,
+                     max_latency: float | None = None) -> 'Enumerable':
+        """
+        The `batch_select` method is used to project the values of the Enumerable object with a selector which takes a
+        list of up to `size` values and returns one result per value, e.g. a bulk cache or database lookup. The results
+        are returned in order as a flat stream.
+        """
+        return self._then(query_plan.Apply("batch_select", batch_select, selector, size, max_latency))
+
+    def batch_where(self, predicate: Callable[[List[T]], Iterable[bool]], size: int,
+                    max_latency: float | None = None) -> 'Enumerable':
+        """
+        The `batch_where` method is used to filter the values of the Enumerable object with a predicate which takes a
+        list of up to `size` values and returns one `bool` per value.
+        """
+        return self._then(query_plan.Apply("batch_where", batch_where, predicate, size, max_latency))
+
+    def window(self, size: int, step: int = 1) -> 'Enumerable[Tuple]':
+        """
+        The `window` method is used to get sliding windows of `size` consecutive values as tuples, a new one every
+        `step` values (`step=size` gives tumbling windows). Only full windows are returned.
+        """
+        return self._then(query_plan.Apply("window", window, size, step))
+
+    def sliding_aggregate(self, size: int, aggregate: str | Callable[[Tuple], T] = "sum") -> 'Enumerable':
+        """
+        The `sliding_aggregate` method is used to get a rolling `"sum"`, `"avg"`, `"min"` or `"max"` of the last `size`
+        values for every value once `size` values were seen. These are updated in O(1) per value with a running sum or
+        a monotonic deque; a function as `aggregate` is called with every window as a tuple instead.
+        """
+        return self._then(query_plan.Apply("sliding_aggregate", sliding_aggregate, size, aggregate))
+
+    def tumbling_by_time(self, ts_selector: Callable[[T], float], width: float, allowed_lateness: float = 0,
+                         on_late: Callable[[T], None] | None = None) -> 'Enumerable[TimeWindow]':
+        """
+        The `tumbling_by_time` method is used to group the values into consecutive `TimeWindow`s of `width` by their
+        numeric timestamps. Values may be out of order by up to `allowed_lateness`: a window is emitted once a value
+        that much past its end was seen, and values arriving after their window was emitted go to `on_late` (or are
+        dropped).
+        """
+        return self._then(query_plan.Apply("tumbling_by_time", tumbling_by_time, ts_selector, width, allowed_lateness,
+                                           on_late))
+
+    def select_concurrent(self, selector: Callable[[T], T], max_workers: int, prefetch: int | None = None,
+                          ordered: bool = True) -> 'Enumerable':
+        """
+        The `select_concurrent` method is used to project the values of the Enumerable object with a selector which
+        waits on I/O, called in a pool of `max_workers` threads. At most `prefetch` calls (twice `max_workers` by
+        default) are in flight and the source is read as calls finish, so infinite sources work. Results keep the
+        source order unless `ordered` is false. Stopping early (e.g. after `take`) cancels the calls not yet started.
+        """
+        return self._then(query_plan.Apply("select_concurrent", select_concurrent, selector, max_workers, prefetch,
+                                           ordered))
 
-    def distinct(self) -> 'Enumerable':
+    def where_concurrent(self, predicate: Callable[[T], bool], max_workers: int, prefetch: int | None = None,
+                         ordered: bool = True) -> 'Enumerable':
         """
-        The `distinct` method is used to remove duplicate values from the Enumerable object.
+        The `where_concurrent` method is used to filter the values of the Enumerable object with a predicate called in
+        a pool of `max_workers` threads, like `select_concurrent`.
         """
-        with self._lock:
-            seen = set()
-            return Enumerable().of(distinct(self._values))
+        return self._then(query_plan.Apply("where_concurrent", where_concurrent, predicate, max_workers, prefetch,
+                                           ordered))
 
-    def distinct_by(self, key_selector: Callable[[T], T]) -> 'Enumerable':
+    def distinct(self, max_keys: int | None = None, mode: str = "lru") -> 'Enumerable':
+        """
+        The `distinct` method is used to remove duplicate values from the Enumerable object. With `max_keys` only
+        recently seen values are remembered, in bounded memory: the last `max_keys` distinct values with `mode="lru"`,
+        or at least that many in Bloom filters with `mode="bloom"`, which drop about 1% of the new values as false
+        positives but take a few bytes per value.
+        """
+        known = self._capabilities()
+        if known.distinct:
+            return self
+        if max_keys is None:
+            return self._then(query_plan.Apply("distinct", distinct_sorted if known.sorted else distinct))
+        return self._then(query_plan.Apply("distinct", distinct, max_keys, mode))
+
+    def distinct_by(self, key_selector: Callable[[T], T], max_keys: int | None = None,
+                    mode: str = "lru") -> 'Enumerable':
         """
         The `distinct_by` method is used to remove duplicate values from the Enumerable object based on a key selector.
+        `max_keys` and `mode` bound the memory of seen keys like for `distinct`.
         """
-        with self._lock:
-            return Enumerable().of(distinct_by(self._values, key_selector))
+        if max_keys is None:
+            return self._then(query_plan.Apply("distinct_by", distinct_by, key_selector))
+        return self._then(query_plan.Apply("distinct_by", distinct_by, key_selector, max_keys, mode))
 
     def take(self, count: int) -> 'Enumerable':
         """
         The `take` method is used to take the first `count` values from the Enumerable object.
         """
-        with self._lock:
-            return Enumerable().of(take(self._values, count))
+        return self._then(query_plan.take_stage(count))
 
     def take_while(self, predicate: Callable[[T], bool]) -> 'Enumerable':
         """
         The `take_while` method is used to take values from the Enumerable object while the predicate is true.
         """
-        with self._lock:
-            return Enumerable().of(take_while(self._values, predicate))
+        return self._then(query_plan.TakeWhile(predicate))
 
     def skip(self, count: int) -> 'Enumerable':
         """
         The `skip` method is used to skip the first `count` values from the Enumerable object.
         """
-        with self._lock:
-            return Enumerable().of(skip(self._values, count))
+        return self._then(query_plan.skip_stage(count))
 
     def skip_while(self, predicate: Callable[[T], bool]) -> 'Enumerable':
         """
         The `skip_while` method is used to skip values from the Enumerable object while the predicate is true.
         """
-        with self._lock:
-            return Enumerable().of(skip_while(self._values, predicate))
+        return self._then(query_plan.Apply("skip_while", skip_while, predicate))
 
     def aggregate(self, func: Callable[[T, T], T]) -> T:
         """
         The `aggregate` method is used to apply an accumulator function over the values of the Enumerable object
         """
-        with self._lock:
-            return aggregate(self._values, func)
+        result = query_plan.aggregate(self._values, self._plan, func)
+        if result is query_plan.MISSING:
+            raise TypeError("aggregate() of empty sequence with no initial value")
+        return result
 
     def aggregate_with_seed(self, func: Callable[[T, T], T], seed: T) -> T:
         """
         The `aggregate_with_seed` method is used to apply an accumulator function over the values of the Enumerable
         object with a seed/initial value.
         """
-        with self._lock:
-            return aggregate_with_seed(self._values, func, seed)
+        return query_plan.aggregate(self._values, self._plan, func, seed)
 
     def count(self) -> int:
         """
-        The `count` method is used to count the number of values in the Enumerable object.
+        The `count` method is used to count the number of values in the Enumerable object. If the number is known
+        from the source (e.g. a list or range with only `select`/`skip`/`take` applied) nothing is enumerated.
         """
-        with self._lock:
-            return count(self._values)
+        size = query_plan.length(self._values, self._plan)
+        if size is not None:
+            return size
+        return query_plan.count(self._values, self._plan)
 
     def count_where(self, predicate: Callable[[T], bool]) -> int:
         """
         The `count_where` method is used to count the number of values in the Enumerable object that satisfy a predicate.
         """
-        with self._lock:
-            return count_where(self._values, predicate)
+        return query_plan.count(self._values, self._plan + (query_plan.Where(predicate),))
+
+    def approx_distinct_count(self, precision: int = 14) -> int:
+        """
+        The `approx_distinct_count` method is used to estimate the number of distinct values in the Enumerable object
+        with a HyperLogLog sketch of `2 ** precision` bytes, within about `1.04 / sqrt(2 ** precision)` (0.8% by default).
+        """
+        return approx_distinct_count(self._iterable(), precision)
+
+    def approx_quantiles(self, quantiles: Iterable[float], k: int = 200) -> List:
+        """
+        The `approx_quantiles` method is used to estimate the values at the given `quantiles` (between 0 and 1) with a
+        KLL sketch, whose memory grows with `k` and only logarithmically with the number of values. The rank of every
+        result is within about `1.7 / k` of the requested quantile.
+        """
+        return approx_quantiles(self._iterable(), quantiles, k)
+
+    def sample(self, k: int, seed: Any = None) -> List:
+        """
+        The `sample` method is used to draw a uniform random sample of `k` values (or all values if there are fewer)
+        in a single pass with a reservoir. Sources with a known length are sampled by index without enumerating them.
+        """
+        view = query_plan.sequence_view(self._values, self._plan)
+        if view is not None and k >= 1:
+            return Random(seed).sample(view, min(k, len(view)))
+        return sample(self._iterable(), k, seed)
+
+    def merge(self, *others: Iterable, key: Callable[[T], T] | None = None) -> 'SortedEnumerable':
+        """
+        The `merge` method is used to lazily merge the values of the Enumerable object with `others`, all sorted in
+        ascending order of `key` (the values themselves by default), into one sorted sequence. Unlike `concat`
+        followed by a sort it holds only one value per input.
+        """
+        return SortedEnumerable(self._values, self._plan + (query_plan.Apply("merge", merge_sorted, others, key),), key)
 
     def concat(self, values: Iterable) -> 'Enumerable':
         """
         The `concat` method is used to concatenate the values of the Enumerable object with another collection of values.
         """
-        with self._lock:
-            return Enumerable().of(concat(self._values, values))
+        return self._then(query_plan.Apply("concat", concat, values))
 
     def first(self) -> T:
         """
         The `first` method is used to get the first value of the Enumerable object. If the Enumerable object is empty,
         it returns `None`.
         """
-        with self._lock:
-            return first(self._values)
+        if not self._plan and isinstance(self._values, (list, tuple)):
+            return self._values[0] if self._values else None
+        return first(query_plan.iterate(self._values, self._plan + (query_plan.take_stage(1),)))
 
     def first_where(self, predicate: Callable[[T], bool]) -> T:
         """
         The `first_where` method is used to get the first value of the Enumerable object that satisfies a predicate.
         """
-        with self._lock:
-            return first_where(self._values, predicate)
+        return first_where(self._iterable(), predicate)
 
     def last(self) -> T:
         """
         The `last` method is used to get the last value of the Enumerable object. If the Enumerable object is empty,
         it returns `None`.
         """
-        with self._lock:
-            return last(self._values)
+        view = query_plan.sequence_view(self._values, self._plan)
+        if view is not None:
+            return view[-1] if view else None
+        return last(self._iterable())
+
+    def element_at(self, index: int) -> T:
+        """
+        The `element_at` method is used to get the value at position `index` of the Enumerable object. If there are not
+        enough values, it returns `None`.
+        """
+        if index < 0:
+            return None
+        view = query_plan.sequence_view(self._values, self._plan)
+        if view is not None:
+            return view[index] if index < len(view) else None
+        plan = self._plan + (query_plan.skip_stage(index), query_plan.take_stage(1))
+        return first(query_plan.iterate(self._values, plan))
 
     def last_where(self, predicate: Callable[[T], bool]) -> T:
         """
         The `last_where` method is used to get the last value of the Enumerable object that satisfies a predicate.
         """
-        with self._lock:
-            return last_where(self._values, predicate)
+        return last_where(self._iterable(), predicate)
 
-    def sort(self, key: Callable[[T], T], reverse: bool = False) -> 'Enumerable':
+    def sort(self, key: Callable[[T], T], reverse: bool = False, max_memory_items: int | None = None) -> 'OrderedEnumerable':
         """
-        The `sort` method is used to sort the values of the Enumerable object based on a key.
+        The `sort` method is used to sort the values of the Enumerable object based on a key. Like `order_by`, the
+        values are only sorted once they are enumerated. With `max_memory_items` at most that many values are held
+        in memory, sorted runs are spilled to temporary files and merged lazily.
         """
-        with self._lock:
-            return Enumerable().of(sort(self._values, key=key, reverse=reverse))
+        if reverse:
+            return self.order_by_descending(key, max_memory_items)
+        return self.order_by(key, max_memory_items)
 
-    def sort_by(self, key: Callable[[T], T], reverse: bool = False) -> 'Enumerable':
+    def sort_by(self, key: Callable[[T], T], reverse: bool = False, max_memory_items: int | None = None) -> 'OrderedEnumerable':
         """
         The `sort_by` method is used to sort the values of the Enumerable object based on a key.
         """
-        with self._lock:
-            return Enumerable().of(sort_by(self._values, key=key, reverse=reverse))
+        return self.sort(key, reverse, max_memory_items)
+
+    def order_by(self, key: Callable[[T], T], max_memory_items: int | None = None) -> 'OrderedEnumerable':
+        """
+        The `order_by` method is used to sort the values of the Enumerable object in ascending order of a key. The
+        values are only sorted once they are enumerated; if only the first `k` values are needed (`take(k)`, `first`)
+        a bounded heap is used instead of a full sort. See `sort` for `max_memory_items`.
+        """
+        source = self._values if not self._plan else self
+        return OrderedEnumerable(query_plan.Ordering(source, [(key, False)], max_memory_items))
+
+    def order_by_descending(self, key: Callable[[T], T], max_memory_items: int | None = None) -> 'OrderedEnumerable':
+        """
+        The `order_by_descending` method is used to sort the values of the Enumerable object in descending order of a
+        key. See `order_by`.
+        """
+        source = self._values if not self._plan else self
+        return OrderedEnumerable(query_plan.Ordering(source, [(key, True)], max_memory_items))
+
+    def assume_sorted(self, key: Callable[[T], T] | None = None) -> 'SortedEnumerable':
+        """
+        The `assume_sorted` method is used to declare that the values of the Enumerable object are already in ascending
+        order of `key` (the values themselves by default), e.g. time-ordered logs. Nothing is checked. Operators which
+        keep the order carry the declaration along, and `distinct`, `intersect`, `without`, `merge` and `merge_join`
+        use it to run in constant memory.
+        """
+        return SortedEnumerable(self._values, self._plan, key)
+
+    def _sort_key(self) -> Callable[[T], T] | None:
+        return None
+
+    def _capabilities(self) -> query_plan.Capabilities:
+        return query_plan.capabilities(self._values, self._plan)
 
     def reverse(self) -> 'Enumerable':
         """
         The `reverse` method is used to reverse the values of the Enumerable object
         """
-        with self._lock:
-            return Enumerable().of(reverse(self._values))
+        view = query_plan.sequence_view(self._values, self._plan)
+        if view is not None:
+            return Enumerable(view[::-1])
+        return self._then(query_plan.Apply("reverse", reverse))
 
     def foreach(self, action: Callable[[T], None]) -> None:
         """
         The `foreach` method is used to perform an action on each value of the Enumerable object.
         """
-        with self._lock:
-            foreach(self._values, action)
+        query_plan.foreach(self._values, self._plan, action)
 
     def any(self, predicate: Callable[[T], bool]) -> bool:
         """
         The `anything` method is used to check if any value in the Enumerable object satisfies a predicate.
         """
-        with self._lock:
-            return anything(self._values, predicate)
+        return anything(self._iterable(), predicate)
 
     def all(self, predicate: Callable[[T], bool]) -> bool:
         """
         The `every` method is used to check if all values in the Enumerable object satisfy a predicate.
         """
-        with self._lock:
-            return every(self._values, predicate)
+        return every(self._iterable(), predicate)
 
     def is_empty(self) -> bool:
         """
         The `is_empty` method is used to check if the Enumerable object is empty.
         """
-        with self._lock:
-            return is_empty(self._values)
+        size = query_plan.length(self._values, self._plan)
+        if size is not None:
+            return size == 0
+        return is_empty(self._iterable())
 
     def to_list(self) -> List:
         """
         The `to_list` method is used to convert the Enumerable object to a list.
         """
-        with self._lock:
-            return list(self._values)
+        return query_plan.to_list(self._values, self._plan)
 
     def to_set(self) -> set:
         """
         The `to_set` method is used to convert the Enumerable object to a set.
         """
-        with self._lock:
-            return set(self._values)
+        return set(self._iterable())
+
+    def to_array(self, typecode: str) -> array:
+        """
+        The `to_array` method is used to convert the Enumerable object to an `array.array` of the given typecode (e.g.
+        `"q"` for 64 bit integers, `"d"` for floats), which stores the values in a fraction of the memory of a list.
+        """
+        return to_array(self._compiled(), typecode)
+
+    def to_bytes(self, typecode: str = "B") -> bytes:
+        """
+        The `to_bytes` method is used to convert the Enumerable object to the bytes of its values packed as the native
+        type of `typecode` (by default one unsigned byte per value).
+        """
+        return to_bytes(self._compiled(), typecode)
+
+    def to_buffer(self, typecode: str) -> memoryview:
+        """
+        The `to_buffer` method is used to convert the Enumerable object to a memoryview of its values packed as the
+        native type of `typecode`, which can be passed to any buffer protocol consumer without copying. A buffer
+        source of that format is returned as it is.
+        """
+        return to_buffer(self._compiled(), typecode)
+
+    def to_dict(self, key_selector: Callable[[T], T], value_selector: Callable[[T], T] | None = None) -> Dict:
+        """
+        The `to_dict` method is used to convert the Enumerable object to a dict of the key of every value to the value
+        (or `value_selector` applied to it). Raises `ValueError` if two values have the same key.
+        """
+        return to_dict(self._iterable(), key_selector, value_selector)
+
+    def to_lookup(self, key_selector: Callable[[T], T], value_selector: Callable[[T], T] | None = None) -> Lookup:
+        """
+        The `to_lookup` method is used to convert the Enumerable object to a `Lookup`, a dict of every key to the list
+        of values with that key, which returns an empty list for missing keys.
+        """
+        return to_lookup(self._iterable(), key_selector, value_selector)
+
+    def to_indexed(self, hash_keys: Iterable[Callable[[T], T]] = (),
+                   sorted_keys: Iterable[Callable[[T], T]] = ()) -> 'IndexedEnumerable':
+        """
+        The `to_indexed` method is used to copy the values of the Enumerable object into an `IndexedEnumerable` with
+        hash indexes on `hash_keys` and sorted indexes on `sorted_keys`.
+        """
+        return IndexedEnumerable(self._iterable(), hash_keys, sorted_keys)
+
+    def to_lines(self, path: file_io.Path, encoding: str = "utf-8", compression: str | None = "infer",
+                 batch_size: int = file_io.BATCH_SIZE) -> int:
+        """
+        The `to_lines` method is used to write the values of the Enumerable object to a text file, one `str(value)` per
+        line, `batch_size` lines per write. Paths ending in `.gz` are compressed. Returns the number of lines.
+        """
+        return file_io.write_lines(self._iterable(), path, encoding, compression, batch_size)
+
+    def to_jsonl(self, path: file_io.Path, encoding: str = "utf-8", compression: str | None = "infer",
+                 batch_size: int = file_io.BATCH_SIZE, **options: Any) -> int:
+        """
+        The `to_jsonl` method is used to write the values of the Enumerable object to a JSON lines file, `batch_size`
+        lines per write. Further keyword arguments are passed to `json.JSONEncoder`. Returns the number of lines.
+        """
+        return file_io.write_jsonl(self._iterable(), path, encoding, compression, batch_size, **options)
+
+    def to_csv(self, path: file_io.Path, columns: List[str] | None = None, header: bool = True,
+               encoding: str = "utf-8", compression: str | None = "infer", batch_size: int = file_io.BATCH_SIZE,
+               **dialect: Any) -> int:
+        """
+        The `to_csv` method is used to write the values of the Enumerable object, sequences or dicts, to a CSV file.
+        For dicts `columns` defaults to the keys of the first value. Rows are formatted in memory and written
+        `batch_size` rows at a time. Further keyword arguments are passed to `csv.writer`. Returns the number of rows.
+        """
+        return file_io.write_csv(self._iterable(), path, columns, header, encoding, compression, batch_size, **dialect)
 
     def combine(self, other: 'Enumerable') -> 'Enumerable':
         """
         The `combine` method is used to combine this Enumerable object with another Enumerable object.
         """
-        with self._lock:
-            return Enumerable().of(concat(self._values, other.to_list()))
+        return self._then(query_plan.Apply("combine", concat, other.to_list()))
 
     def zip(self, other: 'Enumerable') -> 'Enumerable[Tuple[T, T]]':
         """
         The `zip` method is used to zip this Enumerable object with another Enumerable object
         to create a new Enumerable object of tuples.
         """
-        with self._lock:
-            return Enumerable().of(zip(self._values, list(other)))
+        return self._then(query_plan.Apply("zip", zip, list(other)))
 
     def intersect(self, other: 'Enumerable') -> 'Enumerable':
         """
         The `intersect` method is used to get the intersection of this Enumerable object with another Enumerable object.
+        If both are known to be in ascending order (`assume_sorted`, or a `range`) they are walked side by side.
         """
-        with self._lock:
-            return Enumerable().of(intersect(self._values, other))
+        if self._capabilities().sorted and _is_sorted(other):
+            return self._then(query_plan.Apply("intersect", intersect_sorted, other))
+        return self._then(query_plan.Apply("intersect", intersect, other))
 
     def without(self, other: 'Enumerable') -> 'Enumerable':
         """
         The `without` method is used to get the values of this Enumerable object that are not in another Enumerable object.
+        Like `intersect`, inputs known to be in ascending order are walked side by side.
         """
-        with self._lock:
-            return Enumerable().of(without(self._values, other))
+        if self._capabilities().sorted and _is_sorted(other):
+            return self._then(query_plan.Apply("without", without_sorted, other))
+        return self._then(query_plan.Apply("without", without, other))
+
+    def join(self, other: Iterable, key_selector: Callable[[T], T], other_key_selector: Callable[[T], T],
+             result_selector: Callable[[T, T], T] = lambda x, y: (x, y)) -> 'Enumerable':
+        """
+        The `join` method is used to correlate the values of this Enumerable object with the values of another
+        collection based on matching keys. The smaller side (if both sizes are known, otherwise `other`) is
+        loaded into a hash table while the other side is streamed. Either way the results come in the order of the
+        values of this Enumerable object, and for each of them in the order of their matches in `other`.
+        """
+        return self._then(query_plan.Apply("join", join, other, key_selector, other_key_selector, result_selector))
+
+    def group_join(self, other: Iterable, key_selector: Callable[[T], T], other_key_selector: Callable[[T], T],
+                   result_selector: Callable[[T, List[T]], T] = lambda x, ys: (x, ys)) -> 'Enumerable':
+        """
+        The `group_join` method is used to correlate each value of this Enumerable object with the list of all
+        matching values of another collection. `other` is loaded into a hash table while this Enumerable
+        object is streamed.
+        """
+        return self._then(query_plan.Apply("group_join", group_join, other, key_selector, other_key_selector, result_selector))
+
+    def left_join(self, other: Iterable, key_selector: Callable[[T], T], other_key_selector: Callable[[T], T],
+                  result_selector: Callable[[T, T], T] = lambda x, y: (x, y)) -> 'Enumerable':
+        """
+        The `left_join` method works like `join` but also keeps the values of this Enumerable object without a
+        match, pairing them with `None`.
+        """
+        return self._then(query_plan.Apply("left_join", left_join, other, key_selector, other_key_selector, result_selector))
+
+    def merge_join(self, other: Iterable, key_selector: Callable[[T], T] | None = None,
+                   other_key_selector: Callable[[T], T] | None = None,
+                   result_selector: Callable[[T, T], T] = lambda x, y: (x, y)) -> 'Enumerable':
+        """
+        The `merge_join` method works like `join` for inputs which are both sorted in ascending order of their keys
+        (`other_key_selector` defaults to `key_selector`, which defaults to the sort key of `assume_sorted` or the
+        values themselves). It walks both inputs side by side and only holds the values of `other` with the current
+        key in memory.
+        """
+        if key_selector is None:
+            key_selector = self._sort_key()
+        if other_key_selector is None:
+            other_key_selector = key_selector
+        return self._then(query_plan.Apply("merge_join", merge_join, other, key_selector, other_key_selector,
+                                           result_selector))
+
+    def group_by(self, key_selector: Callable[[T], T],
+                 element_selector: Callable[[T], T] | None = None) -> 'Enumerable[Grouping]':
+        """
+        The `group_by` method is used to group the values of the Enumerable object by a key in a single pass. Every
+        group is a `Grouping`, a list of the values (or of `element_selector` applied to them) with a `key`
+        attribute, and groups are returned in the order in which their keys first appeared.
+        """
+        return self._then(query_plan.Apply("group_by", group_by, key_selector, element_selector))
+
+    def aggregate_by(self, key_selector: Callable[[T], T], count: bool | Callable[[T], bool] | Dict = False,
+                     sum: Callable[[T], Any] | Dict | None = None, min: Callable[[T], Any] | Dict | None = None,
+                     max: Callable[[T], Any] | Dict | None = None, avg: Callable[[T], Any] | Dict | None = None,
+                     max_groups: int | None = None) -> 'Enumerable[Dict[str, Any]]':
+        """
+        The `aggregate_by` method is used to compute aggregates per key in a single pass, keeping only one small
+        state per group instead of its values. Every result is a dict of the `key` and the requested aggregates:
+        `count=True` counts the values and a predicate counts the values it accepts, `sum`, `min`, `max` and `avg`
+        take a selector. A dict of names to selectors (or `True` for `count`) computes several aggregates of a kind.
+        With `max_groups` at most that many group states are held in memory and the rest is spilled to temporary
+        files, partitioned by the hash of the key; keys and aggregates must then be picklable and results come in no
+        particular order.
+        """
+        aggregation = Aggregation(count, sum, min, max, avg)
+        return self._then(query_plan.Apply("aggregate_by", aggregate_by, key_selector, aggregation, max_groups))
+
+    def memoize(self, release_when_consumed: bool = False) -> 'Enumerable':
+        """
+        The `memoize` method is used to evaluate the Enumerable object at most once. Values are buffered while they are
+        read the first time, and every later (or concurrent) enumeration replays the buffer. With
+        `release_when_consumed` values are dropped once every open iterator has read them, which keeps the buffer
+        small when several consumers read the values side by side.
+        """
+        return Enumerable(MemoizedIterable(self._values if not self._plan else self, release_when_consumed))
+
+    def share(self, release_when_consumed: bool = False) -> 'Enumerable':
+        """
+        The `share` method is an alias for `memoize`.
+        """
+        return self.memoize(release_when_consumed)
+
+    def materialize(self) -> 'IncrementalEnumerable':
+        """
+        The `materialize` method is used to keep the results of a query over a `LiveSource` up to date while values are
+        appended to it. Every result read from the returned `IncrementalEnumerable` object is kept and, on the next
+        read, only updated with the values appended in between.
+        """
+        return IncrementalEnumerable(self._values, self._plan)
+
+    def as_parallel(self, workers: int | None = None, chunk_size: int = 1024, ordered: bool = True) -> ParallelEnumerable:
+        """
+        The `as_parallel` method is used to run the following `where`, `select` and `select_many` stages and the
+        terminal method in a pool of `workers` processes, `chunk_size` values at a time. With `ordered=False`
+        values are returned in the order in which the chunks complete.
+        """
+        return ParallelEnumerable(self._iterable(), workers, chunk_size, ordered)
+
+    def explain(self) -> str:
+        """
+        The `explain` method is used to describe how the Enumerable object is evaluated: its source followed by the
+        operators of the optimized query plan, one per line, in the order in which they run.
+        """
+        return "\n".join(query_plan.explain(self._values, self._plan))
 
     def __or__(self, func: Callable) -> UnionType:
         if isinstance(func, Predicate):
@@ -261,11 +676,210 @@ class Enumerable:
             return func(self)
 
     def __next__(self) -> T:
-        if not self.is_empty():
-            with self._lock:
-                return next(iter(self._values))
-        return None
+        return next(iter(self._iterable()), None)
 
     def __iter__(self) -> Iterable:
-        with self._lock:
-            return iter(self._values)
+        return iter(self._iterable())
+
+
+class OrderedEnumerable(Enumerable):
+    """
+    The `OrderedEnumerable` class is returned by `order_by` and `order_by_descending`. It can be refined with further
+    sort keys which are combined into a single sort.
+    """
+    __slots__ = ()
+
+    def __init__(self, ordering: query_plan.Ordering) -> None:
+        super().__init__(ordering)
+
+    def then_by(self, key: Callable[[T], T]) -> 'OrderedEnumerable':
+        """
+        The `then_by` method is used to order values with equal previous keys in ascending order of another key.
+        """
+        return OrderedEnumerable(self._values.then(key, False))
+
+    def then_by_descending(self, key: Callable[[T], T]) -> 'OrderedEnumerable':
+        """
+        The `then_by_descending` method is used to order values with equal previous keys in descending order of
+        another key.
+        """
+        return OrderedEnumerable(self._values.then(key, True))
+
+
+# `Apply` operators which only drop values, so their output keeps the order of their input; `where_concurrent` does so
+# only with `ordered=True`
+ORDER_PRESERVING = frozenset(("distinct", "distinct_by", "skip_while", "intersect", "without", "where_concurrent"))
+
+
+def _is_sorted(values: Iterable) -> bool:
+    if isinstance(values, Enumerable):
+        return values._capabilities().sorted
+    return query_plan.capabilities(values, ()).sorted
+
+
+def _keeps_order(stage: query_plan.Stage) -> bool:
+    if isinstance(stage, (query_plan.Where, query_plan.TakeWhile, query_plan.Slice)):
+        return True
+    if not isinstance(stage, query_plan.Apply) or stage.name not in ORDER_PRESERVING:
+        return False
+    return stage.name != "where_concurrent" or stage.args[-1]
+
+
+class SortedEnumerable(Enumerable):
+    """
+    The `SortedEnumerable` class is returned by `assume_sorted` and `merge`. Its values are in ascending order of `key`
+    (the values themselves if `key` is `None`), which stays known through `where`, `take`, `skip`, `take_while` and
+    the operators which only drop values. `distinct` (and `distinct_by` with the sort key) only remember the current
+    key, and with identity order `intersect` and `without` walk both inputs side by side if `other` is sorted the
+    same way. The identity order is reported as the `sorted` capability of the plan, which ascending `range` sources
+    have as well.
+    """
+    __slots__ = ("_key",)
+
+    def __init__(self, values: Iterable = (), plan: Tuple[query_plan.Stage, ...] = (),
+                 key: Callable[[T], T] | None = None) -> None:
+        super().__init__(values, plan)
+        self._key = key
+
+    def _then(self, stage: query_plan.Stage) -> Enumerable:
+        if _keeps_order(stage):
+            return SortedEnumerable(self._values, self._plan + (stage,), self._key)
+        return Enumerable(self._values, self._plan + (stage,))
+
+    def _sort_key(self) -> Callable[[T], T] | None:
+        return self._key
+
+    def _capabilities(self) -> query_plan.Capabilities:
+        known = super()._capabilities()
+        known.sorted = known.sorted or self._key is None
+        return known
+
+    def distinct_by(self, key_selector: Callable[[T], T], max_keys: int | None = None,
+                    mode: str = "lru") -> 'SortedEnumerable':
+        if key_selector is not self._key:
+            return super().distinct_by(key_selector, max_keys, mode)
+        return self._then(query_plan.Apply("distinct_by", distinct_sorted, key_selector))
+
+    def merge(self, *others: Iterable, key: Callable[[T], T] | None = None) -> 'SortedEnumerable':
+        return super().merge(*others, key=self._key if key is None else key)
+
+
+class IncrementalEnumerable(Enumerable):
+    """
+    The `IncrementalEnumerable` class is returned by `materialize`. Its results (`to_list`, `to_set`, `count`,
+    `count_where`, `aggregate`, `aggregate_with_seed`, `aggregate_by`, `first`, `last`, `is_empty`) are kept once they
+    were read and updated with the values appended to the `LiveSource` since, so a refresh costs O(new values) instead
+    of O(all values). The query may use `where`, `select`, `select_many`, `take`, `skip`, `take_while`,
+    `skip_while`, `distinct`, `distinct_by`, the joins, `intersect`, `without` and the batch operators.
+
+    Results are identified by their arguments: pass the same callables on every read, as a new lambda starts a new
+    result that is computed over the whole history. Every other method runs as a regular query over the values
+    appended so far.
+    """
+    __slots__ = ("_view",)
+
+    def __init__(self, values: Iterable, plan: Tuple[query_plan.Stage, ...]) -> None:
+        self._view = incremental.View(values, plan)
+        super().__init__(values, self._view.plan)
+
+    def to_list(self) -> List:
+        return self._view.read("to_list", incremental.ListResult)
+
+    def to_set(self) -> set:
+        return self._view.read("to_set", incremental.SetResult)
+
+    def count(self) -> int:
+        return self._view.read("count", incremental.CountResult)
+
+    def count_where(self, predicate: Callable[[T], bool]) -> int:
+        return self._view.read("count_where", lambda: incremental.CountResult(predicate), predicate)
+
+    def aggregate(self, func: Callable[[T, T], T]) -> T:
+        result = self._view.read("aggregate", lambda: incremental.AggregateResult(func), func)
+        if result is query_plan.MISSING:
+            raise TypeError("aggregate() of empty sequence with no initial value")
+        return result
+
+    def aggregate_with_seed(self, func: Callable[[T, T], T], seed: T) -> T:
+        return self._view.read("aggregate_with_seed", lambda: incremental.AggregateResult(func, seed), func, seed)
+
+    def aggregate_by(self, key_selector: Callable[[T], T], count: bool | Callable[[T], bool] | Dict = False,
+                     sum: Callable[[T], Any] | Dict | None = None, min: Callable[[T], Any] | Dict | None = None,
+                     max: Callable[[T], Any] | Dict | None = None, avg: Callable[[T], Any] | Dict | None = None,
+                     max_groups: int | None = None) -> 'Enumerable[Dict[str, Any]]':
+        """
+        The `aggregate_by` method returns an Enumerable object of the current aggregates per key (see
+        `Enumerable.aggregate_by`). The group states are kept in memory, so `max_groups` is not supported.
+        """
+        if max_groups is not None:
+            raise ValueError("max_groups is not supported by materialized queries")
+        aggregation = Aggregation(count, sum, min, max, avg)
+        factory = lambda: incremental.AggregateByResult(key_selector, aggregation)
+        return Enumerable(self._view.read("aggregate_by", factory, key_selector, count, sum, min, max, avg))
+
+    def first(self) -> T:
+        first, _ = self._view.read("ends", incremental.EndsResult)
+        return None if first is query_plan.MISSING else first
+
+    def last(self) -> T:
+        _, last = self._view.read("ends", incremental.EndsResult)
+        return None if last is query_plan.MISSING else last
+
+    def is_empty(self) -> bool:
+        return self.count() == 0
+
+
+class IndexedEnumerable(Enumerable):
+    """
+    The `IndexedEnumerable` class is a collection of values which keeps hash and sorted indexes on key selectors up to
+    date while values are added and removed. `where_key_eq` is answered from a hash index in O(1 + k) and
+    `where_key_between` from a sorted index in O(log n + k); without an index on the key selector both fall back to a
+    scan. Indexes are found by the key selector itself, so queries have to pass the same function object. Every other
+    method enumerates a snapshot of the values, which makes it safe to modify the collection from other threads.
+    """
+    __slots__ = ()
+
+    def __init__(self, values: Iterable = (), hash_keys: Iterable[Callable[[T], T]] = (),
+                 sorted_keys: Iterable[Callable[[T], T]] = ()) -> None:
+        super().__init__(indexes.IndexedTable(values, hash_keys, sorted_keys))
+
+    def add_index(self, key_selector: Callable[[T], T], sorted: bool = False) -> None:
+        """
+        The `add_index` method is used to index the values by a key, with a sorted index if `sorted` is set and a hash
+        index otherwise.
+        """
+        self._values.add_index(key_selector, sorted)
+
+    def add(self, value: T) -> None:
+        """
+        The `add` method is used to add a value, updating every index: O(1) for a hash index and O(log n) to find its
+        position in a sorted index.
+        """
+        self._values.add(value)
+
+    def extend(self, values: Iterable) -> None:
+        """
+        The `extend` method is used to add several values, updating every index in bulk: hash indexes add the new keys
+        in one pass and sorted indexes are re-sorted once instead of inserting every value on its own.
+        """
+        self._values.extend(values)
+
+    def remove(self, value: T) -> None:
+        """
+        The `remove` method is used to remove the first occurrence of a value. Raises `ValueError` if there is none.
+        """
+        self._values.remove(value)
+
+    def where_key_eq(self, key_selector: Callable[[T], T], key: T) -> 'Enumerable':
+        """
+        The `where_key_eq` method is used to get the values whose key equals `key`, in insertion order.
+        """
+        return Enumerable(self._values.equal(key_selector, key))
+
+    def where_key_between(self, key_selector: Callable[[T], T], low: T = None, high: T = None,
+                          inclusive: bool = True) -> 'Enumerable':
+        """
+        The `where_key_between` method is used to get the values whose key lies between `low` and `high` (`None` leaves
+        a side open), in ascending order of the key. With `inclusive=False` the range excludes `high`.
+        """
+        return Enumerable(self._values.between(key_selector, low, high, inclusive))
@@ -1,5 +1,14 @@
 import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import time
+import itertools
+import tracemalloc
+import threading
+import mmap
+from tempfile import TemporaryFile
 from enumerables import *
+import enumerable_funcs
 
 class TestEnumerables(unittest.TestCase):
     def test_where(self):
@@ -109,6 +118,66 @@ class TestEnumerables(unittest.TestCase):
         expected = list(reversed(range(10)))
         self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
 
+    def test_order_by_then_by(self):
+        people = [("bob", 30), ("alice", 25), ("carol", 30), ("dave", 25), ("erin", 35)]
+        result = Enumerable().of(people).order_by_descending(lambda p: p[1]).then_by(lambda p: p[0]).to_list()
+        expected = [("erin", 35), ("bob", 30), ("carol", 30), ("alice", 25), ("dave", 25)]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_order_by_is_stable(self):
+        values = [(x % 3, x) for x in range(20)]
+        result = Enumerable().of(values).order_by(lambda x: x[0]).then_by(lambda x: x[0] * 2).to_list()
+        expected = sorted(values, key=lambda x: x[0])
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_order_by_take_uses_heap(self):
+        values = [(x * 7919) % 1000 for x in range(1000)]
+        with patch.object(query_plan.Ordering, "limit", autospec=True, side_effect=query_plan.Ordering.limit) as limit:
+            result = Enumerable().of(iter(values)).order_by_descending(lambda x: x).select(str).take(5).to_list()
+            first = Enumerable().of(values).order_by(lambda x: x % 10).then_by_descending(lambda x: x).first()
+        self.assertEqual(result, [str(x) for x in sorted(values, reverse=True)[:5]])
+        self.assertEqual(first, max(x for x in values if x % 10 == 0))
+        self.assertEqual([call.args[1] for call in limit.call_args_list], [5, 1])
+
+    def test_order_by_take_with_mixed_directions_is_stable(self):
+        values = [(x % 3, x % 2, x) for x in range(30)]
+        ordered = Enumerable().of(values).order_by(lambda x: x[0]).then_by_descending(lambda x: x[1])
+        expected = sorted(sorted(values, key=lambda x: x[1], reverse=True), key=lambda x: x[0])
+        self.assertEqual(ordered.take(7).to_list(), expected[:7])
+        self.assertEqual(ordered.first(), expected[0])
+        self.assertEqual(ordered.to_list(), expected)
+
+    def test_order_by_skip_take(self):
+        result = Enumerable().of(range(100)).order_by(lambda x: -x).skip(10).take(3).to_list()
+        expected = [89, 88, 87]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_sort_with_memory_budget(self):
+        values = [((x * 7919) % 101, x) for x in range(1000)]
+        with patch.object(enumerable_funcs, "_spill", side_effect=enumerable_funcs._spill) as spill:
+            result = Enumerable().of(iter(values)).sort(lambda x: x[0], max_memory_items=64).to_list()
+        expected = sorted(values, key=lambda x: x[0])
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+        self.assertEqual(spill.call_count, 1000 // 64)
+
+    def test_sort_descending_with_memory_budget(self):
+        values = [(x % 7, x) for x in range(200)]
+        result = Enumerable().of(values).order_by_descending(lambda x: x[0], 16).then_by_descending(lambda x: x[1] % 2).to_list()
+        expected = sorted(values, key=lambda x: (x[0], x[1] % 2), reverse=True)
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+        result = Enumerable().of(values).order_by(lambda x: x[0], 16).then_by_descending(lambda x: x[1]).to_list()
+        expected = sorted(values, key=lambda x: (x[0], -x[1]))
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_sort_with_memory_budget_mixed_directions_is_stable(self):
+        values = [((x * 7919) % 5, x % 3, x) for x in range(300)]
+        ordered = Enumerable().of(iter(values)).order_by(lambda x: x[0], 16).then_by_descending(lambda x: x[1])
+        with patch.object(enumerable_funcs, "_spill", side_effect=enumerable_funcs._spill) as spill:
+            result = ordered.to_list()
+        expected = sorted(sorted(values, key=lambda x: x[1], reverse=True), key=lambda x: x[0])
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+        self.assertEqual(spill.call_count, 300 // 16)
+
     def test_reverse(self):
         result = Enumerable().of(range(10)).reverse().to_list()
         expected = list(reversed(range(10)))
@@ -183,11 +252,369 @@ class TestEnumerables(unittest.TestCase):
         expected = list(range(5))
         self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
 
+    def test_intersect_with_single_pass_other(self):
+        result = Enumerable().of(range(10)).intersect(x for x in range(5, 15)).to_list()
+        expected = list(range(5, 10))
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_without_unhashable(self):
+        result = Enumerable().of([[1], [2], [3]]).without(Enumerable().of([[2]])).to_list()
+        expected = [[1], [3]]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_join(self):
+        orders = [(1, "apple"), (2, "pear"), (1, "plum"), (3, "fig")]
+        customers = [(1, "alice"), (2, "bob")]
+        result = (
+            Enumerable()
+                .of(orders)
+                .join(customers, lambda o: o[0], lambda c: c[0], lambda o, c: (c[1], o[1]))
+                .to_list()
+        )
+        expected = [("alice", "apple"), ("bob", "pear"), ("alice", "plum")]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_join_builds_smaller_side(self):
+        calls = []
+        key = lambda x: calls.append(x) or x
+        result = Enumerable().of([2, 1, 7]).join(range(9), key, lambda y: y % 3).to_list()
+        expected = [(2, 2), (2, 5), (2, 8), (1, 1), (1, 4), (1, 7)]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+        self.assertEqual(calls, [2, 1, 7])
+        large_outer = Enumerable().of(range(9)).join([2, 1, 7], lambda x: x % 3, lambda y: y).to_list()
+        self.assertEqual(large_outer, [(x, y) for x in range(9) for y in [2, 1, 7] if x % 3 == y])
+
+    def test_group_join(self):
+        result = (
+            Enumerable()
+                .of(["a", "b", "c"])
+                .group_join(["apple", "avocado", "cherry"], lambda x: x, lambda y: y[0])
+                .to_list()
+        )
+        expected = [("a", ["apple", "avocado"]), ("b", []), ("c", ["cherry"])]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_left_join(self):
+        result = Enumerable().of(range(4)).left_join([(1, "one"), (3, "three")], lambda x: x, lambda y: y[0]).to_list()
+        expected = [(0, None), (1, (1, "one")), (2, None), (3, (3, "three"))]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_group_by(self):
+        result = Enumerable().of(["apple", "bean", "avocado", "cherry"]).group_by(lambda x: x[0]).to_list()
+        self.assertEqual([(group.key, list(group)) for group in result],
+                         [("a", ["apple", "avocado"]), ("b", ["bean"]), ("c", ["cherry"])])
+        result = Enumerable().of(range(5)).group_by(lambda x: x % 2, lambda x: x * 10).to_list()
+        self.assertEqual(result, [Grouping(0, [0, 20, 40]), Grouping(1, [10, 30])])
+
+    def test_aggregate_by(self):
+        rows = [("eu", 3), ("us", 5), ("eu", -1), ("us", 7), ("ap", 2)]
+        region, amount = lambda row: row[0], lambda row: row[1]
+        result = Enumerable().of(rows).aggregate_by(region, count=True, sum=amount, min=amount, max=amount,
+                                                    avg=amount).to_list()
+        expected = [
+            {"key": "eu", "count": 2, "sum": 2, "min": -1, "max": 3, "avg": 1.0},
+            {"key": "us", "count": 2, "sum": 12, "min": 5, "max": 7, "avg": 6.0},
+            {"key": "ap", "count": 1, "sum": 2, "min": 2, "max": 2, "avg": 2.0},
+        ]
+        self.assertEqual(result, expected)
+        result = Enumerable().of(rows).aggregate_by(region, count={"rows": True, "refunds": lambda row: row[1] < 0},
+                                                    sum={"total": amount, "squares": lambda row: row[1] ** 2})
+        self.assertEqual(result.first(), {"key": "eu", "rows": 2, "refunds": 1, "total": 2, "squares": 10})
+        with self.assertRaises(ValueError):
+            Enumerable().of(rows).aggregate_by(region, sum=amount, min={"sum": amount})
+        with self.assertRaises(TypeError):
+            Enumerable().of(rows).aggregate_by(region, avg=True)
+
+    def test_aggregate_by_is_a_single_pass(self):
+        keys = []
+        key = lambda x: keys.append(x) or x % 3
+        result = Enumerable().of(x for x in range(100)).aggregate_by(key, count=True, max=lambda x: x).to_list()
+        self.assertEqual(result, [{"key": 0, "count": 34, "max": 99}, {"key": 1, "count": 33, "max": 97},
+                                  {"key": 2, "count": 33, "max": 98}])
+        self.assertEqual(keys, list(range(100)))
+
+    def test_aggregate_by_spills_over_max_groups(self):
+        values = [(x * 7919) % 1000 for x in range(5000)]
+        spills = []
+        spill = enumerable_funcs._spill_partitions
+        counting = lambda groups, partitions, level: spills.append(len(groups)) or spill(groups, partitions, level)
+        query = Enumerable().of(values)
+        aggregates = dict(count=True, sum=lambda x: x, min=lambda x: x, max=lambda x: x, avg=lambda x: x)
+        with patch.object(enumerable_funcs, "_spill_partitions", side_effect=counting):
+            result = query.aggregate_by(lambda x: x % 100, max_groups=3, **aggregates).to_list()
+        self.assertTrue(spills and all(size <= 3 for size in spills))
+        expected = query.aggregate_by(lambda x: x % 100, **aggregates).to_list()
+        by_key = lambda row: row["key"]
+        self.assertEqual(sorted(result, key=by_key), sorted(expected, key=by_key))
+
+    def test_to_dict_and_to_lookup(self):
+        words = Enumerable().of(["apple", "bean", "avocado"])
+        self.assertEqual(words.to_dict(lambda x: x[:2], len), {"ap": 5, "be": 4, "av": 7})
+        with self.assertRaises(ValueError):
+            words.to_dict(lambda x: x[0])
+        lookup = words.to_lookup(lambda x: x[0])
+        self.assertEqual(lookup["a"], ["apple", "avocado"])
+        self.assertEqual(lookup["c"], [])
+        self.assertNotIn("c", lookup)
+
+    def test_to_array_bytes_and_buffer(self):
+        enumerable = Enumerable().of(range(5)).select(lambda x: x * 100)
+        self.assertEqual(enumerable.to_array("q"), array("q", [0, 100, 200, 300, 400]))
+        self.assertEqual(enumerable.take(2).to_bytes("h"), array("h", [0, 100]).tobytes())
+        self.assertEqual(Enumerable().of([1, 2]).to_bytes(), b"\x01\x02")
+        buffer = enumerable.to_buffer("d")
+        self.assertEqual((buffer.format, buffer.tolist()), ("d", [0.0, 100.0, 200.0, 300.0, 400.0]))
+        with self.assertRaises(OverflowError):
+            Enumerable().of([256]).to_bytes()
+
+    def test_of_buffer(self):
+        values = array("i", range(10))
+        enumerable = Enumerable.of_buffer(values)
+        self.assertEqual(enumerable.where(lambda x: x % 3 == 0).to_list(), [0, 3, 6, 9])
+        self.assertEqual((enumerable.count(), enumerable.last(), enumerable.element_at(4)), (10, 9, 4))
+        sliced = enumerable.skip(2).take(5)
+        self.assertEqual((sliced.count(), sliced.last(), sliced.to_list()), (5, 6, [2, 3, 4, 5, 6]))
+        # slices of the source are views of it
+        self.assertIs(sliced.to_buffer("i").obj, values)
+        self.assertEqual(sliced.to_array("i"), array("i", range(2, 7)))
+        self.assertEqual(Enumerable.of_buffer(values.tobytes(), "i").skip(8).to_list(), [8, 9])
+        self.assertEqual(Enumerable.of_buffer(b"\x01\x00\x02\x00", "H").to_list(), [1, 2])
+        with self.assertRaises(TypeError):
+            Enumerable.of_buffer(b"\x01\x00\x02", "H")
+
+    def test_of_buffer_over_mmap(self):
+        with TemporaryFile() as file:
+            file.write(array("d", [0.5, 1.5, 2.5]).tobytes())
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = Enumerable.of_buffer(mapped, "d")
+                self.assertEqual(view.skip(1).to_list(), [1.5, 2.5])
+                self.assertEqual(view.aggregate(lambda x, y: x + y), 4.5)
+                view.to_buffer("d").release()
+
     def test_iter(self):
         result = [x for x in Enumerable().of(range(10))]
         expected = list(range(10))
         self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
 
+    def test_chunk(self):
+        self.assertEqual(Enumerable().of(range(7)).chunk(3).to_list(), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(Enumerable().of(range(4)).chunk(2, tuple).to_list(), [(0, 1), (2, 3)])
+        self.assertEqual(Enumerable().of([]).chunk(2).to_list(), [])
+        with self.assertRaises(ValueError):
+            Enumerable().of(range(4)).chunk(0).to_list()
+
+    def test_batch_select_and_batch_where(self):
+        batches = []
+        lookup = lambda xs: batches.append(list(xs)) or [x * 10 for x in xs]
+        values = iter(range(10))
+        result = Enumerable().of(values).batch_select(lookup, 4).take(5).to_list()
+        self.assertEqual(result, [0, 10, 20, 30, 40])
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7]])
+        self.assertEqual(next(values), 8)
+        result = Enumerable().of(range(10)).batch_where(lambda xs: [x % 3 == 0 for x in xs], 4).to_list()
+        self.assertEqual(result, [0, 3, 6, 9])
+        with self.assertRaises(ValueError):
+            Enumerable().of(range(10)).batch_select(lambda xs: xs[1:], 4).to_list()
+
+    def test_chunk_max_latency(self):
+        def slow():
+            yield from range(3)
+            time.sleep(0.5)
+            yield from range(3, 5)
+        started = time.monotonic()
+        chunks = iter(Enumerable().of(slow()).chunk(10, max_latency=0.05))
+        self.assertEqual(next(chunks), [0, 1, 2])
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(list(chunks), [[3, 4]])
+        result = Enumerable().of(range(100)).batch_select(lambda xs: xs, 8, max_latency=1).take(10).to_list()
+        self.assertEqual(result, list(range(10)))
+
+    def test_select_concurrent(self):
+        def fetch(x):
+            time.sleep(0.02)
+            return x * 2
+        started = time.monotonic()
+        self.assertEqual(Enumerable().of(range(40)).select_concurrent(fetch, 10).to_list(), list(range(0, 80, 2)))
+        self.assertLess(time.monotonic() - started, 0.4)
+        backwards = lambda x: time.sleep(0.02 * (3 - x)) or x
+        self.assertEqual(Enumerable().of(range(4)).select_concurrent(backwards, 4, ordered=False).to_list(), [3, 2, 1, 0])
+        self.assertEqual(Enumerable().of(range(4)).select_concurrent(backwards, 4).to_list(), [0, 1, 2, 3])
+        result = Enumerable().of(range(20)).where_concurrent(lambda x: x % 3 == 0, 4, prefetch=2).to_list()
+        self.assertEqual(result, [0, 3, 6, 9, 12, 15, 18])
+
+    def test_select_concurrent_is_bounded_and_stops_early(self):
+        read, running, most = [], [0], [0]
+        lock = threading.Lock()
+        def source():
+            for x in itertools.count():
+                read.append(x)
+                yield x
+        def fetch(x):
+            with lock:
+                running[0] += 1
+                most[0] = max(most[0], running[0])
+            time.sleep(0.005)
+            with lock:
+                running[0] -= 1
+            return x
+        self.assertEqual(Enumerable().of(source()).select_concurrent(fetch, 3, prefetch=6).take(10).to_list(),
+                         list(range(10)))
+        self.assertLessEqual(len(read), 10 + 6)
+        self.assertLessEqual(most[0], 3)
+        self.assertEqual(running[0], 0)
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("select_concurrent")])
+
+    def test_select_concurrent_raises_in_order(self):
+        def fetch(x):
+            if x == 3:
+                raise KeyError(x)
+            return x
+        results = iter(Enumerable().of(range(100)).select_concurrent(fetch, 4))
+        self.assertEqual([next(results) for _ in range(3)], [0, 1, 2])
+        with self.assertRaises(KeyError):
+            next(results)
+        with self.assertRaises(ValueError):
+            Enumerable().of(range(3)).select_concurrent(fetch, 0).to_list()
+
+    def test_assume_sorted_distinct(self):
+        values = Enumerable().of([1, 1, 2, 3, 3, 5]).assume_sorted()
+        self.assertEqual(values.distinct().to_list(), [1, 2, 3, 5])
+        self.assertEqual(values.where(lambda x: x > 1).skip(1).distinct().to_list(), [3, 5])
+        self.assertIsInstance(values.take(3), SortedEnumerable)
+        self.assertNotIsInstance(values.select(lambda x: -x), SortedEnumerable)
+        self.assertEqual(values.select(lambda x: x % 2).distinct().to_list(), [1, 0])
+        words = Enumerable().of(["b", "a", "cc", "dd", "a"]).assume_sorted(len)
+        self.assertEqual(words.distinct_by(len).to_list(), ["b", "cc", "a"])
+        self.assertEqual(words.distinct().to_list(), ["b", "a", "cc", "dd"])
+        stream = Enumerable().of(x // 3 for x in range(300_000)).assume_sorted()
+        tracemalloc.start()
+        self.assertEqual(stream.distinct().count(), 100_000)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, 100_000)
+
+    def test_unordered_where_concurrent_loses_sortedness(self):
+        def delayed(x):
+            time.sleep(0.02 if x == 0 else 0)
+            return True
+        values = Enumerable().of([0, 1, 2, 3]).assume_sorted()
+        self.assertIsInstance(values.where_concurrent(delayed, 4), SortedEnumerable)
+        unordered = values.where_concurrent(delayed, 4, ordered=False)
+        self.assertNotIsInstance(unordered, SortedEnumerable)
+        self.assertEqual(unordered.intersect(Enumerable().of([0, 1, 2, 3]).assume_sorted()).to_set(), {0, 1, 2, 3})
+        self.assertEqual(sorted(unordered.merge([0.5]).to_list()), [0, 0.5, 1, 2, 3])
+
+    def test_sorted_capability_selects_sorted_operators(self):
+        with patch.object(enumerable_funcs, "_walk_sorted", side_effect=enumerable_funcs._walk_sorted) as walk:
+            self.assertEqual(Enumerable().of(range(0, 20, 2)).intersect(range(5, 15)).to_list(), [6, 8, 10, 12, 14])
+            self.assertEqual(Enumerable().of(range(10)).where(lambda x: x % 3).without(
+                Enumerable().of([1, 2, 7]).assume_sorted()).to_list(), [4, 5, 8])
+            self.assertEqual(walk.call_count, 2)
+            Enumerable().of(range(10)).intersect([3, 1]).to_list()
+            Enumerable().of(range(10)).select(lambda x: -x).intersect(range(-3, 0)).to_list()
+            self.assertEqual(walk.call_count, 2)
+        self.assertTrue(query_plan.capabilities(range(5), ()).sorted)
+        self.assertTrue(Enumerable().of([3, 3, 4]).assume_sorted()._capabilities().sorted)
+        self.assertFalse(Enumerable().of([3, 3, 4]).assume_sorted(len)._capabilities().sorted)
+
+    def test_sorted_set_operations(self):
+        values = Enumerable().of([1, 2, 2, 3, 5, 7, 9]).assume_sorted()
+        others = Enumerable().of(x for x in [2, 3, 4, 7, 8]).assume_sorted()
+        self.assertEqual(values.intersect(others).to_list(), [2, 2, 3, 7])
+        self.assertEqual(values.without(Enumerable().of([2, 3, 4, 7, 8]).assume_sorted()).to_list(), [1, 5, 9])
+        self.assertEqual(values.without(Enumerable().empty().assume_sorted()).count(), 7)
+        # an unsorted `other` is looked up in a set instead
+        self.assertEqual(values.intersect([7, 2]).to_list(), [2, 2, 7])
+        endless = Enumerable().of(itertools.count(0, 2)).assume_sorted()
+        self.assertEqual(endless.intersect(Enumerable().of(itertools.count(0, 3)).assume_sorted()).take(3).to_list(),
+                         [0, 6, 12])
+
+    def test_merge(self):
+        evens = Enumerable().of(itertools.count(0, 2))
+        self.assertEqual(evens.merge(itertools.count(1, 2), [0.5, 2.5]).take(6).to_list(), [0, 0.5, 1, 2, 2.5, 3])
+        events = [("a", 1), ("b", 4)], [("c", 2), ("d", 3)]
+        by_time = lambda event: event[1]
+        merged = Enumerable().of(events[0]).assume_sorted(by_time).merge(events[1])
+        self.assertEqual(merged.select(lambda event: event[0]).to_list(), ["a", "c", "d", "b"])
+        self.assertEqual(merged.distinct_by(by_time).count(), 4)
+
+    def test_merge_join(self):
+        orders = Enumerable().of([(1, "a"), (2, "b"), (2, "c"), (4, "d"), (6, "e")])
+        items = [(2, "x"), (2, "y"), (3, "z"), (4, "w")]
+        key = lambda row: row[0]
+        result = orders.merge_join(items, key, result_selector=lambda x, y: x[1] + y[1]).to_list()
+        self.assertEqual(result, ["bx", "by", "cx", "cy", "dw"])
+        self.assertEqual(result, orders.join(items, key, key, lambda x, y: x[1] + y[1]).to_list())
+        self.assertEqual(Enumerable().of([1, 2, 3]).assume_sorted().merge_join(range(2, 10)).to_list(), [(2, 2), (3, 3)])
+        self.assertEqual(Enumerable().of(itertools.count()).merge_join(itertools.count(5)).first(), (5, 5))
+
+    def test_window(self):
+        self.assertEqual(Enumerable().of(range(5)).window(3).to_list(), [(0, 1, 2), (1, 2, 3), (2, 3, 4)])
+        self.assertEqual(Enumerable().of(range(7)).window(3, 3).to_list(), [(0, 1, 2), (3, 4, 5)])
+        self.assertEqual(Enumerable().of(range(7)).window(2, 3).to_list(), [(0, 1), (3, 4)])
+        self.assertEqual(Enumerable().of(range(2)).window(3).to_list(), [])
+        self.assertEqual(Enumerable().of(itertools.count()).window(2).where(lambda w: w[0] % 5 == 0).take(2).to_list(),
+                         [(0, 1), (5, 6)])
+        with self.assertRaises(ValueError):
+            Enumerable().of(range(5)).window(0).to_list()
+
+    def test_sliding_aggregate(self):
+        random = __import__("random").Random(5)
+        values = [random.uniform(-1e6, 1e6) for _ in range(5_000)]
+        windows = [values[i - 7:i] for i in range(7, len(values) + 1)]
+        stream = Enumerable().of(values)
+        self.assertEqual(stream.sliding_aggregate(7, "min").to_list(), [min(w) for w in windows])
+        self.assertEqual(stream.sliding_aggregate(7, "max").to_list(), [max(w) for w in windows])
+        for total, w in zip(stream.sliding_aggregate(7).to_list(), windows):
+            self.assertAlmostEqual(total, sum(w), delta=1e-6)
+        for average, w in zip(stream.sliding_aggregate(7, "avg").to_list(), windows):
+            self.assertAlmostEqual(average, sum(w) / 7, delta=1e-6)
+        spread = lambda w: max(w) - min(w)
+        self.assertEqual(Enumerable().of([1, 5, 2, 8]).sliding_aggregate(2, spread).to_list(), [4, 3, 6])
+        self.assertEqual(Enumerable().of(itertools.count()).sliding_aggregate(3).take(3).to_list(), [3, 6, 9])
+        with self.assertRaises(ValueError):
+            Enumerable().of(values).sliding_aggregate(3, "median").to_list()
+
+    def test_tumbling_by_time(self):
+        events = [(1, "a"), (3, "b"), (12, "c"), (8, "d"), (25, "e"), (5, "f"), (31, "g")]
+        late = []
+        windows = Enumerable().of(events).tumbling_by_time(lambda e: e[0], 10, allowed_lateness=5, on_late=late.append)
+        self.assertEqual([(w.start, w.end, [e[1] for e in w]) for w in windows],
+                         [(0, 10, ["a", "b", "d"]), (10, 20, ["c"]), (20, 30, ["e"]), (30, 40, ["g"])])
+        self.assertEqual(late, [(5, "f")])
+        strict = Enumerable().of(events).tumbling_by_time(lambda e: e[0], 10).select(len).to_list()
+        self.assertEqual(strict, [2, 1, 1, 1])
+        endless = Enumerable().of(itertools.count()).tumbling_by_time(lambda t: t * 0.5, 2.5).take(2)
+        self.assertEqual(endless.to_list(), [TimeWindow(0, 2.5, range(5)), TimeWindow(2.5, 5.0, range(5, 10))])
+
+    def test_of_returns_a_new_enumerable(self):
+        enumerable = Enumerable().of([1, 2, 3])
+        other = enumerable.of([4, 5])
+        self.assertEqual((enumerable.to_list(), other.to_list()), ([1, 2, 3], [4, 5]))
+        with self.assertRaises(AttributeError):
+            enumerable.extra = 1
+
+    def test_shared_query_from_many_threads(self):
+        base = Enumerable().of(range(1000)).where(lambda x: x % 3 == 0)
+        shared = base.memoize()
+
+        def run(worker):
+            results = []
+            for step in range(200):
+                query = base.select(lambda x: x + worker).skip(step % 7).take(50)
+                results.append((query.to_list(), query.count(), shared.where(lambda x: x > step).first()))
+            return results
+
+        with ThreadPoolExecutor(16) as executor:
+            outcomes = list(executor.map(run, range(32)))
+        for worker, results in enumerate(outcomes):
+            for step, (values, count, first) in enumerate(results):
+                expected = [x + worker for x in range(0, 1000, 3)][step % 7:step % 7 + 50]
+                self.assertEqual((values, count), (expected, 50))
+                self.assertEqual(first, step + 3 - step % 3)
+        self.assertEqual(base.count(), 334)
+
 
 if __name__ == "__main__":
     unittest.main()
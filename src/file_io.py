@@ -0,0 +1,268 @@
+from collections.abc import Iterable, Mapping, Sequence
+from io import StringIO
+from itertools import chain, islice, repeat
+from operator import itemgetter
+from os import PathLike
+from typing import Any, Callable, Dict, Iterator, List, TextIO
+import csv
+import gzip
+import json
+import mmap
+
+Path = str | PathLike
+BLOCK_SIZE = 1 << 20
+BATCH_SIZE = 4096
+
+def _compressed(path: Path, compression: str | None) -> bool:
+    if compression == "infer":
+        return str(path).endswith(".gz")
+    if compression not in (None, "gzip"):
+        raise ValueError(f"unsupported compression: {compression!r}")
+    return compression == "gzip"
+
+def _byte_blocks(path: Path, compression: str | None, use_mmap: bool, block_size: int) -> Iterator[bytes]:
+    if _compressed(path, compression):
+        if use_mmap:
+            raise ValueError("compressed files can't be memory-mapped")
+        with gzip.open(path, "rb") as file:
+            yield from iter(lambda: file.read(block_size), b"")
+        return
+    with open(path, "rb", buffering=0) as file:
+        if not use_mmap:
+            yield from iter(lambda: file.read(block_size), b"")
+            return
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            return
+        with mapped:
+            for start in range(0, len(mapped), block_size):
+                yield mapped[start:start + block_size]
+
+def text_blocks(path: Path, encoding: str = "utf-8", compression: str | None = "infer", use_mmap: bool = False,
+                block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Reads a file in blocks of about `block_size` bytes and decodes them. Every block but the last ends with a line
+    break (`\n`, `\r\n` or `\r`), so no line (or multi-byte character) is split between two blocks.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    rest = b""
+    for block in _byte_blocks(path, compression, use_mmap, block_size):
+        # a final "\r" may be the first half of a "\r\n"
+        cut = max(block.rfind(b"\n"), block.rfind(b"\r", 0, len(block) - 1)) + 1
+        if cut == 0:
+            rest += block
+            continue
+        yield (rest + block[:cut]).decode(encoding)
+        rest = block[cut:]
+    if rest:
+        yield rest.decode(encoding)
+
+def _split_lines(block: str) -> List[str]:
+    # the universal newlines of text files
+    if "\r" in block:
+        block = block.replace("\r\n", "\n").replace("\r", "\n")
+    lines = block.split("\n")
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class LineSource:
+    """
+    Iterable over the lines of a text file, without line breaks. The file is opened on every iteration and read with
+    a buffer of `block_size` bytes, or in memory-mapped blocks of that size, so any file size is processed in constant
+    memory.
+    """
+    __slots__ = ("path", "encoding", "compression", "use_mmap", "block_size")
+
+    def __init__(self, path: Path, encoding: str = "utf-8", compression: str | None = "infer", use_mmap: bool = False,
+                 block_size: int = BLOCK_SIZE) -> None:
+        self.path = path
+        self.encoding = encoding
+        self.compression = compression
+        self.use_mmap = use_mmap
+        self.block_size = block_size
+
+    def open(self, newline: str | None = None) -> TextIO:
+        if _compressed(self.path, self.compression):
+            return gzip.open(self.path, "rt", encoding=self.encoding, newline=newline)
+        return open(self.path, encoding=self.encoding, newline=newline, buffering=self.block_size)
+
+    def blocks(self) -> Iterator[str]:
+        return text_blocks(self.path, self.encoding, self.compression, self.use_mmap, self.block_size)
+
+    def _read(self) -> Iterator[str]:
+        with self.open() as file:
+            yield from map(str.removesuffix, file, repeat("\n"))
+
+    def __iter__(self) -> Iterator[str]:
+        if self.use_mmap:
+            return chain.from_iterable(map(_split_lines, self.blocks()))
+        return self._read()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+
+class CsvSource:
+    """
+    Iterable over the rows of a CSV file. With a header row every row is a dict of the selected `columns` (all by
+    default), otherwise a list of the values of the selected column indices. Only the selected columns are converted
+    with `types`, a mapping of column names (or indices) to functions like `int`.
+    """
+    __slots__ = ("lines", "columns", "types", "header", "dialect")
+
+    def __init__(self, lines: LineSource, columns: Sequence[str | int] | None = None,
+                 types: Mapping[str | int, Callable[[str], Any]] | None = None, header: bool = True,
+                 **dialect: Any) -> None:
+        self.lines = lines
+        self.columns = None if columns is None else list(columns)
+        self.types = types or {}
+        self.header = header
+        self.dialect = dialect
+
+    def __iter__(self) -> Iterator:
+        if self.lines.use_mmap:
+            # like the file opened with newline="", StringIO splits on any line break and keeps it, so quoted values
+            # may span lines
+            blocks = (StringIO(block, newline="") for block in self.lines.blocks())
+            return self._parse(chain.from_iterable(blocks))
+        return self._read()
+
+    def _read(self) -> Iterator:
+        with self.lines.open(newline="") as file:
+            yield from self._parse(file)
+
+    def _parse(self, lines: Iterable[str]) -> Iterator:
+        rows = csv.reader(lines, **self.dialect)
+        if not self.header:
+            return self._rows(rows)
+        names = next(rows, None)
+        if names is None:
+            return iter(())
+        return self._records(rows, names)
+
+    def _rows(self, rows: Iterator[List[str]]) -> Iterator[List]:
+        if self.columns is not None:
+            select = itemgetter(*self.columns)
+            rows = (list(select(row)) if len(self.columns) > 1 else [select(row)] for row in rows)
+            conversions = [(index, self.types[column]) for index, column in enumerate(self.columns)
+                           if column in self.types]
+        else:
+            conversions = list(self.types.items())
+        if not conversions:
+            yield from rows
+            return
+        for row in rows:
+            for index, convert in conversions:
+                row[index] = convert(row[index])
+            yield row
+
+    def _records(self, rows: Iterator[List[str]], names: List[str]) -> Iterator[Dict[str, Any]]:
+        columns = names if self.columns is None else self.columns
+        missing = [column for column in columns if column not in names]
+        if missing:
+            raise KeyError(f"columns not in the header: {missing}")
+        if self.columns is not None:
+            select = itemgetter(*(names.index(column) for column in columns))
+            rows = map(select, rows) if len(columns) > 1 else ((select(row),) for row in rows)
+        conversions = [(column, convert) for column, convert in self.types.items() if column in columns]
+        for row in rows:
+            record = dict(zip(columns, row))
+            for column, convert in conversions:
+                record[column] = convert(record[column])
+            yield record
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.lines.path)!r})"
+
+
+class JsonlSource:
+    """
+    Iterable over the JSON values of a file with one value per line, blank lines are skipped. With `fields` every
+    object is reduced to those keys (missing keys are `None`).
+    """
+    __slots__ = ("lines", "fields")
+
+    def __init__(self, lines: LineSource, fields: Sequence[str] | None = None) -> None:
+        self.lines = lines
+        self.fields = None if fields is None else list(fields)
+
+    def __iter__(self) -> Iterator:
+        values = map(json.loads, filter(str.strip, self.lines))
+        if self.fields is None:
+            return values
+        fields = self.fields
+        return ({field: value.get(field) for field in fields} for value in values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.lines.path)!r})"
+
+
+def _open_text(path: Path, compression: str | None, encoding: str, buffer_size: int):
+    if _compressed(path, compression):
+        return gzip.open(path, "wt", encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="", buffering=buffer_size)
+
+def _write_batches(path: Path, lines: Iterable[str], compression: str | None, encoding: str,
+                   batch_size: int) -> int:
+    """
+    Writes `lines` (without line breaks) in batches of `batch_size` lines, each joined into a single string.
+    Returns the number of lines written.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    lines = iter(lines)
+    written = 0
+    with _open_text(path, compression, encoding, BLOCK_SIZE) as file:
+        while batch := list(islice(lines, batch_size)):
+            batch.append("")
+            file.write("\n".join(batch))
+            written += len(batch) - 1
+    return written
+
+def write_lines(values: Iterable, path: Path, encoding: str = "utf-8", compression: str | None = "infer",
+                batch_size: int = BATCH_SIZE) -> int:
+    return _write_batches(path, map(str, values), compression, encoding, batch_size)
+
+def write_jsonl(values: Iterable, path: Path, encoding: str = "utf-8", compression: str | None = "infer",
+                batch_size: int = BATCH_SIZE, **options: Any) -> int:
+    encode = json.JSONEncoder(**options).encode
+    return _write_batches(path, map(encode, values), compression, encoding, batch_size)
+
+def write_csv(values: Iterable, path: Path, columns: Sequence[str] | None = None, header: bool = True,
+              encoding: str = "utf-8", compression: str | None = "infer", batch_size: int = BATCH_SIZE,
+              **dialect: Any) -> int:
+    """
+    Writes rows (sequences, or dicts whose keys are the `columns`, by default the keys of the first row) as CSV.
+    Rows are formatted into an in-memory buffer and written `batch_size` rows at a time. Returns the number of rows.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    values = iter(values)
+    first = next(values, None)
+    written = 0
+    with _open_text(path, compression, encoding, BLOCK_SIZE) as file:
+        if first is None:
+            if header and columns is not None:
+                csv.writer(file, **dialect).writerow(columns)
+            return 0
+        values = chain((first,), values)
+        if isinstance(first, Mapping):
+            columns = list(first) if columns is None else list(columns)
+            values = map(itemgetter(*columns), values) if len(columns) > 1 else ((x[columns[0]],) for x in values)
+        buffer = StringIO()
+        writer = csv.writer(buffer, **dialect)
+        if header and columns is not None:
+            writer.writerow(columns)
+        while batch := list(islice(values, batch_size)):
+            writer.writerows(batch)
+            file.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            written += len(batch)
+        file.write(buffer.getvalue())
+    return written
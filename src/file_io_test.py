@@ -0,0 +1,103 @@
+import unittest
+import gzip
+import json
+import os
+from tempfile import TemporaryDirectory
+from enumerables import *
+from file_io import text_blocks
+
+class TestFileIO(unittest.TestCase):
+    def setUp(self):
+        self._directory = TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write(self, name, text, opener=open):
+        with opener(self.path(name), "wt", encoding="utf-8", newline="") as file:
+            file.write(text)
+        return self.path(name)
+
+    def test_from_lines(self):
+        path = self.write("a.txt", "one\r\ntwo\n\nthree")
+        for use_mmap in (False, True):
+            enumerable = Enumerable.from_lines(path, use_mmap=use_mmap, block_size=3)
+            self.assertEqual(enumerable.to_list(), ["one", "two", "", "three"])
+            self.assertEqual(enumerable.count(), 4)
+        self.assertEqual(Enumerable.from_lines(self.write("empty.txt", ""), use_mmap=True).to_list(), [])
+
+    def test_line_breaks_match_text_files(self):
+        text = "a\rbb\r\ncc\r\r\ndd\n\re\r"
+        path = self.write("breaks.txt", text)
+        expected = ["a", "bb", "cc", "", "dd", "", "e"]
+        for block_size in (1, 2, 3, 5, 64):
+            for use_mmap in (False, True):
+                self.assertEqual(Enumerable.from_lines(path, use_mmap=use_mmap, block_size=block_size).to_list(),
+                                 expected, (block_size, use_mmap))
+            self.assertEqual("".join(text_blocks(path, block_size=block_size)), text)
+        csv = self.write("breaks.csv", "n\r1\r\n2\r")
+        for use_mmap in (False, True):
+            self.assertEqual(Enumerable.from_csv(csv, use_mmap=use_mmap, block_size=2).to_list(),
+                             [{"n": "1"}, {"n": "2"}])
+
+    def test_blocks_do_not_split_characters(self):
+        path = self.write("utf8.txt", "äöü\n" * 10)
+        blocks = list(text_blocks(path, block_size=5))
+        self.assertTrue(all(block.endswith("\n") for block in blocks))
+        self.assertEqual("".join(blocks), "äöü\n" * 10)
+
+    def test_gzip(self):
+        path = self.write("a.txt.gz", "1\n2\n3\n", gzip.open)
+        self.assertEqual(Enumerable.from_lines(path).select(int).to_list(), [1, 2, 3])
+        with self.assertRaises(ValueError):
+            Enumerable.from_lines(path, use_mmap=True).to_list()
+        out = self.path("b.jsonl.gz")
+        self.assertEqual(Enumerable().of([{"a": 1}]).to_jsonl(out), 1)
+        self.assertEqual(Enumerable.from_jsonl(out).to_list(), [{"a": 1}])
+
+    def test_reads_lazily(self):
+        path = self.write("many.txt", "x\n" * 100_000)
+        self.assertEqual(Enumerable.from_lines(path, block_size=64).take(2).to_list(), ["x", "x"])
+
+    def test_from_csv(self):
+        path = self.write("a.csv", 'id,name,score\n1,"a, b",2.5\n2,"multi\nline",3\n')
+        self.assertEqual(Enumerable.from_csv(path).to_list(), [
+            {"id": "1", "name": "a, b", "score": "2.5"},
+            {"id": "2", "name": "multi\nline", "score": "3"},
+        ])
+        result = Enumerable.from_csv(path, columns=["score", "id"], types={"id": int, "score": float}).to_list()
+        self.assertEqual(result, [{"score": 2.5, "id": 1}, {"score": 3.0, "id": 2}])
+        result = Enumerable.from_csv(path, header=False, columns=[0], block_size=4).skip(1).to_list()
+        self.assertEqual(result, [["1"], ["2"]])
+        with self.assertRaises(KeyError):
+            Enumerable.from_csv(path, columns=["missing"]).to_list()
+
+    def test_from_jsonl(self):
+        path = self.write("a.jsonl", '{"a": 1, "b": 2}\n\n{"a": 3}\n')
+        self.assertEqual(Enumerable.from_jsonl(path).to_list(), [{"a": 1, "b": 2}, {"a": 3}])
+        self.assertEqual(Enumerable.from_jsonl(path, fields=["b"]).to_list(), [{"b": 2}, {"b": None}])
+
+    def test_sinks(self):
+        lines = self.path("out.txt")
+        self.assertEqual(Enumerable().of(range(5)).to_lines(lines, batch_size=2), 5)
+        self.assertEqual(Enumerable.from_lines(lines).to_list(), ["0", "1", "2", "3", "4"])
+        rows = [{"id": 1, "text": "a,b"}, {"id": 2, "text": "c\nd"}]
+        path = self.path("out.csv")
+        self.assertEqual(Enumerable().of(rows).to_csv(path, batch_size=1), 2)
+        self.assertEqual(Enumerable.from_csv(path, types={"id": int}).to_list(), rows)
+        self.assertEqual(Enumerable().of([(1, 2)]).to_csv(path, columns=["x", "y"]), 1)
+        self.assertEqual(Enumerable.from_csv(path).to_list(), [{"x": "1", "y": "2"}])
+        self.assertEqual(Enumerable().of([]).to_csv(path, columns=["x"]), 0)
+        self.assertEqual(Enumerable.from_lines(path).to_list(), ["x"])
+        path = self.path("out.jsonl")
+        self.assertEqual(Enumerable().of(rows).where(lambda row: row["id"] > 1).to_jsonl(path), 1)
+        with open(path) as file:
+            self.assertEqual([json.loads(line) for line in file], rows[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
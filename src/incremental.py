@@ -0,0 +1,346 @@
+from collections.abc import Iterable
+from functools import reduce
+from itertools import dropwhile, filterfalse, islice, takewhile
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+from enumerable_funcs import Aggregation, _build_lookup, _membership
+from sketches import recent_keys
+import query_plan
+
+class LiveSource:
+    """
+    The `LiveSource` class is an append-only collection of values for queries which are refreshed while it grows.
+    Enumerating it reads the values it holds when the enumeration starts; materialized queries over it
+    (`Enumerable.materialize`) only process the values appended since they were last read.
+    """
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Iterable = ()) -> None:
+        self._values = list(values)
+
+    def append(self, value: Any) -> None:
+        self._values.append(value)
+
+    def extend(self, values: Iterable) -> None:
+        # extending with a list is a single atomic step, a generator could interleave with concurrent appends
+        self._values.extend(list(values))
+
+    def since(self, start: int, stop: int | None = None) -> List:
+        """
+        Returns the values from position `start` (up to `stop`) as a new list.
+        """
+        return self._values[start:stop]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator:
+        return islice(self._values, len(self._values))
+
+    def __repr__(self) -> str:
+        return f"LiveSource({len(self._values)} values)"
+
+
+class _Slice:
+    __slots__ = ("start", "stop", "seen")
+
+    def __init__(self, start: int, stop: int | None) -> None:
+        self.start = start
+        self.stop = stop
+        self.seen = 0
+
+    def __call__(self, values: Iterable) -> List:
+        values = list(values)
+        seen = self.seen
+        self.seen += len(values)
+        return values[max(0, self.start - seen):None if self.stop is None else max(0, self.stop - seen)]
+
+
+class _TakeWhile:
+    __slots__ = ("predicate", "done")
+
+    def __init__(self, predicate: Callable) -> None:
+        self.predicate = predicate
+        self.done = False
+
+    def __call__(self, values: Iterable) -> List:
+        if self.done:
+            return []
+        values = list(values)
+        taken = list(takewhile(self.predicate, values))
+        self.done = len(taken) < len(values)
+        return taken
+
+
+class _SkipWhile:
+    __slots__ = ("predicate", "skipping")
+
+    def __init__(self, predicate: Callable) -> None:
+        self.predicate = predicate
+        self.skipping = True
+
+    def __call__(self, values: Iterable) -> Iterable:
+        if not self.skipping:
+            return values
+        values = list(dropwhile(self.predicate, values))
+        self.skipping = not values
+        return values
+
+
+class _Distinct:
+    __slots__ = ("key_selector", "seen")
+
+    def __init__(self, key_selector: Callable | None = None, max_keys: int | None = None, mode: str = "lru") -> None:
+        self.key_selector = key_selector
+        self.seen = set() if max_keys is None else recent_keys(max_keys, mode)
+
+    def __call__(self, values: Iterable) -> List:
+        seen = self.seen
+        if not isinstance(seen, set):
+            if self.key_selector is None:
+                return list(filter(seen.insert, values))
+            return list(filter(lambda x: seen.insert(self.key_selector(x)), values))
+        if self.key_selector is None:
+            return [x for x in values if x not in seen and not seen.add(x)]
+        key_selector = self.key_selector
+        return [x for x in values if (key := key_selector(x)) not in seen and not seen.add(key)]
+
+
+class _Members:
+    """
+    `intersect` and `without` against the values of `other`, collected once.
+    """
+    __slots__ = ("members", "keep")
+
+    def __init__(self, other: Iterable, keep: bool) -> None:
+        self.members = _membership(other)
+        self.keep = keep
+
+    def __call__(self, values: Iterable) -> List:
+        return list((filter if self.keep else filterfalse)(self.members.__contains__, values))
+
+
+class _Join:
+    """
+    `join`, `group_join` and `left_join` against a lookup of `other` by key, built once.
+    """
+    __slots__ = ("name", "lookup", "key_selector", "result_selector")
+
+    def __init__(self, name: str, other: Iterable, key_selector: Callable, other_key_selector: Callable,
+                 result_selector: Callable) -> None:
+        self.name = name
+        self.lookup = _build_lookup(other, query_plan._unwrap(other_key_selector))
+        self.key_selector = query_plan._unwrap(key_selector)
+        self.result_selector = result_selector
+
+    def __call__(self, values: Iterable) -> List:
+        lookup, key_selector, result_selector = self.lookup, self.key_selector, self.result_selector
+        if self.name == "group_join":
+            return [result_selector(x, lookup.get(key_selector(x), [])) for x in values]
+        if self.name == "left_join":
+            return [result_selector(x, y) for x in values for y in lookup.get(key_selector(x)) or (None,)]
+        return [result_selector(x, y) for x in values for y in lookup.get(key_selector(x), ())]
+
+
+# `Apply` operators which map every value on its own run on every delta as they are
+STATELESS = frozenset(("batch_select", "batch_where", "select_concurrent", "where_concurrent"))
+
+# `Apply` operators whose first argument is a second input, which is read once when the query is materialized
+WITH_OTHER = frozenset(("intersect", "without", "join", "group_join", "left_join"))
+
+
+def _materialize_other(stage: query_plan.Stage) -> query_plan.Stage:
+    if not isinstance(stage, query_plan.Apply) or stage.name not in WITH_OTHER:
+        return stage
+    other, *args = stage.args
+    return query_plan.Apply(stage.name, stage.func, list(other), *args)
+
+
+def _delta_stage(stage: query_plan.Stage) -> Callable[[Iterable], Iterable]:
+    """
+    Returns a function which applies `stage` to the next values of a growing source, keeping what it has to remember
+    about the previous ones (a position, whether a `take_while` stopped, the values `distinct` saw, the set or lookup
+    of a second input).
+    """
+    if isinstance(stage, query_plan.Slice):
+        return _Slice(stage.start, stage.stop)
+    if isinstance(stage, query_plan.TakeWhile):
+        return _TakeWhile(query_plan._unwrap(stage.predicate))
+    if isinstance(stage, query_plan.Apply):
+        if stage.name == "distinct":
+            return _Distinct(None, *stage.args)
+        if stage.name == "distinct_by":
+            return _Distinct(query_plan._unwrap(stage.args[0]), *stage.args[1:])
+        if stage.name == "skip_while":
+            return _SkipWhile(query_plan._unwrap(stage.args[0]))
+        if stage.name in ("intersect", "without"):
+            return _Members(stage.args[0], stage.name == "intersect")
+        if stage.name in ("join", "group_join", "left_join"):
+            return _Join(stage.name, *stage.args)
+        if stage.name not in STATELESS:
+            raise ValueError(f"{query_plan.describe(stage)} can't be maintained incrementally")
+    return lambda values: query_plan._lower(values, stage)
+
+
+class _Pipeline:
+    __slots__ = ("_stages",)
+
+    def __init__(self, plan: Tuple[query_plan.Stage, ...]) -> None:
+        self._stages = [_delta_stage(stage) for stage in query_plan.optimize(plan)]
+
+    def __call__(self, values: Iterable) -> List:
+        for stage in self._stages:
+            values = stage(values)
+        return list(values)
+
+
+class ListResult:
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values = []
+
+    def update(self, values: List) -> None:
+        self.values.extend(values)
+
+    def value(self) -> List:
+        return list(self.values)
+
+
+class SetResult:
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values = set()
+
+    def update(self, values: List) -> None:
+        self.values.update(values)
+
+    def value(self) -> set:
+        return set(self.values)
+
+
+class CountResult:
+    __slots__ = ("predicate", "count")
+
+    def __init__(self, predicate: Callable | None = None) -> None:
+        self.predicate = predicate
+        self.count = 0
+
+    def update(self, values: List) -> None:
+        if self.predicate is None:
+            self.count += len(values)
+        else:
+            self.count += sum(1 for _ in filter(self.predicate, values))
+
+    def value(self) -> int:
+        return self.count
+
+
+class AggregateResult:
+    __slots__ = ("func", "result")
+
+    def __init__(self, func: Callable, seed: Any = query_plan.MISSING) -> None:
+        self.func = func
+        self.result = seed
+
+    def update(self, values: List) -> None:
+        if not values:
+            return
+        if self.result is query_plan.MISSING:
+            self.result = reduce(self.func, values)
+        else:
+            self.result = reduce(self.func, values, self.result)
+
+    def value(self) -> Any:
+        return self.result
+
+
+class EndsResult:
+    """
+    Keeps the first and the last value.
+    """
+    __slots__ = ("first", "last")
+
+    def __init__(self) -> None:
+        self.first = self.last = query_plan.MISSING
+
+    def update(self, values: List) -> None:
+        if values:
+            if self.first is query_plan.MISSING:
+                self.first = values[0]
+            self.last = values[-1]
+
+    def value(self) -> Tuple[Any, Any]:
+        return self.first, self.last
+
+
+class AggregateByResult:
+    __slots__ = ("key_selector", "aggregation", "groups")
+
+    def __init__(self, key_selector: Callable, aggregation: Aggregation) -> None:
+        self.key_selector = key_selector
+        self.aggregation = aggregation
+        self.groups = {}
+
+    def update(self, values: List) -> None:
+        self.aggregation.accumulate(self.groups, values, self.key_selector)
+
+    def value(self) -> List[Dict[str, Any]]:
+        result = self.aggregation.result
+        return [result(key, state) for key, state in self.groups.items()]
+
+
+def _hashable(arg: Any) -> Hashable:
+    if isinstance(arg, dict):
+        return tuple((key, _hashable(value)) for key, value in arg.items())
+    try:
+        hash(arg)
+    except TypeError:
+        return repr(arg)
+    return arg
+
+
+class View:
+    """
+    The state of a materialized query over a `LiveSource`. Every result that was read (a list, a count, ...) is kept
+    and updated with the values appended since the last read. The plan runs once per delta for all results; a result
+    read for the first time catches up with the history through a fresh copy of the plan. Second inputs of
+    `intersect`, `without` and the joins are read into lists once, so they may be iterators.
+    """
+    __slots__ = ("source", "plan", "_pipeline", "_position", "_results", "_lock")
+
+    def __init__(self, source: Iterable, plan: Tuple[query_plan.Stage, ...]) -> None:
+        if not isinstance(source, LiveSource):
+            raise TypeError(f"only queries over a LiveSource can be materialized, not {type(source).__name__}")
+        self.source = source
+        self.plan = plan = tuple(map(_materialize_other, plan))
+        self._pipeline = _Pipeline(plan)
+        self._position = 0
+        self._results: Dict[Hashable, Any] = {}
+        self._lock = Lock()
+
+    def read(self, name: str, factory: Callable[[], Any], *args: Any) -> Any:
+        """
+        Returns the current value of the result identified by `name` and `args`, created with `factory` on the first
+        read. Callables among `args` are identified by identity, so a new lambda per read starts a new result.
+        """
+        key = (name, *map(_hashable, args))
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                result = factory()
+                if self._results:
+                    result.update(_Pipeline(self.plan)(self.source.since(0, self._position)))
+                self._results[key] = result
+            self._refresh()
+            return result.value()
+
+    def _refresh(self) -> None:
+        position = len(self.source)
+        if position == self._position:
+            return
+        delta = self._pipeline(self.source.since(self._position, position))
+        self._position = position
+        for result in self._results.values():
+            result.update(delta)
@@ -0,0 +1,110 @@
+import unittest
+from threading import Thread
+from enumerables import *
+from incremental import *
+
+class TestIncremental(unittest.TestCase):
+    def test_results_follow_appends(self):
+        source = LiveSource([1, 2, 3])
+        view = Enumerable().of(source).where(lambda x: x % 2 == 1).select(lambda x: x * 10).materialize()
+        add = lambda x, y: x + y
+        self.assertEqual((view.to_list(), view.count(), view.aggregate_with_seed(add, 0)), ([10, 30], 2, 40))
+        source.extend([4, 5, 6, 7])
+        self.assertEqual((view.to_list(), view.count(), view.aggregate_with_seed(add, 0)), ([10, 30, 50, 70], 4, 160))
+        source.append(9)
+        self.assertEqual((view.first(), view.last(), view.to_set()), (10, 90, {10, 30, 50, 70, 90}))
+        self.assertEqual(view.where(lambda x: x > 40).to_list(), [50, 70, 90])
+
+    def test_only_new_values_are_processed(self):
+        calls = []
+        source = LiveSource(range(100))
+        view = Enumerable().of(source).where(lambda x: calls.append(x) or x % 3 == 0).materialize()
+        is_even = lambda x: x % 2 == 0
+        self.assertEqual((view.count(), view.count_where(is_even)), (34, 17))
+        calls.clear()
+        source.extend(range(100, 110))
+        self.assertEqual((view.count(), view.count_where(is_even)), (37, 19))
+        self.assertEqual(calls, list(range(100, 110)))
+
+    def test_result_read_late_catches_up(self):
+        source = LiveSource(range(5))
+        view = Enumerable().of(source).skip(1).materialize()
+        self.assertEqual(view.count(), 4)
+        source.extend(range(5, 8))
+        self.assertEqual(view.to_list(), [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(view.aggregate(max), 7)
+
+    def test_stateful_operators(self):
+        source = LiveSource([3, 1, 3])
+        distinct = Enumerable().of(source).distinct().materialize()
+        window = Enumerable().of(source).skip(1).take(4).materialize()
+        prefix = Enumerable().of(source).take_while(lambda x: x < 5).materialize()
+        suffix = Enumerable().of(source).skip_while(lambda x: x < 5).materialize()
+        recent = Enumerable().of(source).distinct(max_keys=2).materialize()
+        for values in ([], [2, 1], [7], [1, 8]):
+            source.extend(values)
+            snapshot = list(source)
+            self.assertEqual(distinct.to_list(), list(dict.fromkeys(snapshot)))
+            self.assertEqual(window.to_list(), snapshot[1:5])
+            self.assertEqual(prefix.to_list(), list(takewhile(lambda x: x < 5, snapshot)))
+            self.assertEqual(suffix.to_list(), list(dropwhile(lambda x: x < 5, snapshot)))
+            self.assertEqual(recent.to_list(), Enumerable().of(snapshot).distinct(max_keys=2).to_list())
+
+    def test_second_inputs_are_read_once(self):
+        source = LiveSource([1, 2])
+        common = Enumerable().of(source).intersect(x for x in [2, 3, 4]).materialize()
+        rest = Enumerable().of(source).without(iter([2, 3])).materialize()
+        pairs = Enumerable().of(source).join(iter([1, 2, 3]), lambda x: x, lambda y: y).materialize()
+        groups = Enumerable().of(source).group_join(iter([1, 1, 3]), lambda x: x, lambda y: y).materialize()
+        outer = Enumerable().of(source).left_join(iter([2, 3]), lambda x: x, lambda y: y).materialize()
+        self.assertEqual((common.to_list(), rest.to_list(), pairs.count()), ([2], [1], 2))
+        self.assertEqual((groups.to_list(), outer.to_list()), ([(1, [1, 1]), (2, [])], [(1, None), (2, 2)]))
+        source.extend([3, 4])
+        self.assertEqual((common.to_list(), rest.to_list()), ([2, 3, 4], [1, 4]))
+        self.assertEqual((pairs.to_list(), pairs.count()), ([(1, 1), (2, 2), (3, 3)], 3))
+        self.assertEqual(groups.to_list(), [(1, [1, 1]), (2, []), (3, [3]), (4, [])])
+        self.assertEqual(outer.to_list(), [(1, None), (2, 2), (3, 3), (4, None)])
+        self.assertEqual(common.select(str).to_list(), ["2", "3", "4"])
+
+    def test_aggregate_by(self):
+        source = LiveSource([("eu", 3), ("us", 5)])
+        region, amount = lambda row: row[0], lambda row: row[1]
+        view = Enumerable().of(source).materialize()
+        read = lambda: view.aggregate_by(region, count=True, sum=amount, max=amount).to_list()
+        self.assertEqual(read(), [{"key": "eu", "count": 1, "sum": 3, "max": 3},
+                                  {"key": "us", "count": 1, "sum": 5, "max": 5}])
+        source.extend([("eu", 4), ("ap", 1)])
+        self.assertEqual(read(), [{"key": "eu", "count": 2, "sum": 7, "max": 4},
+                                  {"key": "us", "count": 1, "sum": 5, "max": 5},
+                                  {"key": "ap", "count": 1, "sum": 1, "max": 1}])
+
+    def test_unsupported_queries(self):
+        with self.assertRaises(TypeError):
+            Enumerable().of([1, 2]).materialize()
+        with self.assertRaises(ValueError):
+            Enumerable().of(LiveSource()).reverse().materialize()
+        empty = Enumerable().of(LiveSource()).materialize()
+        self.assertTrue(empty.is_empty())
+        self.assertIsNone(empty.first())
+        with self.assertRaises(TypeError):
+            empty.aggregate(max)
+
+    def test_concurrent_appends_and_reads(self):
+        source = LiveSource()
+        view = Enumerable().of(source).where(lambda x: x % 2 == 0).materialize()
+
+        def append(start):
+            for x in range(start, start + 1000):
+                source.append(x)
+                view.count()
+        threads = [Thread(target=append, args=(start,)) for start in range(0, 4000, 1000)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(view.count(), 2000)
+        self.assertEqual(sorted(view.to_list()), list(range(0, 4000, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from itertools import chain, count
+from threading import RLock
+from typing import Any, Callable, Dict, Iterator, List
+
+class HashIndex:
+    """
+    Maps the keys of the values to the slots they are stored in: a single slot, or a dict of the slots in insertion
+    order if several values have the key, so a slot is removed in O(1) and unique keys need no container.
+    """
+    __slots__ = ("key_selector", "_buckets")
+
+    def __init__(self, key_selector: Callable) -> None:
+        self.key_selector = key_selector
+        self._buckets: Dict[Any, int | Dict[int, None]] = {}
+
+    def _add(self, slot: int, key: Any) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = slot
+        elif type(bucket) is int:
+            self._buckets[key] = {bucket: None, slot: None}
+        else:
+            bucket[slot] = None
+
+    def add(self, slot: int, value: Any) -> None:
+        self._add(slot, self.key_selector(value))
+
+    def extend(self, values: Dict[int, Any]) -> None:
+        buckets = self._buckets
+        for slot, key in zip(values, map(self.key_selector, values.values())):
+            if key in buckets:
+                self._add(slot, key)
+            else:
+                buckets[key] = slot
+
+    def remove(self, slot: int, value: Any) -> None:
+        key = self.key_selector(value)
+        bucket = self._buckets[key]
+        if type(bucket) is int:
+            del self._buckets[key]
+            return
+        del bucket[slot]
+        if len(bucket) == 1:
+            self._buckets[key] = next(iter(bucket))
+
+    def equal(self, key: Any) -> Iterable[int]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return ()
+        return (bucket,) if type(bucket) is int else bucket
+
+
+class SortedIndex:
+    """
+    Keeps the keys of the values sorted, next to the slots they are stored in, and answers equality and range queries
+    with `bisect` in O(log n + k). Adding and removing a value moves the entries behind it, which is a fast memory move
+    even for large collections. Values with equal keys stay in insertion order.
+    """
+    __slots__ = ("key_selector", "_keys", "_slots")
+
+    def __init__(self, key_selector: Callable) -> None:
+        self.key_selector = key_selector
+        self._keys: List = []
+        self._slots: List[int] = []
+
+    def add(self, slot: int, value: Any) -> None:
+        key = self.key_selector(value)
+        # slots only grow, so a new value belongs behind every value with an equal key
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._slots.insert(position, slot)
+
+    def extend(self, values: Dict[int, Any]) -> None:
+        # sorted by (key, slot): equal keys stay in insertion order
+        entries = sorted(zip(chain(self._keys, map(self.key_selector, values.values())), chain(self._slots, values)))
+        self._keys = [key for key, _ in entries]
+        self._slots = [slot for _, slot in entries]
+
+    def remove(self, slot: int, value: Any) -> None:
+        key = self.key_selector(value)
+        start = bisect_left(self._keys, key)
+        stop = bisect_right(self._keys, key, start)
+        position = start + self._slots[start:stop].index(slot)
+        del self._keys[position]
+        del self._slots[position]
+
+    def equal(self, key: Any) -> Iterable[int]:
+        start = bisect_left(self._keys, key)
+        return self._slots[start:bisect_right(self._keys, key, start)]
+
+    def between(self, low: Any = None, high: Any = None, inclusive: bool = True) -> Iterable[int]:
+        """
+        Returns the slots of the values with keys from `low` to `high` in ascending order of their keys. `None` leaves a
+        side open, with `inclusive=False` the range excludes `high`.
+        """
+        start = 0 if low is None else bisect_left(self._keys, low)
+        if high is None:
+            stop = len(self._keys)
+        else:
+            stop = (bisect_right if inclusive else bisect_left)(self._keys, high, start)
+        return self._slots[start:stop]
+
+
+class IndexedTable:
+    """
+    A collection of values with hash and sorted indexes on key selectors, which are updated whenever values are added
+    or removed. Values are stored in numbered slots in insertion order. Enumerating the table reads a snapshot of its
+    values, so it can be modified by other threads meanwhile. Keys must not change while a value is in the table.
+    """
+    __slots__ = ("_values", "_next_slot", "_indexes", "_lock")
+
+    def __init__(self, values: Iterable = (), hash_keys: Iterable[Callable] = (),
+                 sorted_keys: Iterable[Callable] = ()) -> None:
+        self._values: Dict[int, Any] = {}
+        self._next_slot = 0
+        self._indexes: Dict[Callable, List[HashIndex | SortedIndex]] = {}
+        self._lock = RLock()
+        for key_selector in hash_keys:
+            self.add_index(key_selector)
+        for key_selector in sorted_keys:
+            self.add_index(key_selector, sorted=True)
+        self.extend(values)
+
+    def add_index(self, key_selector: Callable, sorted: bool = False) -> None:
+        index = SortedIndex(key_selector) if sorted else HashIndex(key_selector)
+        with self._lock:
+            index.extend(self._values)
+            self._indexes.setdefault(key_selector, []).append(index)
+
+    def add(self, value: Any) -> None:
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot += 1
+            for indexes in self._indexes.values():
+                for index in indexes:
+                    index.add(slot, value)
+            self._values[slot] = value
+
+    def extend(self, values: Iterable) -> None:
+        with self._lock:
+            added = dict(zip(count(self._next_slot), values))
+            for indexes in self._indexes.values():
+                for index in indexes:
+                    index.extend(added)
+            self._next_slot += len(added)
+            self._values.update(added)
+
+    def _find(self, value: Any) -> int | None:
+        """
+        Returns the first slot holding `value`, looked up in a hash index if there is one.
+        """
+        for indexes in self._indexes.values():
+            for index in indexes:
+                if isinstance(index, HashIndex):
+                    candidates = index.equal(index.key_selector(value))
+                    return next((slot for slot in candidates if self._values[slot] == value), None)
+        return next((slot for slot, stored in self._values.items() if stored == value), None)
+
+    def remove(self, value: Any) -> None:
+        """
+        Removes the first occurrence of `value`. Raises `ValueError` if it is not in the table.
+        """
+        with self._lock:
+            slot = self._find(value)
+            if slot is None:
+                raise ValueError(f"{value!r} is not in the table")
+            stored = self._values.pop(slot)
+            for indexes in self._indexes.values():
+                for index in indexes:
+                    index.remove(slot, stored)
+
+    def index(self, key_selector: Callable, sorted: bool = False) -> HashIndex | SortedIndex | None:
+        """
+        Returns an index on `key_selector` (the same function object the index was created with), preferring a hash
+        index for equality and requiring a sorted index if `sorted` is set.
+        """
+        indexes = self._indexes.get(key_selector, ())
+        for index in indexes:
+            if isinstance(index, HashIndex) and not sorted:
+                return index
+        for index in indexes:
+            if isinstance(index, SortedIndex):
+                return index
+        return None
+
+    def equal(self, key_selector: Callable, key: Any) -> List:
+        with self._lock:
+            index = self.index(key_selector)
+            if index is None:
+                return [value for value in self._values.values() if key_selector(value) == key]
+            values = self._values
+            return [values[slot] for slot in index.equal(key)]
+
+    def between(self, key_selector: Callable, low: Any = None, high: Any = None, inclusive: bool = True) -> List:
+        with self._lock:
+            index = self.index(key_selector, sorted=True)
+            if index is None:
+                matches = []
+                for value in self._values.values():
+                    key = key_selector(value)
+                    if (low is None or low <= key) and (high is None or (key <= high if inclusive else key < high)):
+                        matches.append((key, value))
+                matches.sort(key=lambda match: match[0])
+                return [value for _, value in matches]
+            values = self._values
+            return [values[slot] for slot in index.between(low, high, inclusive)]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._values.values()))
+
+    def __repr__(self) -> str:
+        return f"IndexedTable({len(self._values)} values)"
@@ -0,0 +1,70 @@
+import unittest
+from threading import Thread
+from enumerables import *
+from indexes import *
+
+by_id = lambda row: row["id"]
+by_age = lambda row: row["age"]
+
+
+class TestIndexes(unittest.TestCase):
+    def people(self, size=100):
+        return Enumerable().of([{"id": i, "age": i % 10} for i in range(size)]).to_indexed([by_id], [by_age])
+
+    def test_where_key_eq(self):
+        people = self.people()
+        self.assertEqual(people.where_key_eq(by_id, 42).to_list(), [{"id": 42, "age": 2}])
+        self.assertEqual(people.where_key_eq(by_id, 100).to_list(), [])
+        self.assertEqual(people.where_key_eq(by_age, 3).select(by_id).to_list(), list(range(3, 100, 10)))
+
+    def test_where_key_between(self):
+        people = self.people()
+        result = people.where_key_between(by_age, 8).select(by_id).to_list()
+        self.assertEqual(result, list(range(8, 100, 10)) + list(range(9, 100, 10)))
+        self.assertEqual(people.where_key_between(by_age, 1, 3, inclusive=False).count(), 20)
+        self.assertEqual(people.where_key_between(by_age, high=0).count(), 10)
+
+    def test_without_index_falls_back_to_a_scan(self):
+        people = self.people()
+        by_decade = lambda row: row["id"] // 10
+        self.assertEqual(people.where_key_eq(by_decade, 3).count(), 10)
+        self.assertEqual(people.where_key_between(lambda row: -row["id"], -2, -1).select(by_id).to_list(), [2, 1])
+        self.assertIsNone(people._values.index(by_decade))
+
+    def test_indexes_follow_changes(self):
+        people = self.people(20)
+        people.remove({"id": 3, "age": 3})
+        people.add({"id": 20, "age": 3})
+        people.add({"id": 21, "age": 0})
+        self.assertEqual(people.where_key_eq(by_id, 3).to_list(), [])
+        self.assertEqual(people.where_key_between(by_age, 3, 3).select(by_id).to_list(), [13, 20])
+        self.assertEqual(people.where_key_eq(by_age, 0).select(by_id).to_list(), [0, 10, 21])
+        with self.assertRaises(ValueError):
+            people.remove({"id": 3, "age": 3})
+        people.add_index(lambda row: row["id"] % 2, sorted=True)
+        self.assertEqual(people.count(), 21)
+
+    def test_index_results_match_scans(self):
+        people = self.people(500)
+        for low, high in [(0, 0), (2, 7), (9, 20), (-5, 1)]:
+            expected = people.where(lambda row: low <= row["age"] <= high).order_by(by_age).to_list()
+            self.assertEqual(people.where_key_between(by_age, low, high).to_list(), expected)
+
+    def test_concurrent_changes(self):
+        people = self.people(0)
+
+        def add(start):
+            for i in range(start, start + 500):
+                people.add({"id": i, "age": i % 10})
+                people.where_key_eq(by_id, i).first()
+        threads = [Thread(target=add, args=(start,)) for start in range(0, 2000, 500)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(people.count(), 2000)
+        self.assertEqual(people.where_key_between(by_age, 5, 5).count(), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
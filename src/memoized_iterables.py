@@ -0,0 +1,117 @@
+from collections import deque
+from collections.abc import Iterable
+from threading import RLock
+from typing import Iterator, List
+from weakref import WeakSet
+
+class _ReleasingIterator:
+    """
+    Iterator of a releasing `MemoizedIterable`. It is registered as soon as it is created so values it has not read
+    yet are kept, and unregistered when it is exhausted, closed or garbage collected.
+    """
+    __slots__ = ("_owner", "position", "__weakref__")
+
+    def __init__(self, owner: 'MemoizedIterable', position: int) -> None:
+        self._owner = owner
+        self.position = position
+
+    def __iter__(self) -> '_ReleasingIterator':
+        return self
+
+    def __next__(self):
+        if self._owner is None:
+            raise StopIteration
+        return self._owner._next(self)
+
+    def close(self) -> None:
+        if self._owner is not None:
+            self._owner._detach(self)
+            self._owner = None
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class MemoizedIterable:
+    """
+    The `MemoizedIterable` class reads its source at most once and buffers every value, so any number of iterators
+    (also from different threads) can replay it. The source is only advanced when an iterator reaches the end of
+    the buffer.
+
+    With `release_when_consumed` values are dropped from the buffer once every open iterator has read them. Iterators
+    created later start at the oldest value that is still buffered, so all consumers should start iterating before
+    the first one gets ahead.
+    """
+    def __init__(self, values: Iterable, release_when_consumed: bool = False) -> None:
+        self._values = values
+        self._source: Iterator | None = None
+        self._done = False
+        self._release = release_when_consumed
+        self._buffer: List | deque = deque() if release_when_consumed else []
+        self._offset = 0
+        self._cursors: WeakSet[_ReleasingIterator] = WeakSet()
+        # Guards the source and, when releasing, the buffer and the cursors. Reentrant because a releasing iterator
+        # may be garbage collected (and detach itself) while the lock is held.
+        self._lock = RLock()
+
+    def _fill(self, size: int) -> bool:
+        """
+        Reads the next value from the source unless another iterator already did. Returns `False` when the source is
+        exhausted. Must be called with the lock held; `size` is the buffer end the caller has seen.
+        """
+        if self._offset + len(self._buffer) > size:
+            return True
+        if self._done:
+            return False
+        if self._source is None:
+            self._source = iter(self._values)
+            self._values = None
+        try:
+            self._buffer.append(next(self._source))
+        except StopIteration:
+            self._done = True
+            self._source = None
+            return False
+        return True
+
+    def _replay(self) -> Iterator:
+        buffer = self._buffer
+        index = 0
+        while True:
+            while index < len(buffer):
+                yield buffer[index]
+                index += 1
+            with self._lock:
+                if not self._fill(index):
+                    return
+
+    def _next(self, iterator: _ReleasingIterator):
+        with self._lock:
+            if self._fill(iterator.position):
+                value = self._buffer[iterator.position - self._offset]
+                iterator.position += 1
+                self._release_consumed()
+                return value
+        iterator.close()
+        raise StopIteration
+
+    def _detach(self, iterator: _ReleasingIterator) -> None:
+        with self._lock:
+            self._cursors.discard(iterator)
+            self._release_consumed()
+
+    def _release_consumed(self) -> None:
+        if not self._cursors:
+            return
+        consumed = min(iterator.position for iterator in self._cursors) - self._offset
+        for _ in range(consumed):
+            self._buffer.popleft()
+        self._offset += consumed
+
+    def __iter__(self) -> Iterator:
+        if not self._release:
+            return self._replay()
+        with self._lock:
+            iterator = _ReleasingIterator(self, self._offset)
+            self._cursors.add(iterator)
+            return iterator
@@ -0,0 +1,59 @@
+import unittest
+from threading import Thread
+from enumerables import *
+from memoized_iterables import *
+
+class TestMemoizedIterables(unittest.TestCase):
+    def test_replay(self):
+        calls = []
+        enumerable = Enumerable().of(x for x in range(5)).select(lambda x: calls.append(x) or x * 2).memoize()
+        self.assertEqual(enumerable.count(), 5)
+        self.assertEqual(enumerable.to_list(), [0, 2, 4, 6, 8])
+        self.assertEqual(enumerable.where(lambda x: x > 4).to_list(), [6, 8])
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+
+    def test_reads_lazily(self):
+        source = iter(range(10))
+        enumerable = Enumerable().of(source).memoize()
+        self.assertFalse(enumerable.is_empty())
+        self.assertEqual(enumerable.take(3).to_list(), [0, 1, 2])
+        self.assertEqual(next(source), 3)
+
+    def test_interleaved_iterators(self):
+        memoized = MemoizedIterable(iter(range(4)))
+        first, second = iter(memoized), iter(memoized)
+        result = [next(first), next(second), next(second), next(first), next(first)]
+        self.assertEqual(result, [0, 0, 1, 1, 2])
+        self.assertEqual(list(second), [2, 3])
+        self.assertEqual(list(first), [3])
+
+    def test_concurrent_iterators(self):
+        enumerable = Enumerable().of(x for x in range(10000)).share()
+        results = [None] * 8
+
+        def consume(index: int) -> None:
+            results[index] = enumerable.to_list()
+
+        threads = [Thread(target=consume, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            self.assertEqual(result, list(range(10000)))
+
+    def test_release_when_consumed(self):
+        memoized = MemoizedIterable(iter(range(100)), release_when_consumed=True)
+        first, second = iter(memoized), iter(memoized)
+        for _ in range(50):
+            next(first)
+        self.assertEqual(len(memoized._buffer), 50)
+        self.assertEqual([next(second) for _ in range(40)], list(range(40)))
+        self.assertEqual(len(memoized._buffer), 10)
+        del second
+        self.assertEqual(len(memoized._buffer), 0)
+        self.assertEqual(list(first), list(range(50, 100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
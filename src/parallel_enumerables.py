@@ -0,0 +1,226 @@
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import partial, reduce
+from itertools import islice
+from types import UnionType
+from typing import Any, Callable, Iterator, List, Tuple
+from enumerable_funcs import Predicate, Selector, Accumulator, Action, T
+from sketches import HyperLogLog, QuantileSketch, Reservoir
+import os
+import query_plan
+
+_worker_plan: Tuple[query_plan.Stage, ...] = ()
+_worker_terminal: Tuple[str, Tuple] = ("list", ())
+
+
+def _install(plan: Tuple[query_plan.Stage, ...], terminal: str, args: Tuple) -> None:
+    global _worker_plan, _worker_terminal
+    _worker_plan = plan
+    _worker_terminal = (terminal, args)
+
+
+def _run_chunk(chunk: List) -> Any:
+    terminal, args = _worker_terminal
+    values = query_plan.compile_plan(chunk, _worker_plan)
+    if terminal == "list":
+        return list(values)
+    if terminal == "count":
+        return sum(1 for _ in values)
+    if terminal == "any":
+        return any(map(args[0], values))
+    if terminal == "all":
+        return all(map(args[0], values))
+    if terminal == "set":
+        return set(values)
+    if terminal == "sketch":
+        sketch = args[0]()
+        sketch.update(values)
+        return sketch
+    # aggregate: the MISSING sentinel does not survive pickling, so report emptiness explicitly
+    result = query_plan.aggregate(chunk, _worker_plan, args[0])
+    return (False, None) if result is query_plan.MISSING else (True, result)
+
+
+class ParallelEnumerable:
+    """
+    The `ParallelEnumerable` class runs `where`, `select` and `select_many` stages on chunks of values in a process
+    pool. Terminal methods compute a partial result per chunk in the workers and combine the partials. All callables
+    are sent to the worker processes, so they have to be picklable (e.g. module level functions instead of lambdas).
+    """
+    def __init__(self, values: Iterable, workers: int | None = None, chunk_size: int = 1024, ordered: bool = True) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self._values = values
+        self._plan: Tuple[query_plan.Stage, ...] = ()
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._ordered = ordered
+
+    def _then(self, stage: query_plan.Stage) -> 'ParallelEnumerable':
+        enumerable = ParallelEnumerable(self._values, self._workers, self._chunk_size, self._ordered)
+        enumerable._plan = self._plan + (stage,)
+        return enumerable
+
+    def _chunks(self) -> Iterator[List]:
+        values = iter(self._values)
+        return iter(lambda: list(islice(values, self._chunk_size)), [])
+
+    def _partials(self, terminal: str, *args) -> Iterator:
+        """
+        Yields the partial result of every chunk. At most two chunks per worker are in flight, which bounds the
+        memory used for reading ahead and, in ordered mode, for the reorder buffer.
+        """
+        executor = ProcessPoolExecutor(self._workers, initializer=_install, initargs=(self._plan, terminal, args))
+        pending: deque[Future] = deque()
+        in_flight = 2 * self._workers
+        try:
+            chunks = self._chunks()
+            for chunk in chunks:
+                pending.append(executor.submit(_run_chunk, chunk))
+                if len(pending) >= in_flight:
+                    break
+            while pending:
+                if self._ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in finished]
+                    for future in done:
+                        pending.remove(future)
+                for future in done:
+                    result = future.result()
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.append(executor.submit(_run_chunk, chunk))
+                    yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def where(self, predicate: Callable[[T], bool]) -> 'ParallelEnumerable':
+        """
+        The `where` method is used to filter the values of the ParallelEnumerable object based on a predicate.
+        """
+        return self._then(query_plan.Where(predicate))
+
+    def select(self, selector: Callable[[T], T]) -> 'ParallelEnumerable':
+        """
+        The `select` method is used to project the values of the ParallelEnumerable object based on a selector.
+        """
+        return self._then(query_plan.Select(selector))
+
+    def select_many(self, selector: Callable[[T], Iterable[T]]) -> 'ParallelEnumerable':
+        """
+        The `select_many` method flattens the values of the ParallelEnumerable object based on a selector.
+        """
+        return self._then(query_plan.SelectMany(selector))
+
+    def aggregate(self, func: Callable[[T, T], T]) -> T:
+        """
+        The `aggregate` method is used to apply an accumulator function over the values of the ParallelEnumerable
+        object. The function is applied per chunk and then over the chunk results, so it must be associative, and
+        commutative as well in unordered mode.
+        """
+        partials = [value for found, value in self._partials("aggregate", func) if found]
+        if not partials:
+            raise TypeError("aggregate() of empty sequence with no initial value")
+        return reduce(func, partials)
+
+    def aggregate_with_seed(self, func: Callable[[T, T], T], seed: T) -> T:
+        """
+        The `aggregate_with_seed` method works like `aggregate` but starts with a seed/initial value which is only
+        applied once.
+        """
+        return reduce(func, (value for found, value in self._partials("aggregate", func) if found), seed)
+
+    def count(self) -> int:
+        """
+        The `count` method is used to count the number of values in the ParallelEnumerable object.
+        """
+        return sum(self._partials("count"))
+
+    def count_where(self, predicate: Callable[[T], bool]) -> int:
+        """
+        The `count_where` method is used to count the number of values in the ParallelEnumerable object that
+        satisfy a predicate.
+        """
+        return self.where(predicate).count()
+
+    def any(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `any` method is used to check if any value satisfies a predicate. Remaining chunks are cancelled as
+        soon as one chunk contains a match.
+        """
+        return any(self._partials("any", predicate))
+
+    def all(self, predicate: Callable[[T], bool]) -> bool:
+        """
+        The `all` method is used to check if all values satisfy a predicate. Remaining chunks are cancelled as soon
+        as one chunk contains a mismatch.
+        """
+        return all(self._partials("all", predicate))
+
+    def to_set(self) -> set:
+        """
+        The `to_set` method is used to convert the ParallelEnumerable object to a set.
+        """
+        result = set()
+        for partial in self._partials("set"):
+            result |= partial
+        return result
+
+    def _sketch(self, factory: Callable[[], Any]) -> Any:
+        sketch = factory()
+        for partial in self._partials("sketch", factory):
+            sketch.merge(partial)
+        return sketch
+
+    def approx_distinct_count(self, precision: int = 14) -> int:
+        """
+        The `approx_distinct_count` method is used to estimate the number of distinct values with a HyperLogLog sketch
+        per chunk. Only the sketches are sent back and merged, which gives the same estimate as a single sketch.
+        """
+        return self._sketch(partial(HyperLogLog, precision)).count()
+
+    def approx_quantiles(self, quantiles: Iterable[float], k: int = 200) -> List:
+        """
+        The `approx_quantiles` method is used to estimate the values at the given `quantiles` with a KLL sketch per
+        chunk, which are merged in the calling process.
+        """
+        return self._sketch(partial(QuantileSketch, k)).quantiles(quantiles)
+
+    def sample(self, k: int) -> List:
+        """
+        The `sample` method is used to draw a uniform random sample of `k` values from a reservoir per chunk, which are
+        merged in the calling process.
+        """
+        return self._sketch(partial(Reservoir, k)).values
+
+    def to_list(self) -> List:
+        """
+        The `to_list` method is used to convert the ParallelEnumerable object to a list.
+        """
+        return list(self)
+
+    def foreach(self, action: Callable[[T], None]) -> None:
+        """
+        The `foreach` method is used to perform an action on each value in the calling process.
+        """
+        for x in self:
+            action(x)
+
+    def __or__(self, func: Callable) -> UnionType:
+        if isinstance(func, Predicate):
+            return self.where(func)
+        elif isinstance(func, Selector):
+            return self.select(func)
+        elif isinstance(func, Accumulator):
+            return self.aggregate(func)
+        elif isinstance(func, Action):
+            return self.foreach(func)
+        else:
+            return func(self)
+
+    def __iter__(self) -> Iterator:
+        for partial in self._partials("list"):
+            yield from partial
@@ -0,0 +1,79 @@
+import unittest
+from enumerables import *
+from parallel_enumerables import *
+from sketches import HyperLogLog
+
+def is_even(x: int) -> bool:
+    return x % 2 == 0
+
+def square(x: int) -> int:
+    return x * x
+
+def add(x: int, y: int) -> int:
+    return x + y
+
+def repeat_twice(x: int) -> list:
+    return [x, x]
+
+def is_large(x: int) -> bool:
+    return x > 900
+
+def is_small(x: int) -> bool:
+    return x < 900
+
+class TestParallelEnumerables(unittest.TestCase):
+    def setUp(self):
+        self.parallel = Enumerable().of(range(1000)).as_parallel(workers=2, chunk_size=64)
+
+    def test_ordered_select_where(self):
+        result = self.parallel.where(is_even).select(square).to_list()
+        expected = [x * x for x in range(1000) if x % 2 == 0]
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_unordered(self):
+        result = Enumerable().of(range(1000)).as_parallel(2, 10, ordered=False).select_many(repeat_twice).to_list()
+        expected = sorted(list(range(1000)) * 2)
+        self.assertEqual(sorted(result), expected, f"Expected: {expected}, but got: {result}")
+
+    def test_sketches_are_merged_across_chunks(self):
+        parallel = Enumerable().of(list(range(5000)) * 2).as_parallel(workers=2, chunk_size=500, ordered=False)
+        single = HyperLogLog()
+        single.update(range(5000))
+        self.assertEqual(parallel.approx_distinct_count(), single.count())
+        self.assertLess(abs(parallel.approx_quantiles([0.5])[0] - 2500), 100)
+        sample = parallel.sample(20)
+        self.assertEqual(len(sample), 20)
+        self.assertTrue(all(0 <= x < 5000 for x in sample))
+
+    def test_partial_aggregation(self):
+        self.assertEqual(self.parallel.select(square).aggregate(add), sum(x * x for x in range(1000)))
+        self.assertEqual(self.parallel.aggregate_with_seed(add, 10), sum(range(1000)) + 10)
+        self.assertEqual(self.parallel.count(), 1000)
+        self.assertEqual(self.parallel.count_where(is_even), 500)
+        self.assertEqual(self.parallel.select(is_even).to_set(), {True, False})
+
+    def test_any_all(self):
+        self.assertTrue(self.parallel.any(is_large))
+        self.assertFalse(self.parallel.all(is_small))
+        self.assertTrue(self.parallel.where(is_even).all(is_even))
+
+    def test_aggregate_of_empty(self):
+        with self.assertRaises(TypeError):
+            self.parallel.where(is_large).where(is_small).aggregate(add)
+
+    def test_piping(self):
+        result = self.parallel | Selector(square) | Predicate(is_even) | Accumulator(add)
+        expected = sum(x * x for x in range(1000) if x % 2 == 0)
+        self.assertEqual(result, expected, f"Expected: {expected}, but got: {result}")
+
+    def test_early_stop(self):
+        result = Enumerable().of(self.parallel.select(square)).take(3).to_list()
+        self.assertEqual(result, [0, 1, 4])
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            Enumerable().of(range(10)).as_parallel(chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
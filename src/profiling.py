@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Iterator, List
+
+class OperatorStats:
+    """
+    `OperatorStats` holds what one operator of a profiled query did: the number of values it read (`rows_in`) and
+    produced (`rows_out`), the time spent in the user callables it was given (`callable_time`) and the time from the
+    start of the query until it produced its first value (`first_row_time`, `None` if it produced none). Times are in
+    seconds. The first operator of every profile is the source, which has no `rows_in`.
+    """
+    __slots__ = ("operator", "rows_in", "rows_out", "callable_time", "first_row_time")
+
+    def __init__(self, operator: str) -> None:
+        self.operator = operator
+        self.rows_in: int | None = None
+        self.rows_out = 0
+        self.callable_time = 0.0
+        self.first_row_time: float | None = None
+
+    def __repr__(self) -> str:
+        return (f"OperatorStats({self.operator!r}, rows_in={self.rows_in}, rows_out={self.rows_out}, "
+                f"callable_time={self.callable_time:.6f}, first_row_time={self.first_row_time})")
+
+
+class Profile:
+    """
+    A `Profile` is reported to the hooks once per profiled query execution, when its values are exhausted or the
+    consumer stopped reading them. `elapsed` is the wall time in seconds from the start of the execution until then.
+    """
+    __slots__ = ("operators", "elapsed")
+
+    def __init__(self, operators: List[OperatorStats]) -> None:
+        self.operators = operators
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        width = max(len(stats.operator) for stats in self.operators)
+        lines = [f"{'operator':<{width}} {'rows in':>10} {'rows out':>10} {'callable ms':>12} {'first row ms':>13}"]
+        for stats in self.operators:
+            rows_in = "-" if stats.rows_in is None else stats.rows_in
+            first_row = "-" if stats.first_row_time is None else f"{stats.first_row_time * 1e3:.3f}"
+            lines.append(f"{stats.operator:<{width}} {rows_in:>10} {stats.rows_out:>10} "
+                         f"{stats.callable_time * 1e3:>12.3f} {first_row:>13}")
+        lines.append(f"total {self.elapsed * 1e3:.3f} ms")
+        return "\n".join(lines)
+
+
+Hook = Callable[[Profile], None]
+
+# Read without the lock on every query execution: profiling is on while the tuple is not empty.
+_hooks: tuple[Hook, ...] = ()
+_lock = Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    """
+    Registers `hook` to receive the `Profile` of every query execution, in any thread, until it is removed. Queries
+    are only instrumented while at least one hook is registered.
+    """
+    global _hooks
+    with _lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: Hook) -> None:
+    global _hooks
+    with _lock:
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+
+
+def enabled() -> bool:
+    return bool(_hooks)
+
+
+def report(profile: Profile) -> None:
+    for hook in _hooks:
+        hook(profile)
+
+
+@contextmanager
+def profiled(hook: Hook | None = None) -> Iterator[List[Profile]]:
+    """
+    Profiles the queries executed inside the `with` block. The profiles are passed to `hook` if one is given and
+    collected in the yielded list.
+    """
+    profiles: List[Profile] = []
+
+    def collect(profile: Profile) -> None:
+        profiles.append(profile)
+        if hook is not None:
+            hook(profile)
+
+    add_hook(collect)
+    try:
+        yield profiles
+    finally:
+        remove_hook(collect)
@@ -0,0 +1,60 @@
+import unittest
+from enumerables import *
+import profiling
+
+class TestProfiling(unittest.TestCase):
+    def test_operator_stats(self):
+        is_even = lambda x: x % 2 == 0
+        query = Enumerable().of(x for x in range(10)).where(is_even).select(lambda x: x // 4).distinct()
+        with profiling.profiled() as profiles:
+            self.assertEqual(query.to_list(), [0, 1, 2])
+        self.assertEqual(len(profiles), 1)
+        source, where, select, distinct = profiles[0].operators
+        self.assertEqual(
+            [(stats.operator, stats.rows_in, stats.rows_out) for stats in profiles[0].operators],
+            [("generator", None, 10), ("where(<lambda>)", 10, 5), ("select(<lambda>)", 5, 5), ("distinct()", 5, 3)],
+        )
+        self.assertGreater(where.callable_time, 0)
+        self.assertEqual(distinct.callable_time, 0)
+        self.assertLessEqual(source.first_row_time, distinct.first_row_time)
+        self.assertLessEqual(distinct.first_row_time, profiles[0].elapsed)
+        self.assertIn("where(<lambda>)", str(profiles[0]))
+
+    def test_reported_when_consumer_stops_early(self):
+        reported = []
+        with profiling.profiled(reported.append):
+            iterator = iter(Enumerable().of(range(100)).where(lambda x: x > 10))
+            self.assertEqual(next(iterator), 11)
+            self.assertEqual(reported, [])
+            del iterator
+        self.assertEqual(len(reported), 1)
+        self.assertEqual([stats.rows_out for stats in reported[0].operators], [12, 1])
+
+    def test_hooks(self):
+        reported = []
+        query = Enumerable().of(range(5)).where(lambda x: x > 1)
+        profiling.add_hook(reported.append)
+        try:
+            self.assertTrue(profiling.enabled())
+            query.count()
+            query.first()
+        finally:
+            profiling.remove_hook(reported.append)
+        self.assertFalse(profiling.enabled())
+        query.to_list()
+        self.assertEqual(len(reported), 2)
+
+    def test_shortcuts_are_kept(self):
+        key = lambda x: -x
+        with profiling.profiled() as profiles:
+            self.assertEqual(Enumerable().of(range(10 ** 12)).skip(10 ** 11).take(2).to_list(), [10 ** 11, 10 ** 11 + 1])
+            self.assertEqual(Enumerable().of(range(100)).order_by(key).take(3).to_list(), [99, 98, 97])
+        self.assertEqual(profiles[0].operators[0].operator, "range(0, 1000000000000).skip(100000000000).take(2)")
+        self.assertEqual(profiles[0].operators[0].rows_out, 2)
+        ordering, take = profiles[1].operators
+        self.assertEqual((ordering.operator, ordering.rows_out), ("order_by(<lambda>)", 3))
+        self.assertGreater(ordering.callable_time, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
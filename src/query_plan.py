@@ -0,0 +1,524 @@
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+from collections import deque
+from collections.abc import Mapping, Sequence, Set, Sized
+from itertools import chain, islice, takewhile
+from functools import reduce
+from time import perf_counter
+from enumerable_funcs import Func, order_by, top
+import profiling
+
+class Stage:
+    """
+    A `Stage` is one step of a logical query plan. Stages are recorded by the `Enumerable` and only
+    executed once a terminal operation runs.
+    """
+    __slots__ = ()
+    name = "stage"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class Where(Stage):
+    __slots__ = ("predicate",)
+    name = "where"
+
+    def __init__(self, predicate: Callable[[Any], bool]) -> None:
+        self.predicate = predicate
+
+    def __repr__(self) -> str:
+        return f"Where({self.predicate!r})"
+
+
+class Select(Stage):
+    __slots__ = ("selector",)
+    name = "select"
+
+    def __init__(self, selector: Callable[[Any], Any]) -> None:
+        self.selector = selector
+
+    def __repr__(self) -> str:
+        return f"Select({self.selector!r})"
+
+
+class SelectMany(Stage):
+    __slots__ = ("selector",)
+    name = "select_many"
+
+    def __init__(self, selector: Callable[[Any], Iterable]) -> None:
+        self.selector = selector
+
+    def __repr__(self) -> str:
+        return f"SelectMany({self.selector!r})"
+
+
+class TakeWhile(Stage):
+    __slots__ = ("predicate",)
+    name = "take_while"
+
+    def __init__(self, predicate: Callable[[Any], bool]) -> None:
+        self.predicate = predicate
+
+    def __repr__(self) -> str:
+        return f"TakeWhile({self.predicate!r})"
+
+
+class Slice(Stage):
+    """
+    `Slice` is the common form of `skip` and `take`: it keeps the elements with index in `[start, stop)`.
+    A `stop` of `None` means unbounded.
+    """
+    __slots__ = ("start", "stop")
+    name = "slice"
+
+    def __init__(self, start: int = 0, stop: int | None = None) -> None:
+        self.start = start
+        self.stop = stop
+
+    def is_empty(self) -> bool:
+        return self.stop is not None and self.stop <= self.start
+
+    def then(self, other: 'Slice') -> 'Slice':
+        """
+        Returns a single `Slice` equivalent to applying `self` and then `other`.
+        """
+        start = self.start + other.start
+        if other.stop is None:
+            stop = self.stop
+        elif self.stop is None:
+            stop = self.start + other.stop
+        else:
+            stop = min(self.stop, self.start + other.stop)
+        if stop is not None:
+            stop = max(start, stop)
+        return Slice(start, stop)
+
+    def __repr__(self) -> str:
+        return f"Slice({self.start}, {self.stop})"
+
+
+class Apply(Stage):
+    """
+    `Apply` runs an operator which consumes its input as a whole, like `distinct`, `reverse`, `zip` or the joins, as
+    `func(values, *args)`. Nothing is known about its output, so no other stage is moved across it.
+    """
+    __slots__ = ("name", "func", "args")
+
+    def __init__(self, name: str, func: Callable[..., Iterable], *args: Any) -> None:
+        self.name = name
+        self.func = func
+        self.args = args
+
+    def __repr__(self) -> str:
+        return f"Apply({self.name!r}, {self.func!r})"
+
+
+def skip_stage(count: int) -> Slice:
+    return Slice(max(0, count), None)
+
+def take_stage(count: int) -> Slice:
+    return Slice(0, max(0, count))
+
+
+def optimize(plan: Tuple[Stage, ...]) -> List[Stage]:
+    """
+    Rewrites a plan into an equivalent but cheaper one. Adjacent `skip`/`take` stages collapse into a single
+    `Slice`, and slices are pushed in front of `select` stages so selectors never run on elements that are
+    sliced away.
+    """
+    optimized: List[Stage] = []
+    for stage in plan:
+        if not isinstance(stage, Slice):
+            optimized.append(stage)
+            continue
+        index = len(optimized)
+        while index > 0 and isinstance(optimized[index - 1], Select):
+            index -= 1
+        if index > 0 and isinstance(optimized[index - 1], Slice):
+            optimized[index - 1] = optimized[index - 1].then(stage)
+        else:
+            optimized.insert(index, stage)
+    return optimized
+
+
+class Ordering:
+    """
+    `Ordering` is the lazy source created by `order_by`/`then_by`. It sorts once it is iterated, unless the plan
+    on top of it only needs a prefix, in which case only that prefix is computed with a bounded heap. With
+    `max_memory_items` the sort spills sorted runs to disk instead of holding all values in memory.
+    """
+    __slots__ = ("values", "keys", "max_memory_items")
+
+    def __init__(self, values: Iterable, keys: List[Tuple[Callable, bool]], max_memory_items: int | None = None) -> None:
+        self.values = values
+        self.keys = keys
+        self.max_memory_items = max_memory_items
+
+    def then(self, key: Callable, descending: bool) -> 'Ordering':
+        return Ordering(self.values, self.keys + [(key, descending)], self.max_memory_items)
+
+    def limit(self, count: int) -> List:
+        return top(self.values, self.keys, count)
+
+    def __iter__(self) -> Iterator:
+        return iter(order_by(self.values, self.keys, self.max_memory_items))
+
+
+class Capabilities:
+    """
+    `Capabilities` describe what is known about the values produced by a plan: whether their number is known
+    (`sized`), whether they can be accessed by index (`indexed`), and whether they are known to be in ascending order
+    (`sorted`) or free of duplicates (`distinct`). `assume_sorted` declares `sorted` for any plan.
+    """
+    __slots__ = ("sized", "indexed", "sorted", "distinct")
+
+    def __init__(self, sized: bool = False, indexed: bool = False, sorted: bool = False,
+                 distinct: bool = False) -> None:
+        self.sized = sized
+        self.indexed = indexed
+        self.sorted = sorted
+        self.distinct = distinct
+
+    def __repr__(self) -> str:
+        flags = [name for name in self.__slots__ if getattr(self, name)]
+        return f"Capabilities({', '.join(flags)})"
+
+
+def _source_capabilities(values: Iterable) -> Capabilities:
+    if isinstance(values, range):
+        return Capabilities(True, True, sorted=values.step > 0, distinct=True)
+    if isinstance(values, Sequence):
+        return Capabilities(True, True)
+    if isinstance(values, Mapping):
+        return Capabilities(True, distinct=True)
+    if isinstance(values, Set):
+        return Capabilities(True, distinct=True)
+    return Capabilities(sized=isinstance(values, Sized))
+
+
+def capabilities(values: Iterable, plan: Tuple[Stage, ...]) -> Capabilities:
+    """
+    Derives the capabilities of the values produced by `plan` from its source. `select` keeps the length and index
+    based access but loses order and uniqueness, `where`/`take_while` keep order and uniqueness but lose the length,
+    slices keep everything and nothing is known after `select_many` or an `Apply` stage.
+    """
+    result = _source_capabilities(values)
+    for stage in optimize(plan):
+        if isinstance(stage, Select):
+            result = Capabilities(result.sized, result.indexed)
+        elif isinstance(stage, (Where, TakeWhile)):
+            result = Capabilities(sorted=result.sorted, distinct=result.distinct)
+        elif isinstance(stage, (SelectMany, Apply)):
+            result = Capabilities()
+        elif isinstance(stage, Slice) and not result.indexed:
+            result = Capabilities(result.sized, sorted=result.sorted, distinct=result.distinct)
+    return result
+
+
+class SequenceView(Sequence):
+    """
+    `SequenceView` is a lazy, indexable view of a `Sequence` source with slices and selectors applied. Length and index
+    access are O(1), slicing and reversing create another view without copying.
+    """
+    def __init__(self, values: Sequence, indices: range, selectors: Tuple[Callable, ...] = ()) -> None:
+        self._values = values
+        self._indices = indices
+        self._selectors = selectors
+
+    def _select(self, values: Iterable) -> Iterable:
+        for selector in self._selectors:
+            values = map(selector, values)
+        return values
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return SequenceView(self._values, self._indices[index], self._selectors)
+        x = self._values[self._indices[index]]
+        for selector in self._selectors:
+            x = selector(x)
+        return x
+
+    def __iter__(self) -> Iterator:
+        if len(self._indices) == len(self._values) and self._indices.step == 1:
+            return iter(self._select(self._values))
+        return iter(self._select(map(self._values.__getitem__, self._indices)))
+
+    def __reversed__(self) -> Iterator:
+        return iter(self[::-1])
+
+
+def sequence_view(values: Iterable, plan: Tuple[Stage, ...]) -> SequenceView | None:
+    """
+    Returns a `SequenceView` of the plan's values if the source is a `Sequence` and every stage keeps index based
+    access (`select`, `skip`, `take`), otherwise `None`.
+    """
+    if not isinstance(values, Sequence):
+        return None
+    indices = range(len(values))
+    selectors = []
+    for stage in optimize(plan):
+        if isinstance(stage, Slice):
+            indices = indices[stage.start:stage.stop]
+        elif isinstance(stage, Select):
+            selectors.append(_unwrap(stage.selector))
+        else:
+            return None
+    return SequenceView(values, indices, tuple(selectors))
+
+
+def length(values: Iterable, plan: Tuple[Stage, ...]) -> int | None:
+    """
+    Returns the number of values produced by `plan` without enumerating them, or `None` if it isn't known upfront.
+    """
+    if not capabilities(values, plan).sized:
+        return None
+    indices = range(len(values))
+    for stage in optimize(plan):
+        if isinstance(stage, Slice):
+            indices = indices[stage.start:stage.stop]
+    return len(indices)
+
+
+def _slice_sequence(values: Sequence, start: int, stop: int | None) -> Iterable:
+    if isinstance(values, (range, memoryview)):
+        # slices of both are views
+        return values[start:stop]
+    indices = range(len(values))[start:stop]
+    if indices.start > len(indices):
+        # Skipping more values than are kept: index directly instead of stepping over the skipped ones.
+        return map(values.__getitem__, indices)
+    return islice(values, indices.start, indices.stop)
+
+
+MISSING = object()
+
+
+def _unwrap(func: Callable) -> Callable:
+    # Predicate/Selector only forward to the wrapped callable, so call it directly.
+    return func.func if isinstance(func, Func) else func
+
+
+def _name(func: Callable) -> str:
+    func = _unwrap(func)
+    return getattr(func, "__name__", None) or repr(func)
+
+
+def describe(stage: Stage) -> str:
+    """
+    Returns the operator a stage runs as it is written in a query, e.g. `where(is_even)` or `take(10)`.
+    """
+    if isinstance(stage, (Where, TakeWhile)):
+        return f"{stage.name}({_name(stage.predicate)})"
+    if isinstance(stage, (Select, SelectMany)):
+        return f"{stage.name}({_name(stage.selector)})"
+    if isinstance(stage, Slice):
+        if stage.stop is None:
+            return f"skip({stage.start})"
+        if stage.start == 0:
+            return f"take({stage.stop})"
+        return f"skip({stage.start}).take({stage.stop - stage.start})"
+    if isinstance(stage, Apply):
+        return f"{stage.name}({', '.join(_name(arg) for arg in stage.args if callable(arg))})"
+    return repr(stage)
+
+
+def describe_source(values: Iterable) -> List[str]:
+    """
+    Describes the source of a plan by its type and, if known, its length. An ordering is described by the source it
+    sorts followed by its keys.
+    """
+    if isinstance(values, Ordering):
+        keys = ", ".join(_name(key) + (" desc" if descending else "") for key, descending in values.keys)
+        # the values of an ordering are either a source or an Enumerable with a plan of its own
+        plan = getattr(values.values, "_plan", None)
+        if plan is None:
+            lines = describe_source(values.values)
+        else:
+            lines = explain(values.values._values, plan)
+        return lines + [f"order_by({keys})"]
+    if isinstance(values, range):
+        return [repr(values)]
+    if isinstance(values, Sized):
+        return [f"{type(values).__name__} of {len(values)} values"]
+    return [type(values).__name__]
+
+
+def explain(values: Iterable, plan: Tuple[Stage, ...]) -> List[str]:
+    """
+    Returns the source and the operators of the optimized plan, one line each, in the order in which they run.
+    """
+    return describe_source(values) + [describe(stage) for stage in optimize(plan)]
+
+
+def _lower(values: Iterable, stage: Stage, wrap: Callable[[Callable], Callable] = _unwrap) -> Iterable:
+    """
+    Applies one stage to `values` with the C level iterator it maps onto. `wrap` is applied to the user callables.
+    """
+    if isinstance(stage, Where):
+        return filter(wrap(stage.predicate), values)
+    if isinstance(stage, Select):
+        return map(wrap(stage.selector), values)
+    if isinstance(stage, SelectMany):
+        return chain.from_iterable(map(wrap(stage.selector), values))
+    if isinstance(stage, TakeWhile):
+        return takewhile(wrap(stage.predicate), values)
+    if isinstance(stage, Slice):
+        return islice(values, stage.start, stage.stop)
+    return stage.func(values, *(wrap(arg) if callable(arg) else arg for arg in stage.args))
+
+
+def _shortcut(values: Iterable, stages: List[Stage]) -> Tuple[Iterable, List[Stage]]:
+    """
+    Applies a leading slice without enumerating the skipped values: an ordering only computes the kept prefix and a
+    `Sequence` is indexed directly.
+    """
+    if stages and isinstance(stages[0], Slice):
+        if stages[0].stop is not None and isinstance(values, Ordering):
+            return values.limit(stages[0].stop), stages
+        if isinstance(values, Sequence):
+            return _slice_sequence(values, stages[0].start, stages[0].stop), stages[1:]
+    return values, stages
+
+
+def compile_plan(values: Iterable, plan: Tuple[Stage, ...]) -> Iterable:
+    """
+    Lowers `plan` into a single iterator over `values`. Every stage maps onto a C level iterator
+    (`filter`, `map`, `islice`, ...), so no Python frame runs between the user callables. While profiling is
+    enabled the iterator is instrumented instead (see `profiling`).
+    """
+    stages = optimize(plan)
+    for stage in stages:
+        if isinstance(stage, Slice) and stage.is_empty():
+            return iter(())
+    if profiling.enabled():
+        return _instrument(values, stages)
+    values, stages = _shortcut(values, stages)
+    for stage in stages:
+        values = _lower(values, stage)
+    return values
+
+
+class _Counter:
+    """
+    Counts the values an operator produces and records when it produced the first one.
+    """
+    __slots__ = ("_values", "_stats", "_started")
+
+    def __init__(self, values: Iterable, stats: profiling.OperatorStats, started: float) -> None:
+        self._values = iter(values)
+        self._stats = stats
+        self._started = started
+
+    def __iter__(self) -> '_Counter':
+        return self
+
+    def __next__(self) -> Any:
+        x = next(self._values)
+        stats = self._stats
+        if stats.rows_out == 0:
+            stats.first_row_time = perf_counter() - self._started
+        stats.rows_out += 1
+        return x
+
+
+class _ProfiledIterator:
+    """
+    Iterates an instrumented plan and reports its profile once it is exhausted, closed or garbage collected.
+    """
+    __slots__ = ("_values", "_profile", "_started")
+
+    def __init__(self, values: Iterator, profile: profiling.Profile, started: float) -> None:
+        self._values = values
+        self._profile = profile
+        self._started = started
+
+    def __iter__(self) -> '_ProfiledIterator':
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._values)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return
+        profile.elapsed = perf_counter() - self._started
+        for previous, stats in zip(profile.operators, profile.operators[1:]):
+            stats.rows_in = previous.rows_out
+        profiling.report(profile)
+
+    def __del__(self) -> None:
+        self.close()
+
+
+def _timed(func: Callable, stats: profiling.OperatorStats) -> Callable:
+    func = _unwrap(func)
+
+    def timed(*args: Any) -> Any:
+        started = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            stats.callable_time += perf_counter() - started
+    return timed
+
+
+def _instrument(values: Iterable, stages: List[Stage]) -> Iterator:
+    """
+    Lowers the stages like `compile_plan`, with a counter after the source and after every stage and with every user
+    callable (including the keys of an ordering) timed.
+    """
+    started = perf_counter()
+    source = profiling.OperatorStats(describe_source(values)[-1])
+    if isinstance(values, Ordering):
+        keys = [(_timed(key, source), descending) for key, descending in values.keys]
+        values = Ordering(values.values, keys, values.max_memory_items)
+    shortcut, remaining = _shortcut(values, stages)
+    if len(remaining) < len(stages):
+        source.operator = f"{source.operator}.{describe(stages[0])}"
+    operators = [source]
+    values = _Counter(shortcut, source, started)
+    for stage in remaining:
+        stats = profiling.OperatorStats(describe(stage))
+        operators.append(stats)
+        values = _Counter(_lower(values, stage, lambda func: _timed(func, stats)), stats, started)
+    return _ProfiledIterator(values, profiling.Profile(operators), started)
+
+
+def iterate(values: Iterable, plan: Tuple[Stage, ...]) -> Iterator:
+    return iter(compile_plan(values, plan))
+
+
+def to_list(values: Iterable, plan: Tuple[Stage, ...]) -> List:
+    return list(compile_plan(values, plan))
+
+
+def count(values: Iterable, plan: Tuple[Stage, ...]) -> int:
+    counter = 0
+    for _ in compile_plan(values, plan):
+        counter += 1
+    return counter
+
+
+def foreach(values: Iterable, plan: Tuple[Stage, ...], action: Callable[[Any], None]) -> None:
+    deque(map(_unwrap(action), compile_plan(values, plan)), maxlen=0)
+
+
+def aggregate(values: Iterable, plan: Tuple[Stage, ...], func: Callable[[Any, Any], Any], seed: Any = MISSING) -> Any:
+    """
+    Folds the plan with `func`. Without a seed the first element is used and `MISSING` is returned
+    for an empty input.
+    """
+    iterator = iter(compile_plan(values, plan))
+    if seed is MISSING:
+        seed = next(iterator, MISSING)
+        if seed is MISSING:
+            return seed
+    return reduce(_unwrap(func), iterator, seed)
@@ -0,0 +1,165 @@
+import unittest
+from itertools import islice
+from enumerables import *
+from query_plan import *
+
+class TestQueryPlan(unittest.TestCase):
+    def test_adjacent_slices_are_merged(self):
+        result = optimize((skip_stage(2), take_stage(5), skip_stage(1), take_stage(10)))
+        self.assertEqual(len(result), 1)
+        self.assertEqual((result[0].start, result[0].stop), (3, 7))
+
+    def test_slice_is_pushed_in_front_of_select(self):
+        square = lambda x: x * x
+        result = optimize((Select(square), Select(square), take_stage(3)))
+        self.assertIsInstance(result[0], Slice)
+        self.assertEqual([type(stage) for stage in result[1:]], [Select, Select])
+
+    def test_slice_is_not_pushed_in_front_of_where(self):
+        result = optimize((Where(lambda x: x > 1), take_stage(3)))
+        self.assertEqual([type(stage) for stage in result], [Where, Slice])
+
+    def test_selector_does_not_run_on_skipped_values(self):
+        calls = []
+        selector = lambda x: calls.append(x) or x
+        result = Enumerable().of(range(10)).select(selector).skip(3).take(2).to_list()
+        self.assertEqual(result, [3, 4])
+        self.assertEqual(calls, [3, 4])
+
+    def test_take_does_not_consume_past_limit(self):
+        values = iter(range(10))
+        result = Enumerable().of(values).where(lambda x: x % 2 == 0).take(2).to_list()
+        self.assertEqual(result, [0, 2])
+        self.assertEqual(next(values), 3)
+
+    def test_take_zero_consumes_nothing(self):
+        values = iter(range(10))
+        result = Enumerable().of(values).where(lambda x: x > 3).take(0).to_list()
+        self.assertEqual(result, [])
+        self.assertEqual(next(values), 0)
+
+    def test_fused_chain_matches_stacked_iterators(self):
+        is_even = lambda x: x % 2 == 0
+        double = lambda x: x * 2
+        pairs = lambda x: (x, -x)
+        below = lambda x: x < 150
+        enumerable = (
+            Enumerable().of(range(100))
+            .skip(3)
+            .where(is_even)
+            .where(lambda x: x % 3 == 0)
+            .select(double)
+            .select(lambda x: x + 1)
+            .skip(2)
+            .select_many(pairs)
+            .take(11)
+            .where(lambda x: x != -13)
+            .take_while(below)
+        )
+        stacked = islice(range(100), 3, None)
+        stacked = map(lambda x: x + 1, map(double, filter(lambda x: x % 3 == 0, filter(is_even, stacked))))
+        stacked = islice((x for y in islice(stacked, 2, None) for x in pairs(y)), 11)
+        expected = list(takewhile(below, (x for x in stacked if x != -13)))
+        self.assertEqual(enumerable.to_list(), expected)
+        self.assertEqual(list(enumerable), expected)
+        self.assertEqual(enumerable.count(), len(expected))
+        self.assertEqual(enumerable.aggregate(lambda x, y: x + y), sum(expected))
+
+    def test_plan_is_replayable_over_sequences(self):
+        enumerable = Enumerable().of(range(10)).where(lambda x: x > 4)
+        self.assertEqual(enumerable.count(), 5)
+        self.assertEqual(enumerable.to_list(), [5, 6, 7, 8, 9])
+
+    def test_terminal_sinks(self):
+        enumerable = Enumerable().of(range(6)) | Selector(lambda x: x + 1) | Predicate(lambda x: x % 2 == 1)
+        seen = []
+        enumerable.foreach(seen.append)
+        self.assertEqual(seen, [1, 3, 5])
+        self.assertEqual(enumerable.aggregate_with_seed(lambda x, y: x * y, 2), 30)
+        self.assertEqual(enumerable.count_where(lambda x: x > 1), 2)
+
+    def test_aggregate_of_empty_plan_raises(self):
+        with self.assertRaises(TypeError):
+            Enumerable().of(range(10)).where(lambda x: x > 10).aggregate(lambda x, y: x + y)
+
+    def test_empty_slice_anywhere_yields_nothing(self):
+        result = compile_plan(range(10), (Where(lambda x: x > 2), skip_stage(4), take_stage(0)))
+        self.assertEqual(list(result), [])
+
+    def test_capabilities_follow_the_plan(self):
+        plan = (Select(str), skip_stage(2))
+        result = capabilities(range(10), plan)
+        self.assertTrue(result.sized and result.indexed)
+        self.assertFalse(result.sorted or result.distinct)
+        result = capabilities(range(10), (Where(bool), take_stage(3)))
+        self.assertTrue(result.sorted and result.distinct)
+        self.assertFalse(result.sized or result.indexed)
+        self.assertFalse(capabilities(iter(range(10)), ()).sized)
+        self.assertTrue(capabilities({1, 2}, (Select(str),)).sized)
+        self.assertFalse(capabilities(range(10), (Apply("distinct_by", distinct_by, bool),)).sized)
+        self.assertEqual(Enumerable().of(range(10)).distinct_by(lambda x: x % 3).count(), 3)
+
+    def test_sequence_operations_do_not_enumerate(self):
+        huge = range(10 ** 15)
+        enumerable = Enumerable().of(huge).select(lambda x: x * 2).skip(10 ** 14)
+        self.assertEqual(enumerable.count(), 9 * 10 ** 14)
+        self.assertEqual(enumerable.last(), (10 ** 15 - 1) * 2)
+        self.assertEqual(enumerable.element_at(5), (10 ** 14 + 5) * 2)
+        self.assertFalse(enumerable.is_empty())
+        self.assertEqual(enumerable.reverse().take(2).to_list(), [(10 ** 15 - 1) * 2, (10 ** 15 - 2) * 2])
+        self.assertEqual(Enumerable().of(huge).skip(10 ** 15 - 2).to_list(), [10 ** 15 - 2, 10 ** 15 - 1])
+
+    def test_sequence_view(self):
+        view = sequence_view(["a", "b", "c", "d"], (Select(str.upper), skip_stage(1), take_stage(2)))
+        self.assertEqual((len(view), view[0], view[-1]), (2, "B", "C"))
+        self.assertEqual(list(reversed(view)), ["C", "B"])
+        self.assertIsNone(sequence_view(["a"], (Where(bool),)))
+
+    def test_skip_on_list(self):
+        values = list(range(100))
+        self.assertEqual(Enumerable().of(values).skip(95).select(str).to_list(), ["95", "96", "97", "98", "99"])
+        self.assertEqual(Enumerable().of(values).skip(2).take(2).to_list(), [2, 3])
+        self.assertEqual(Enumerable().of(values).skip(200).to_list(), [])
+
+    def test_slices_of_memoryviews_are_views(self):
+        buffer = bytearray(range(10))
+        sliced = compile_plan(memoryview(buffer), (skip_stage(2), take_stage(3)))
+        self.assertIsInstance(sliced, memoryview)
+        buffer[2] = 42
+        self.assertEqual(sliced.tolist(), [42, 3, 4])
+
+    def test_element_at(self):
+        self.assertEqual(Enumerable().of(x for x in range(10)).where(lambda x: x % 2).element_at(2), 5)
+        self.assertIsNone(Enumerable().of(x for x in range(3)).element_at(3))
+        self.assertIsNone(Enumerable().of(range(3)).element_at(-1))
+
+    def test_distinct_of_known_distinct_values(self):
+        enumerable = Enumerable().of(range(10)).where(lambda x: x > 4)
+        self.assertIs(enumerable.distinct(), enumerable)
+        result = Enumerable().of(range(10)).select(lambda x: x // 2).distinct().to_list()
+        self.assertEqual(result, list(range(5)))
+
+    def test_explain(self):
+        def double(x):
+            return x * 2
+        enumerable = (
+            Enumerable().of([3, 1, 2])
+            .select(double)
+            .distinct()
+            .order_by_descending(double)
+            .then_by(abs)
+            .skip(1)
+            .take(1)
+        )
+        expected = ["list of 3 values", "select(double)", "distinct()", "order_by(double desc, abs)", "skip(1).take(1)"]
+        self.assertEqual(enumerable.explain().splitlines(), expected)
+        self.assertEqual(Enumerable().of(x for x in "ab").take(3).explain(), "generator\ntake(3)")
+
+    def test_barrier_operators_are_replayable(self):
+        enumerable = Enumerable().of([1, 1, 2, 3]).distinct().concat([4]).reverse().zip(range(4))
+        self.assertEqual(enumerable.to_list(), [(4, 0), (3, 1), (2, 2), (1, 3)])
+        self.assertEqual(enumerable.to_list(), [(4, 0), (3, 1), (2, 2), (1, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from bisect import bisect_right
+from collections import Counter
+from random import Random
+from enumerables import *
+from sketches import *
+
+
+class TestSketches(unittest.TestCase):
+    def test_approx_distinct_count_error_bound(self):
+        values = [i % 50_000 for i in range(150_000)]
+        for precision in (10, 14):
+            # four standard errors of 1.04 / sqrt(2 ** precision)
+            bound = 4 * 1.04 / 2 ** (precision / 2)
+            estimate = Enumerable().of(values).approx_distinct_count(precision)
+            self.assertLess(abs(estimate - 50_000) / 50_000, bound)
+        words = Enumerable().of(range(20_000)).select(lambda x: f"word{x % 7_000}")
+        self.assertLess(abs(words.approx_distinct_count() - 7_000) / 7_000, 4 * 0.0082)
+        self.assertEqual(Enumerable().of("abcab").approx_distinct_count(), 3)
+        self.assertEqual(Enumerable().empty().approx_distinct_count(), 0)
+
+    def test_hyperloglog_merge_is_exact(self):
+        left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.update(range(0, 60_000))
+        right.update(range(40_000, 100_000))
+        both.update(range(100_000))
+        left.merge(right)
+        self.assertEqual(left.count(), both.count())
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(10))
+
+    def test_approx_quantiles_rank_error(self):
+        random = Random(7)
+        values = [random.gauss(0, 1) for _ in range(100_000)]
+        exact = sorted(values)
+        quantiles = (0, 0.01, 0.25, 0.5, 0.75, 0.99, 1)
+        estimates = Enumerable().of(values).approx_quantiles(quantiles)
+        for q, estimate in zip(quantiles, estimates):
+            self.assertLess(abs(bisect_right(exact, estimate) / len(exact) - q), 0.02)
+        self.assertEqual(Enumerable().of(range(1, 101)).approx_quantiles([0, 0.5, 1]), [1, 50, 100])
+
+    def test_quantile_sketches_merge(self):
+        random = Random(3)
+        parts = [[random.random() * (i + 1) for _ in range(25_000)] for i in range(4)]
+        merged = QuantileSketch(seed=1)
+        for part in parts:
+            sketch = QuantileSketch(seed=2)
+            sketch.update(part)
+            merged.merge(sketch)
+        exact = sorted(x for part in parts for x in part)
+        self.assertEqual(merged.count, len(exact))
+        for q in (0.1, 0.5, 0.9):
+            self.assertLess(abs(bisect_right(exact, merged.quantile(q)) / len(exact) - q), 0.02)
+            self.assertLess(abs(merged.rank(exact[int(q * len(exact))]) - q), 0.02)
+        with self.assertRaises(ValueError):
+            QuantileSketch().quantile(0.5)
+
+    def test_sample_is_uniform(self):
+        hits = Counter()
+        for seed in range(2_000):
+            sample = Enumerable().of(x for x in range(100)).sample(10, seed)
+            self.assertEqual(len(set(sample)), 10)
+            hits.update(sample)
+        # every value is expected in 10% of the samples, i.e. 200 times with a standard deviation of 13.4
+        self.assertTrue(all(140 < hits[x] < 260 for x in range(100)), hits)
+        self.assertEqual(sorted(Enumerable().of(x for x in range(5)).sample(10)), [0, 1, 2, 3, 4])
+        self.assertEqual(len(Enumerable().of(range(10 ** 12)).select(str).sample(3)), 3)
+
+    def test_reservoirs_merge_uniformly(self):
+        hits = Counter()
+        for seed in range(2_000):
+            left, right = Reservoir(10, seed), Reservoir(10, seed + 10_000)
+            left.update(range(30))
+            right.update(range(30, 100))
+            left.merge(right)
+            self.assertEqual((len(left.values), left.seen), (10, 100))
+            hits.update(left.values)
+        self.assertTrue(all(140 < hits[x] < 260 for x in range(100)), hits)
+
+    def test_bounded_distinct_lru(self):
+        values = [1, 2, 3, 1, 4, 5, 6, 1]
+        self.assertEqual(Enumerable().of(values).distinct(max_keys=3).to_list(), [1, 2, 3, 4, 5, 6, 1])
+        self.assertEqual(Enumerable().of(values).distinct(max_keys=4).to_list(), [1, 2, 3, 4, 5, 6])
+        words = Enumerable().of(["a", "bb", "cc", "d", "eee", "a"])
+        self.assertEqual(words.distinct_by(len, max_keys=2).to_list(), ["a", "bb", "eee"])
+        with self.assertRaises(ValueError):
+            Enumerable().of(values).distinct(max_keys=3, mode="fifo").to_list()
+
+    def test_bounded_distinct_bloom(self):
+        values = [x for x in range(20_000) for _ in range(2)]
+        result = Enumerable().of(values).distinct(max_keys=5_000, mode="bloom").to_list()
+        self.assertEqual(len(set(result)), len(result))
+        # false positives drop a few new values: at most twice the error rate of the filters
+        self.assertGreater(len(result), 20_000 * 0.98)
+        keys = BloomKeys(1_000)
+        for x in range(1_500):
+            keys.insert(x)
+        self.assertFalse(any(keys.insert(x) for x in range(500, 1_500)))
+
+    def test_bloom_filter_merge(self):
+        left, right = BloomFilter(1_000), BloomFilter(1_000)
+        for x in range(500):
+            left.add(x)
+            right.add(-x - 1)
+        left.merge(right)
+        self.assertTrue(all(x in left for x in range(-500, 500)))
+        self.assertLess(sum(x in left for x in range(10_000, 20_000)), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()